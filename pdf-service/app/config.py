@@ -0,0 +1,61 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+# Settings whose values are never reported by Settings.values()
+SECRET_MARKERS = ("SECRET", "TOKEN", "PASSWORD", "ACCESS_KEY", "API_KEY")
+
+
+class Settings:
+    """
+    Configuration of the service: the environment, with ``.env`` loaded once.
+
+    Modules read their settings through ``settings`` into constants next to
+    the code that uses them, so every setting is parsed the same way and
+    ``values()`` reports everything the running process was configured with.
+    """
+
+    def __init__(self, env_file: Optional[str] = None):
+        # Variables already set in the environment win over .env
+        load_dotenv(env_file)
+        self._read: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, value: Any) -> Any:
+        with self._lock:
+            self._read[name] = value
+        return value
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """A setting as a string, like os.getenv"""
+        return self._record(name, os.environ.get(name, default))
+
+    def get_int(self, name: str, default: int) -> int:
+        value = os.environ.get(name)
+        return self._record(name, int(value) if value not in (None, "") else default)
+
+    def get_float(self, name: str, default: float) -> float:
+        value = os.environ.get(name)
+        return self._record(name, float(value) if value not in (None, "") else default)
+
+    def get_bool(self, name: str, default: bool) -> bool:
+        """True unless set to 0, false or no"""
+        value = os.environ.get(name)
+        return self._record(name, default if value is None else value.lower() not in ("0", "false", "no"))
+
+    def get_list(self, name: str) -> List[str]:
+        """A comma-separated setting, without empty items"""
+        value = os.environ.get(name, "")
+        return self._record(name, [item.strip() for item in value.split(",") if item.strip()])
+
+    def values(self) -> Dict[str, Any]:
+        """Every setting read so far with its effective value, secrets masked"""
+        with self._lock:
+            read = dict(self._read)
+        return {name: "***" if value and any(marker in name for marker in SECRET_MARKERS) else value
+                for name, value in sorted(read.items())}
+
+
+# Settings of this process
+settings = Settings()
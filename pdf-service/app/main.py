@@ -1,23 +1,61 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes.pdf_routes import router as pdf_router
-import os
-from dotenv import load_dotenv
+from app.routes.pdf_routes import router as pdf_router, job_queue
+from app.routes.metrics_routes import router as metrics_router
+from app.routes.admin_routes import router as admin_router
+from app.routes.health_routes import router as health_router
+from app.utils.warm_tex import warm_tex_pool
+from app.utils.pdf_lifecycle import pdf_lifecycle
+from app.utils.pdf_generator import PDF_ENGINE
+from app.utils.compile_pool import compile_pool, remove_orphaned_temp_dirs
+from app.utils.warmup import warmup
+from app.serve import PDF_SHUTDOWN_TIMEOUT
+from app.utils.metrics import request_timings, server_timing
+from app.utils.profiling import profiler
+from app.utils.log_config import configure_logging, new_request_id, request_context
+from contextlib import asynccontextmanager
+import time
+from app.config import settings
 
-# Load environment variables
-load_dotenv()
 
-# Get allowed origin from environment variable
-MAIN_SERVICE_ORIGIN = os.getenv("MAIN_SERVICE_ORIGIN_URL")
-if not MAIN_SERVICE_ORIGIN:
-    raise ValueError("MAIN_SERVICE_ORIGIN_URL environment variable is not set")
+# Structured, sampled logs (PDF_LOG_FORMAT, PDF_LOG_LEVEL, PDF_LOG_SAMPLE_RATE)
+configure_logging()
 
-app = FastAPI(title="Resume-AI PDF Service")
+# Get allowed origin from environment variable; checked at startup rather than
+# on import, so tools and benchmarks can import the app without it
+MAIN_SERVICE_ORIGIN = settings.get("MAIN_SERVICE_ORIGIN_URL")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not MAIN_SERVICE_ORIGIN:
+        raise RuntimeError("MAIN_SERVICE_ORIGIN_URL environment variable is not set")
+    # Warm up in the background: build the precompiled preamble format,
+    # compile one resume to load TeX's fonts and create the storage client.
+    # Requests are served meanwhile, compiles fall back to the full preamble
+    # until the format is ready. With the direct engine as the default no TeX
+    # workers are kept warm and the format is built on the first request that
+    # asks for LaTeX.
+    remove_orphaned_temp_dirs()
+    warmup.start()
+    if PDF_ENGINE == "latex":
+        warm_tex_pool.start()
+    await job_queue.start()
+    pdf_lifecycle.start()
+    yield
+    # Graceful drain: the server has stopped accepting requests and waited for
+    # in-flight ones; let running jobs and compiles finish before stopping
+    await warmup.stop()
+    await pdf_lifecycle.stop()
+    await job_queue.stop(drain_timeout=PDF_SHUTDOWN_TIMEOUT)
+    await compile_pool.drain(PDF_SHUTDOWN_TIMEOUT)
+    await warm_tex_pool.stop()
+
+app = FastAPI(title="Resume-AI PDF Service", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[MAIN_SERVICE_ORIGIN],
+    allow_origins=[MAIN_SERVICE_ORIGIN] if MAIN_SERVICE_ORIGIN else [],
     allow_credentials=True,
     allow_methods=["POST", "GET", "OPTIONS"],
     allow_headers=["*"],
@@ -34,6 +72,44 @@ async def add_security_headers(request, call_next):
     response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
     return response
 
+# Profile generation requests that ask for it or turn out slow; added before
+# Server-Timing so the profile sees the request's stage timings
+@app.middleware("http")
+async def profile_requests(request, call_next):
+    trigger = request.url.path.startswith("/api/v1/pdf/") and profiler.wants(request.headers.get("X-Profile"))
+    if not trigger:
+        return await call_next(request)
+    with profiler.profile(request.method, request.url.path, trigger) as profile:
+        response = await call_next(request)
+        profile.status = response.status_code
+    if profile.id is not None and trigger == "header":
+        response.headers["X-Profile-Id"] = profile.id
+    return response
+
+# Report where the time of each request went, e.g. "render;dur=1.21, compile;dur=840.35"
+@app.middleware("http")
+async def add_server_timing(request, call_next):
+    started_at = time.perf_counter()
+    with request_timings() as timings:
+        response = await call_next(request)
+    if timings:
+        response.headers["Server-Timing"] = server_timing(timings, time.perf_counter() - started_at)
+        if MAIN_SERVICE_ORIGIN:
+            response.headers["Timing-Allow-Origin"] = MAIN_SERVICE_ORIGIN
+    return response
+
+# Tag every log record of a request with its id, taken from X-Request-ID when the
+# caller sends one; added last so it wraps the other middleware
+@app.middleware("http")
+async def add_request_id(request, call_next):
+    with request_context(new_request_id(request.headers.get("X-Request-ID"))) as request_id:
+        response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 app.include_router(pdf_router, prefix="/api/v1")
+app.include_router(metrics_router)
+app.include_router(health_router)
+app.include_router(admin_router, prefix="/api/v1")
 
 
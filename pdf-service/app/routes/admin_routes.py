@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Header
+from app.utils.profiling import profiler, check_admin_token, PDF_ADMIN_TOKEN
+from typing import Optional
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+def _authorize(x_admin_token: Optional[str]) -> None:
+    if not PDF_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not check_admin_token(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.get("/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """
+    List the recent request profiles, newest first
+
+    Requests are profiled when they send X-Profile with the admin token, or
+    when they are slower than PDF_PROFILE_SLOW_MS. Disabled unless
+    PDF_ADMIN_TOKEN is set.
+    """
+    _authorize(x_admin_token)
+    return {
+        "slow_ms": profiler.slow * 1000,
+        "capacity": profiler.profiles.maxlen,
+        "profiles": [profile.summary() for profile in reversed(profiler.profiles)],
+    }
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_admin_token: Optional[str] = Header(None)):
+    """
+    Get a request profile: stage timings, Python stack samples and TeX runs
+
+    Stacks are folded ("outer;inner" -> samples) and can be fed to
+    flamegraph tools as they are.
+    """
+    _authorize(x_admin_token)
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or no longer kept")
+    return profile.report()
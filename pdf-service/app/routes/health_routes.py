@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.utils.health import health
+from app.routes.pdf_routes import job_queue
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/healthz")
+async def healthz():
+    """
+    Liveness: 200 while the process is serving, 503 when every compile slot
+    has been stuck for PDF_LIVENESS_STALL_AFTER seconds and it should be restarted
+    """
+    live, body = health.liveness()
+    return JSONResponse(body, status_code=200 if live else 503)
+
+
+@router.get("/readyz")
+async def readyz():
+    """
+    Readiness: 200 when a request sent now would be served, 503 with the
+    failing checks otherwise (warming up, pdflatex missing, compile queue
+    full, compile slots stuck or storage unreachable)
+    """
+    ready, body = await health.readiness()
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+@router.get("/capacity")
+async def capacity():
+    """
+    Spare capacity of the process that answers: free compile slots, queue
+    lengths and the p95 of recent compiles, for least-loaded routing
+    """
+    return health.capacity(jobs_queued=job_queue.depth())
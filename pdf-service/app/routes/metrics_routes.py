@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Response
+from app.utils.metrics import registry, Counter, Gauge, CONTENT_TYPE
+from app.utils.compile_pool import compile_pool
+from app.utils.pdf_cache import pdf_cache
+from app.utils.fragment_cache import fragment_cache
+from app.utils.warm_tex import warm_tex_pool
+from app.utils.warmup import warmup
+from app.routes.pdf_routes import job_queue
+
+router = APIRouter(tags=["Metrics"])
+
+# Counters and state the service already keeps, read when scraped
+Counter("pdf_cache_hits_total", "Compiled PDFs served from the cache, by tier", ("tier",),
+        function=lambda: {(tier,): hits for tier, hits in pdf_cache.hits.items()})
+Counter("pdf_cache_misses_total", "Documents that were not in the disk cache and had to be compiled",
+        function=lambda: pdf_cache.misses)
+Counter("pdf_fragment_cache_hits_total", "Rendered sections reused from the fragment cache",
+        function=lambda: fragment_cache.hits)
+Counter("pdf_fragment_cache_misses_total", "Sections that had to be rendered",
+        function=lambda: fragment_cache.misses)
+Counter("pdf_compiles_total", "Compile slots used, including failed and timed out compiles",
+        function=lambda: compile_pool.completed)
+Counter("pdf_compile_timeouts_total", "Compiles killed for running past PDF_COMPILE_TIMEOUT",
+        function=lambda: compile_pool.timed_out)
+Counter("pdf_compile_rejected_total", "Compiles rejected because the compile queue was full",
+        function=lambda: compile_pool.rejected)
+Gauge("pdf_compiles_in_flight", "Compiles currently running", function=lambda: compile_pool.running)
+Gauge("pdf_compile_queue_depth", "Compiles waiting for a slot", function=lambda: compile_pool.waiting)
+Gauge("pdf_compile_workers", "Compile slots", function=lambda: compile_pool.workers)
+Gauge("pdf_warm_workers_ready", "Warm TeX workers waiting for a document",
+      function=lambda: warm_tex_pool.stats()["ready"])
+Gauge("pdf_ready", "1 once startup warm-up has finished", function=lambda: int(warmup.ready))
+Gauge("pdf_warmup_seconds", "How long startup warm-up took", function=lambda: warmup.seconds or 0)
+Gauge("pdf_jobs_queued", "Generation jobs waiting to run", function=lambda: job_queue.depth())
+
+@router.get("/metrics")
+async def metrics():
+    """Expose stage latencies, cache, compile and queue metrics in the Prometheus text format"""
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,59 +1,472 @@
-from fastapi import APIRouter, HTTPException
-from app.utils.pdf_generator import generate_resume_pdf
-from app.schema.pdf_schema import ResumeRequest
-from app.utils.r2_storage import upload_pdf, delete_pdf
-import os
+from fastapi import APIRouter, Depends, HTTPException, Request, Query, Response
+from fastapi.responses import HTMLResponse
+from pydantic import ValidationError
+from app.utils.pdf_generator import ResumeGenerator
+from app.utils.page_fit import FitResult
+from app.utils.metrics import stage
+from app.schema.pdf_schema import ResumeRequest, BatchResumeRequest, ResumeJobRequest, IncrementalResumeRequest, PreviewRequest
+from app.utils.storage import get_storage
+from app.utils.compile_pool import compile_pool, CompileQueueFull
+from app.utils.admission import admission, BULK, INTERACTIVE
+from app.utils.single_flight import SingleFlight
+from app.utils.pdf_cache import pdf_cache, cache_key, object_key
+from app.utils.warm_tex import warm_tex_pool
+from app.utils.job_queue import JobQueue, public_view
+from app.utils.pdf_lifecycle import pdf_lifecycle
+from app.utils.fragment_cache import fragment_cache, documents, apply_update, RenderedDocument
+from app.utils.preview import (html_preview_layout, page_rasterizer, preview_sessions, preview_dpi,
+                               PreviewSuperseded, PreviewUnavailable)
+from typing import List, Dict, Any, Optional, Literal, Tuple
+import asyncio
 import logging
+import os
+import re
+from app.config import settings
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/pdf", tags=["PDF Generator"])
 
-@router.post("/generate")
-async def generate_resume(request: ResumeRequest):
+# Batch generation limits
+PDF_BATCH_MAX_ITEMS = settings.get_int("PDF_BATCH_MAX_ITEMS", 2000)
+PDF_BATCH_CONCURRENCY = settings.get_int("PDF_BATCH_CONCURRENCY", 0)
+
+# Rate limits and fair queueing of the caller (app.utils.admission)
+admit_interactive = Depends(admission.dependency(INTERACTIVE))
+admit_preview = Depends(admission.dependency(INTERACTIVE, rate_limited=False))
+admit_bulk = Depends(admission.dependency(BULK))
+# Charged per item by the route instead
+admit_batch = Depends(admission.dependency(BULK, rate_limited=False))
+
+# Identical documents requested concurrently (double submits, several tabs) share
+# one compile and one upload, keyed by their content address
+compile_flights = SingleFlight("compile")
+publish_flights = SingleFlight("publish")
+
+def _safe_filename(filename: Optional[str]) -> str:
+    """Filename safe to put in a Content-Disposition header"""
+    name = re.sub(r'[^A-Za-z0-9._-]', '_', os.path.basename(filename or "")) or "resume.pdf"
+    return name if name.lower().endswith(".pdf") else f"{name}.pdf"
+
+def _references(request: ResumeRequest) -> List[Tuple[str, str]]:
+    """(owner_id, resume_id) the request's document becomes the current version of"""
+    if request.owner_id and request.resume_id:
+        return [(request.owner_id, request.resume_id)]
+    return []
+
+# Request fields that make up the resume itself, as opposed to delivery options
+RESUME_FIELDS = {
+    "full_name", "email", "phone_number", "linkedin_url", "github_url", "website_url",
+    "education_entries", "experience_entries", "project_entries", "skill_categories"
+}
+
+def _resume_data(request: ResumeRequest) -> Dict[str, Any]:
+    """The resume fields of a request as plain data, in the form render_latex takes them"""
+    # Convert Pydantic models to dictionaries, handling None values
+    return {
+        "full_name": request.full_name,
+        "email": request.email,
+        "linkedin_url": request.linkedin_url,
+        "github_url": request.github_url,
+        "education_entries": [entry.dict() for entry in request.education_entries] if request.education_entries else [],
+        "experience_entries": [entry.dict() for entry in request.experience_entries] if request.experience_entries else [],
+        "project_entries": [entry.dict() for entry in request.project_entries] if request.project_entries else [],
+        "skill_categories": [category.dict() for category in request.skill_categories] if request.skill_categories else [],
+        "phone_number": request.phone_number,
+        "website_url": request.website_url
+    }
+
+def _render_request(generator: ResumeGenerator, request: ResumeRequest) -> str:
+    """Validate a resume request and render its LaTeX source"""
+    return generator.render_latex(**_resume_data(request), fit_to_page=request.fit_to_page)
+
+async def _build_pdf(generator: ResumeGenerator, latex_content: str, key: str) -> bytes:
+    """Return the PDF bytes for a rendered document from the disk cache, compiling on a miss"""
+    with stage("cache"):
+        pdf_bytes = await pdf_cache.get_pdf(key)
+    if pdf_bytes is None:
+        pdf_bytes = await compile_flights.do(key, lambda: _compile_pdf(generator, latex_content, key))
+    return pdf_bytes
+
+async def _compile_pdf(generator: ResumeGenerator, latex_content: str, key: str) -> bytes:
+    # Compiled by a request that finished just before this one started waiting
+    pdf_bytes = await pdf_cache.get_pdf(key)
+    if pdf_bytes is not None:
+        return pdf_bytes
+    logger.info("Generating PDF with data")
+    # Generate the PDF
+    pdf_bytes, pages = await generator.compile_pdf_with_page_count(latex_content)
+    await pdf_cache.put_pdf(key, pdf_bytes)
+    pdf_cache.remember_pages(key, pages)
+    return pdf_bytes
+
+def _fit_report(fit: FitResult, key: str) -> Dict[str, Any]:
+    """The page fit chosen for a document and, if it was compiled here, its actual page count"""
+    pages = pdf_cache.page_count(key)
+    if fit.fits and pages is not None and pages > 1:
+        logger.warning(f"Document {key} was estimated to fit on one page at level {fit.level} "
+                       f"but came out at {pages} pages")
+    return {**fit._asdict(), "pages": pages}
+
+async def _publish_pdf(generator: ResumeGenerator, latex_content: str, output_filename: str,
+                       references: List[Tuple[str, str]] = ()) -> str:
+    """Return the public URL for a rendered document, compiling and uploading it only if needed"""
+    # Identical documents share one compiled and uploaded PDF
+    key = cache_key(latex_content)
+    with stage("cache"):
+        pdf_url = await pdf_cache.lookup_url(key)
+    if pdf_url:
+        logger.info("PDF found in cache, skipping compile and upload")
+        await pdf_lifecycle.record(object_key(key), references=references)
+        return pdf_url
+    
+    pdf_url, size = await publish_flights.do(key, lambda: _upload_pdf(generator, latex_content, key, output_filename))
+    await pdf_lifecycle.record(object_key(key), size=size, references=references)
+    return pdf_url
+
+async def _upload_pdf(generator: ResumeGenerator, latex_content: str, key: str,
+                      output_filename: str) -> Tuple[str, int]:
+    pdf_bytes = await _build_pdf(generator, latex_content, key)
+    
+    storage = get_storage()
+    logger.info(f"PDF generated successfully, uploading to {storage.name} storage")
+    # Upload the PDF under its content address
+    with stage("upload"):
+        pdf_url = await storage.upload(pdf_bytes, object_key(key), original_filename=output_filename)
+    pdf_cache.remember(key, pdf_url)
+    return pdf_url, len(pdf_bytes)
+
+async def _publish_pdf_when_ready(generator: ResumeGenerator, latex_content: str, output_filename: str,
+                                  references: List[Tuple[str, str]] = ()) -> str:
+    """Like _publish_pdf, but waits for room in the compile queue instead of failing"""
+    while True:
+        try:
+            return await _publish_pdf(generator, latex_content, output_filename, references)
+        except CompileQueueFull as e:
+            await asyncio.sleep(min(e.retry_after, 5))
+
+async def _run_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Job queue handler: generate the resume described by a stored ResumeRequest"""
+    request = ResumeRequest(**payload)
+    generator = ResumeGenerator(engine=request.engine)
+    latex_content = _render_request(generator, request)
+    pdf_url = await _publish_pdf_when_ready(generator, latex_content, request.output_filename,
+                                            _references(request))
+    return {"pdf_url": pdf_url}
+
+job_queue = JobQueue(handler=_run_job)
+
+async def _deliver(generator: ResumeGenerator, data: Dict[str, Any], rendered: RenderedDocument,
+                   request: ResumeRequest, delivery: str, **extra: Any):
+    """
+    Remember a rendered document as the base for later edits, then return its
+    PDF inline or publish it and return its URL
+    """
+    # The document id is the content address shared with the PDF cache
+    document_id = cache_key(rendered.latex_content)
+    documents.put(document_id, data, generator.layout.name, rendered.section_keys, generator.engine)
+    
+    if delivery == "inline":
+        pdf_bytes = await _build_pdf(generator, rendered.latex_content, document_id)
+        logger.info("Resume generation completed successfully, returning PDF inline")
+        headers = {
+            "Content-Disposition": f'inline; filename="{_safe_filename(request.output_filename)}"',
+            "X-Document-Id": document_id
+        }
+        if rendered.fit:
+            report = _fit_report(rendered.fit, document_id)
+            headers["X-Fit-Level"] = report["level"]
+            if report["pages"] is not None:
+                headers["X-Page-Count"] = str(report["pages"])
+        return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
+    
+    pdf_url = await _publish_pdf(generator, rendered.latex_content, request.output_filename, _references(request))
+    if rendered.fit:
+        extra["fit"] = _fit_report(rendered.fit, document_id)
+    
+    logger.info("Resume generation completed successfully")
+    # Return the path to the generated PDF
+    return {"status": "success", "pdf_url": pdf_url, "document_id": document_id, **extra}
+
+@router.post("/generate", dependencies=[admit_interactive])
+async def generate_resume(request: ResumeRequest,
+                          delivery: Literal["url", "inline"] = Query("url")):
+    """
+    Generate a resume PDF
+
+    With ``delivery=url`` (default) the PDF is uploaded and its public URL is
+    returned. With ``delivery=inline`` the PDF bytes are returned directly in
+    the response and nothing is uploaded. Either way the response carries a
+    document id (``X-Document-Id`` header for inline delivery) that later
+    edits can be sent against with /generate/incremental.
+
+    With ``fit_to_page`` the resume is tightened as far as needed to fit on
+    one page and compiled once; the response reports the fit level chosen,
+    the page count pdflatex reported and any bullets that still overflow
+    (``X-Fit-Level`` and ``X-Page-Count`` headers for inline delivery).
+    """
     try:
         logger.info("Received resume generation request")
         
-        # Convert Pydantic models to dictionaries, handling None values
-        education_entries = [entry.dict() for entry in request.education_entries] if request.education_entries else []
-        experience_entries = [entry.dict() for entry in request.experience_entries] if request.experience_entries else []
-        project_entries = [entry.dict() for entry in request.project_entries] if request.project_entries else []
-        skill_categories = [category.dict() for category in request.skill_categories] if request.skill_categories else []
+        generator = ResumeGenerator(engine=request.engine)
+        data = _resume_data(request)
+        rendered = generator.render_document(data, fragment_cache, fit_to_page=request.fit_to_page)
+        return await _deliver(generator, data, rendered, request, delivery)
         
-        logger.info("Generating PDF with data")
-        # Generate the PDF
-        pdf_path = generate_resume_pdf(
-            full_name=request.full_name,
-            phone_number=request.phone_number,
-            email=request.email,
-            linkedin_url=request.linkedin_url,
-            github_url=request.github_url,
-            website_url=request.website_url,
-            education_entries=education_entries,
-            experience_entries=experience_entries,
-            project_entries=project_entries,
-            skill_categories=skill_categories,
-            output_filename=request.output_filename
+    except CompileQueueFull as e:
+        logger.warning(f"Compile queue full, rejecting request (retry after {e.retry_after}s)")
+        raise HTTPException(
+            status_code=503,
+            detail="PDF service is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
         )
+    except Exception as e:
+        logger.error(f"Error generating resume: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate PDF: {str(e)}"
+        )
+
+@router.post("/generate/incremental", dependencies=[admit_interactive])
+async def generate_resume_incremental(update: IncrementalResumeRequest,
+                                      delivery: Literal["url", "inline"] = Query("url")):
+    """
+    Generate a new version of a recently generated resume from a partial update
+
+    Only the sections whose fields were changed are rendered again; the others
+    are reused from the base document. Responds 404 if the base document is no
+    longer known, in which case the full resume has to be sent to /generate.
+    """
+    base = documents.get(update.base_document_id)
+    if base is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Base document not found or expired, generate it again from the full resume"
+        )
+    try:
+        merged, touched = apply_update(base.data, update.changes,
+                                       [(edit.path, edit.value) for edit in update.edits], RESUME_FIELDS)
+        request = ResumeRequest(**merged, output_filename=update.output_filename,
+                                engine=update.engine or base.engine, fit_to_page=update.fit_to_page,
+                                owner_id=update.owner_id, resume_id=update.resume_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    try:
+        logger.info(f"Received incremental generation request touching {', '.join(sorted(touched)) or 'nothing'}")
         
-        logger.info("PDF generated successfully, uploading to R2")
-        # Upload the PDF to R2
-        pdf_url = await upload_pdf(pdf_path)
-        
-        logger.info("Cleaning up local PDF file")
-        # Delete the local PDF file
-        if os.path.exists(pdf_path):
-            os.remove(pdf_path)
-        
-        logger.info("Resume generation completed successfully")
-        # Return the path to the generated PDF
-        return {"status": "success", "pdf_url": pdf_url}
+        generator = ResumeGenerator(layout=base.layout, engine=request.engine)
+        changed = set(generator.layout.sections_reading(touched))
+        unchanged_keys = {section: key for section, key in base.section_keys.items() if section not in changed}
+        data = _resume_data(request)
+        rendered = generator.render_document(data, fragment_cache, unchanged_keys, fit_to_page=request.fit_to_page)
+        return await _deliver(generator, data, rendered, request, delivery,
+                              base_document_id=update.base_document_id, rendered_sections=rendered.rendered)
         
+    except CompileQueueFull as e:
+        logger.warning(f"Compile queue full, rejecting request (retry after {e.retry_after}s)")
+        raise HTTPException(
+            status_code=503,
+            detail="PDF service is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"Error generating resume: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate PDF: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/preview", dependencies=[admit_preview])
+async def preview_resume(preview: PreviewRequest):
+    """
+    Render a quick preview of a resume while it is being edited
+
+    ``format=png`` compiles the resume and returns page 1 as a low-resolution
+    PNG; ``format=html`` skips TeX and returns an HTML approximation. Nothing
+    is uploaded. Requests sharing a ``session_id`` supersede each other: the
+    older request is cancelled and answered with 409.
+    """
+    if preview.format == "png" and not page_rasterizer.available():
+        raise HTTPException(status_code=501, detail="PNG previews are not available on this server, use format=html")
+    
+    async def render():
+        data = _resume_data(preview.resume)
+        if preview.format == "html":
+            return HTMLResponse(fragment_cache.render(html_preview_layout, data).latex_content,
+                                headers={"Cache-Control": "no-store"})
+        
+        generator = ResumeGenerator(engine=preview.resume.engine)
+        latex_content = generator.render_document(data, fragment_cache,
+                                                  fit_to_page=preview.resume.fit_to_page).latex_content
+        key = cache_key(latex_content)
+        dpi = preview_dpi(preview.dpi)
+        image = page_rasterizer.cached(key, dpi)
+        if image is None:
+            pdf_bytes = await _build_pdf(generator, latex_content, key)
+            with stage("rasterize"):
+                image = await page_rasterizer.rasterize(key, pdf_bytes, dpi)
+        return Response(content=image, media_type="image/png", headers={"Cache-Control": "no-store"})
+    
+    try:
+        return await preview_sessions.run(preview.session_id, preview.format, render)
+    except PreviewSuperseded:
+        raise HTTPException(status_code=409, detail="Preview superseded by a newer request")
+    except PreviewUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except CompileQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF service is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except Exception as e:
+        logger.error(f"Error rendering preview: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to render preview: {str(e)}")
+
+@router.post("/fit")
+async def estimate_fit(request: ResumeRequest):
+    """
+    Estimate how a resume fits on one page, without compiling it
+
+    Returns the fit level /generate would use with ``fit_to_page`` and, if the
+    resume does not fit even at the tightest level, the bullets and lines that
+    overflow as edit paths for /generate/incremental.
+    """
+    try:
+        generator = ResumeGenerator(engine=request.engine)
+        return {"fit": generator.fit_to_page(_resume_data(request))._asdict()}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _validation_message(error: ValidationError) -> str:
+    """One line naming each invalid field of a request, for per-item results"""
+    return "; ".join(f"{'.'.join(str(part) for part in detail['loc']) or 'item'}: {detail['msg']}"
+                     for detail in error.errors())
+
+@router.post("/generate/batch")
+async def generate_resume_batch(batch: BatchResumeRequest, caller: str = admit_batch):
+    """
+    Generate many resumes in one call
+
+    Items are validated and rendered up front, identical documents are compiled
+    and uploaded once, and the remaining work is spread over the compile pool.
+    Every item gets its own result, so one bad item does not fail the batch.
+    """
+    if len(batch.items) > PDF_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.items)} items, maximum is {PDF_BATCH_MAX_ITEMS}"
+        )
+    # Every item counts against the caller's rate limit, as a /generate call would
+    await admission.check_rate(caller, cost=max(1, len(batch.items)))
+    logger.info(f"Received batch generation request with {len(batch.items)} items")
+    
+    generators: Dict[Optional[str], ResumeGenerator] = {}
+    results: List[Dict[str, Any]] = [{"index": i} for i in range(len(batch.items))]
+    unique_documents: Dict[str, Dict[str, Any]] = {}
+    
+    for i, fields in enumerate(batch.items):
+        try:
+            item = ResumeRequest(**fields)
+        except ValidationError as e:
+            results[i].update(status="error", error=_validation_message(e))
+            continue
+        try:
+            if item.engine not in generators:
+                generators[item.engine] = ResumeGenerator(engine=item.engine)
+            generator = generators[item.engine]
+            latex_content = _render_request(generator, item)
+        except Exception as e:
+            results[i].update(status="error", error=str(e))
+            continue
+        document = unique_documents.setdefault(cache_key(latex_content), {
+            "generator": generator,
+            "latex_content": latex_content,
+            "output_filename": item.output_filename,
+            "indices": [],
+            "references": []
+        })
+        document["indices"].append(i)
+        document["references"] += _references(item)
+        # Let other requests run while a large batch renders
+        if i % 50 == 49:
+            await asyncio.sleep(0)
+    
+    # Keep at most one compile per worker in flight for this batch so it queues
+    # behind its own items instead of filling the shared compile queue
+    limiter = asyncio.Semaphore(PDF_BATCH_CONCURRENCY or compile_pool.workers)
+    
+    async def publish(document: Dict[str, Any]) -> str:
+        async with limiter:
+            return await _publish_pdf_when_ready(document["generator"], document["latex_content"], document["output_filename"],
+                                                 document["references"])
+    
+    outcomes = await asyncio.gather(
+        *(publish(document) for document in unique_documents.values()),
+        return_exceptions=True
+    )
+    
+    for document, outcome in zip(unique_documents.values(), outcomes):
+        for i in document["indices"]:
+            if isinstance(outcome, BaseException):
+                results[i].update(status="error", error=str(getattr(outcome, "detail", outcome)))
+            else:
+                results[i].update(status="success", pdf_url=outcome)
+    
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    failed = len(results) - succeeded
+    logger.info(f"Batch generation completed: {succeeded} succeeded, {failed} failed")
+    return {
+        "status": "success" if not failed else ("failed" if not succeeded else "partial"),
+        "succeeded": succeeded,
+        "failed": failed,
+        "unique_documents": len(unique_documents),
+        "results": results
+    }
+
+@router.post("/jobs", status_code=202)
+async def create_job(job_request: ResumeJobRequest, http_request: Request, caller: str = admit_bulk):
+    """
+    Queue a resume for generation and return immediately
+
+    Poll the returned status_url, or pass callback_url to receive the final job
+    status as a JSON POST when it finishes.
+    """
+    try:
+        job = await job_queue.submit(
+            job_request.resume.dict(),
+            priority=job_request.priority,
+            callback_url=job_request.callback_url,
+            caller=caller
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(f"Queued generation job {job['id']}")
+    return {**public_view(job), "status_url": str(http_request.url_for("get_job", job_id=job["id"]))}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return the status of a queued generation job and its result once finished"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return public_view(job)
+
+@router.get("/queue")
+async def compile_queue_stats():
+    """Report compile slot usage, queue depth, queue wait times, warm workers, previews, rate limits and coalescing"""
+    return {**compile_pool.stats(), "warm_workers": warm_tex_pool.stats(), "jobs_queued": job_queue.depth(),
+            "previews": preview_sessions.stats(), "admission": admission.stats(),
+            "coalesced": {"compile": compile_flights.coalesced, "publish": publish_flights.coalesced}}
+
+@router.get("/cache")
+async def pdf_cache_stats():
+    """Report PDF cache hits per tier and disk usage, and reuse of rendered sections"""
+    return {**pdf_cache.stats(), "fragments": fragment_cache.stats(), "documents": documents.stats()}
+
+@router.get("/storage")
+async def pdf_storage_stats():
+    """Report the storage backend, its upload, lookup and delete latencies, and cleanup of old PDFs"""
+    return {**get_storage().stats(), "lifecycle": await pdf_lifecycle.stats()}
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional, Dict, Literal
 
 class EducationEntry(BaseModel):
     institution: str
@@ -46,3 +46,50 @@ class ResumeRequest(BaseModel):
     skill_categories: Optional[List[SkillCategory]] = None
     
     output_filename: Optional[str] = "resume.pdf"
+    # Rendering engine, defaults to PDF_ENGINE: "latex" (pdflatex) or "direct" (in-process, no TeX)
+    engine: Optional[Literal["latex", "direct"]] = None
+    # Tighten spacing, margins and font size as needed to fit on one page
+    fit_to_page: bool = False
+    
+    # Who the document belongs to; a new version replaces the previous one
+    # and lets it be cleaned up from storage
+    owner_id: Optional[str] = None
+    resume_id: Optional[str] = None
+
+class ResumeEdit(BaseModel):
+    # Slash-separated path into the resume, e.g. "experience_entries/0/responsibilities/2"
+    path: str
+    value: Any
+
+class IncrementalResumeRequest(BaseModel):
+    # document_id returned when the base document was generated
+    base_document_id: str
+    # Top-level resume fields to replace
+    changes: Dict[str, Any] = {}
+    # Finer-grained edits, applied after changes
+    edits: List[ResumeEdit] = []
+    
+    output_filename: Optional[str] = "resume.pdf"
+    # Defaults to the engine the base document was rendered with
+    engine: Optional[Literal["latex", "direct"]] = None
+    fit_to_page: bool = False
+    owner_id: Optional[str] = None
+    resume_id: Optional[str] = None
+
+class PreviewRequest(BaseModel):
+    resume: ResumeRequest
+    # Requests with the same session id supersede each other
+    session_id: Optional[str] = None
+    format: Literal["png", "html"] = "png"
+    # Resolution of the PNG preview, clamped to PDF_PREVIEW_MAX_DPI
+    dpi: Optional[int] = None
+
+class BatchResumeRequest(BaseModel):
+    # Validated one by one as ResumeRequest, so an invalid item fails on its own
+    items: List[Dict[str, Any]]
+
+class ResumeJobRequest(BaseModel):
+    resume: ResumeRequest
+    # Lower values run first
+    priority: int = Field(5, ge=0, le=9)
+    callback_url: Optional[str] = None
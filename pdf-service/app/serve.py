@@ -0,0 +1,91 @@
+"""
+Run the PDF service, with one worker process per core by default.
+
+    python -m app.serve
+
+Workers share the listening socket, the on-disk PDF cache, the LaTeX format
+directory, the SQLite job and lifecycle databases and, through
+PDF_DOCUMENT_DIR, the documents partial updates are rendered against. On
+SIGTERM or SIGINT each worker stops accepting requests, lets in-flight
+requests, jobs and compiles finish for up to PDF_SHUTDOWN_TIMEOUT seconds and
+removes its compile directories.
+"""
+import os
+import sys
+import logging
+
+if not __package__:
+    # Started as a script, e.g. by pm2: make the app package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.utils.log_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+PDF_HOST = settings.get("PDF_HOST", "0.0.0.0")
+PDF_PORT = settings.get_int("PDF_PORT", 8501)
+# Worker processes; "auto" runs one per core available to the service
+PDF_WEB_WORKERS = settings.get("PDF_WEB_WORKERS", "auto")
+# Seconds in-flight requests, jobs and compiles get to finish on shutdown
+PDF_SHUTDOWN_TIMEOUT = settings.get_float("PDF_SHUTDOWN_TIMEOUT", 30)
+
+
+def available_cores() -> int:
+    """Cores this process may run on, which respects CPU pinning of the container"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count(setting: str = PDF_WEB_WORKERS, cores: int = 0) -> int:
+    """Number of worker processes for a PDF_WEB_WORKERS setting"""
+    if setting.strip().lower() in ("", "auto"):
+        return cores or available_cores()
+    return max(1, int(setting))
+
+
+def configure_workers(workers: int, cores: int) -> None:
+    """
+    Set defaults the workers read on import, unless they are configured explicitly
+
+    Compile slots and warm TeX workers are per process, so the cores are split
+    between the workers instead of every worker assuming the whole machine.
+    """
+    slots = max(1, cores // workers)
+    os.environ.setdefault("PDF_COMPILE_WORKERS", str(slots))
+    os.environ.setdefault("WARM_TEX_WORKERS", str(min(2, slots)))
+    if workers > 1:
+        cache_dir = settings.get("PDF_CACHE_DIR", os.path.join(os.getcwd(), "pdf_cache"))
+        os.environ.setdefault("PDF_DOCUMENT_DIR", os.path.join(cache_dir, "documents"))
+        if settings.get("PDF_JOB_STORE", "sqlite") == "memory":
+            logger.warning("PDF_JOB_STORE=memory keeps jobs per worker; use sqlite with several workers")
+        if settings.get_float("PDF_RATE_LIMIT_PER_MINUTE", 0) > 0 and \
+                settings.get("PDF_RATE_LIMIT_STORE", "memory") == "memory":
+            logger.warning("PDF_RATE_LIMIT_STORE=memory keeps rate limits per worker; use sqlite to share them")
+
+
+def main() -> None:
+    # Imported here so that importing this module for its settings stays cheap
+    import uvicorn
+
+    configure_logging()
+    cores = available_cores()
+    workers = worker_count(PDF_WEB_WORKERS, cores)
+    configure_workers(workers, cores)
+    logger.info(f"Starting {workers} workers on {cores} cores, "
+                f"{os.environ['PDF_COMPILE_WORKERS']} compile slots each")
+    uvicorn.run(
+        "app.main:app",
+        host=PDF_HOST,
+        port=PDF_PORT,
+        workers=workers,
+        timeout_graceful_shutdown=PDF_SHUTDOWN_TIMEOUT,
+        app_dir=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+
+if __name__ == "__main__":
+    main()
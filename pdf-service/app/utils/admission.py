@@ -0,0 +1,272 @@
+import os
+import abc
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+from fastapi import HTTPException, Request
+from app.config import settings
+from app.utils.log_config import fingerprint
+from app.utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+
+# Token bucket per caller: sustained generation requests per minute and the burst on top; 0 disables.
+# Off by default, like PDF_CALLER_MAX_CONCURRENT: callers are told apart by PDF_CALLER_HEADER or their
+# address, so behind a backend that sends neither per user, all users would share one limit
+PDF_RATE_LIMIT_PER_MINUTE = settings.get_float("PDF_RATE_LIMIT_PER_MINUTE", 0)
+PDF_RATE_LIMIT_BURST = settings.get_float("PDF_RATE_LIMIT_BURST", 20)
+# "memory" keeps buckets per process; "sqlite" shares them between the workers of a host
+PDF_RATE_LIMIT_STORE = settings.get("PDF_RATE_LIMIT_STORE", "memory")
+PDF_RATE_LIMIT_DB_PATH = settings.get("PDF_RATE_LIMIT_DB_PATH", os.path.join(os.getcwd(), "pdf_rate_limits.sqlite3"))
+# Buckets kept in memory; the least recently used are dropped beyond this
+PDF_RATE_LIMIT_MAX_CALLERS = settings.get_int("PDF_RATE_LIMIT_MAX_CALLERS", 100000)
+# Requests one caller may have in flight in this process; 0 disables
+PDF_CALLER_MAX_CONCURRENT = settings.get_int("PDF_CALLER_MAX_CONCURRENT", 0)
+# Header identifying the caller, e.g. the main service's per-tenant API key; callers
+# without it are identified by address
+PDF_CALLER_HEADER = settings.get("PDF_CALLER_HEADER", "X-API-Key")
+# Take the caller's address from X-Forwarded-For; only behind a proxy that sets it
+PDF_TRUST_FORWARDED_FOR = settings.get_bool("PDF_TRUST_FORWARDED_FOR", False)
+
+# Priority classes of compile work: a person waiting on one resume, or batches and jobs
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+rejected_requests = Counter("pdf_requests_rejected_total", "Requests turned away by admission control, by reason",
+                            ("reason",))
+
+# (caller, priority class) of the work being done, read by the compile pool's scheduler
+_current_admission: ContextVar[Optional[Tuple[str, str]]] = ContextVar("pdf_admission", default=None)
+
+
+def current_admission() -> Tuple[str, str]:
+    """Caller and priority class of the current request or job; unknown work counts as interactive"""
+    return _current_admission.get() or ("-", INTERACTIVE)
+
+
+@contextmanager
+def admission_context(caller: str, priority: str) -> Iterator[None]:
+    """Attribute the compiles started inside the block to ``caller`` and ``priority``"""
+    token = _current_admission.set((caller, priority))
+    try:
+        yield
+    finally:
+        _current_admission.reset(token)
+
+
+class RateLimitStore(abc.ABC):
+    """Token buckets by caller"""
+
+    # Whether take() does I/O, and so is run in a thread rather than on the event loop
+    blocking = False
+
+    @abc.abstractmethod
+    def take(self, caller: str, cost: float, rate: float, burst: float, now: float) -> Tuple[bool, float]:
+        """
+        Take ``cost`` tokens from the caller's bucket if it holds that many
+
+        A cost above ``burst`` (a large batch) is taken from a full bucket and
+        leaves it in debt, so the caller waits for the refill afterwards.
+
+        Returns:
+        --------
+        Tuple[bool, float]
+            Whether the tokens were taken, and the tokens left (or available, if not taken)
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    def __init__(self, max_callers: int = PDF_RATE_LIMIT_MAX_CALLERS):
+        self.max_callers = max_callers
+        # caller -> (tokens, updated_at), least recently used first
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, caller: str, cost: float, rate: float, burst: float, now: float) -> Tuple[bool, float]:
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(caller, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            taken = tokens >= min(cost, burst)
+            if taken:
+                tokens -= cost
+            self._buckets[caller] = (tokens, now)
+            if len(self._buckets) > self.max_callers:
+                self._buckets.popitem(last=False)
+        return taken, tokens
+
+
+class SqliteRateLimitStore(RateLimitStore):
+    """Token buckets in a local SQLite file, shared by the worker processes of a host"""
+
+    blocking = True
+
+    def __init__(self, path: str = PDF_RATE_LIMIT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._takes = 0
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS pdf_rate_limits (
+                    caller TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+
+    def take(self, caller: str, cost: float, rate: float, burst: float, now: float) -> Tuple[bool, float]:
+        with self._lock, self._conn:
+            # Refill and take in one statement, so workers racing for the same bucket cannot both win
+            row = self._conn.execute(
+                """INSERT INTO pdf_rate_limits (caller, tokens, updated_at) VALUES (?, ?, ?)
+                   ON CONFLICT (caller) DO UPDATE SET
+                       tokens = MIN(?, tokens + MAX(0, ? - updated_at) * ?) - ?, updated_at = ?
+                   WHERE MIN(?, tokens + MAX(0, ? - updated_at) * ?) >= ?
+                   RETURNING tokens""",
+                (caller, burst - cost, now, burst, now, rate, cost, now, burst, now, rate, min(cost, burst))
+            ).fetchone()
+            if row is not None:
+                taken, tokens = True, row[0]
+            else:
+                tokens, updated_at = self._conn.execute(
+                    "SELECT tokens, updated_at FROM pdf_rate_limits WHERE caller = ?", (caller,)
+                ).fetchone()
+                taken, tokens = False, min(burst, tokens + max(0.0, now - updated_at) * rate)
+            self._takes += 1
+            if self._takes % 1000 == 0:
+                # Buckets idle long enough to be full again carry no state
+                self._conn.execute("DELETE FROM pdf_rate_limits WHERE updated_at < ?", (now - burst / rate,))
+        return taken, tokens
+
+
+def create_rate_limit_store(kind: str = PDF_RATE_LIMIT_STORE) -> RateLimitStore:
+    """Build the configured rate limit store backend"""
+    if kind == "memory":
+        return MemoryRateLimitStore()
+    if kind == "sqlite":
+        return SqliteRateLimitStore()
+    raise ValueError(f"Unknown rate limit store: {kind}")
+
+
+class AdmissionControl:
+    """
+    Admission of generation requests: who may start work, and at which priority.
+
+    Every caller gets a token bucket of ``burst`` requests refilled at
+    ``per_minute`` a minute, and may have at most ``max_concurrent`` requests
+    in flight in this process; beyond either limit requests are answered 429
+    with Retry-After before any work is done. Both limits are off unless
+    configured, and only make sense when callers identify their end users
+    through ``PDF_CALLER_HEADER``. Admitted requests carry their
+    caller and priority class to the compile pool, which serves interactive
+    work first and takes turns between callers, so one caller's burst does
+    not hold up everyone else. The global cap on concurrent compiles is the
+    compile pool itself (PDF_COMPILE_WORKERS).
+    """
+
+    def __init__(self, per_minute: float = PDF_RATE_LIMIT_PER_MINUTE, burst: float = PDF_RATE_LIMIT_BURST,
+                 max_concurrent: int = PDF_CALLER_MAX_CONCURRENT, store: Optional[RateLimitStore] = None):
+        self.rate = per_minute / 60
+        self.burst = max(1.0, burst)
+        self.max_concurrent = max_concurrent
+        self.store = store
+        self._in_flight: Dict[str, int] = {}
+
+    def _ensure_store(self) -> RateLimitStore:
+        if self.store is None:
+            self.store = create_rate_limit_store()
+        return self.store
+
+    @staticmethod
+    def caller_id(request: Request) -> str:
+        """The caller's API key (hashed) if it sends one, otherwise its address"""
+        key = request.headers.get(PDF_CALLER_HEADER)
+        if key:
+            return f"key:{fingerprint(key)}"
+        forwarded = request.headers.get("X-Forwarded-For") if PDF_TRUST_FORWARDED_FOR else None
+        if forwarded:
+            return f"ip:{forwarded.split(',')[0].strip()}"
+        return f"ip:{request.client.host if request.client else '-'}"
+
+    async def check_rate(self, caller: str, cost: float = 1.0) -> None:
+        """Take ``cost`` tokens for the caller, e.g. one per item of a batch, or raise HTTPException 429"""
+        if self.rate <= 0:
+            return
+        store = self._ensure_store()
+        if store.blocking:
+            taken, tokens = await asyncio.to_thread(store.take, caller, cost, self.rate, self.burst, time.time())
+        else:
+            taken, tokens = store.take(caller, cost, self.rate, self.burst, time.time())
+        if not taken:
+            retry_after = max(1, int((min(cost, self.burst) - tokens) / self.rate + 0.999))
+            rejected_requests.inc(reason="rate_limit")
+            logger.warning(f"Rate limit exceeded by {caller}, retry after {retry_after}s")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many PDF requests, please retry later",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+    @contextmanager
+    def in_flight(self, caller: str) -> Iterator[None]:
+        """Count a request of the caller for the block, or raise HTTPException 429 if it has too many"""
+        count = self._in_flight.get(caller, 0)
+        if self.max_concurrent > 0 and count >= self.max_concurrent:
+            rejected_requests.inc(reason="concurrency")
+            logger.warning(f"{caller} already has {count} requests in flight")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many PDF requests in flight, wait for the previous ones to finish",
+                headers={"Retry-After": "1"}
+            )
+        self._in_flight[caller] = count + 1
+        try:
+            yield
+        finally:
+            if self._in_flight[caller] <= 1:
+                del self._in_flight[caller]
+            else:
+                self._in_flight[caller] -= 1
+
+    def dependency(self, priority: str, rate_limited: bool = True):
+        """
+        FastAPI dependency admitting a request at ``priority``
+
+        Parameters:
+        -----------
+        priority : str
+            INTERACTIVE or BULK
+        rate_limited : bool, optional
+            Take a token from the caller's bucket. Previews are only capped on
+            concurrency: they are debounced and superseded per session instead.
+            Routes whose cost depends on the body (batches) call ``check_rate``
+            themselves with the caller this dependency yields.
+        """
+        async def admit(request: Request):
+            caller = self.caller_id(request)
+            if rate_limited:
+                await self.check_rate(caller)
+            with self.in_flight(caller), admission_context(caller, priority):
+                yield caller
+
+        return admit
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "per_minute": self.rate * 60,
+            "burst": self.burst,
+            "max_concurrent": self.max_concurrent,
+            "callers_in_flight": len(self._in_flight),
+        }
+
+
+admission = AdmissionControl()
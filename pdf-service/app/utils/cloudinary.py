@@ -1,78 +1,124 @@
-import cloudinary
 import os
-from cloudinary.uploader import upload
+import io
+import asyncio
+import threading
 from fastapi import HTTPException, status, UploadFile
-from dotenv import load_dotenv
-from typing import List, Union
+from typing import Union, Optional
 import logging
+from app.config import settings
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+CLOUDINARY_CLOUD_NAME = settings.get("CLOUDINARY_CLOUD_NAME")
+CLOUDINARY_API_KEY = settings.get("CLOUDINARY_API_KEY")
+CLOUDINARY_API_SECRET = settings.get("CLOUDINARY_API_SECRET")
 
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
+_configured = False
+_config_lock = threading.Lock()
 
-async def upload_pdf(pdf: Union[str, UploadFile]) -> str:
+def _sdk():
+    """Import and configure the Cloudinary SDK on first use"""
+    global _configured
+    import cloudinary
+    import cloudinary.api
+    import cloudinary.uploader
+    with _config_lock:
+        if not _configured:
+            cloudinary.config(
+                cloud_name=CLOUDINARY_CLOUD_NAME,
+                api_key=CLOUDINARY_API_KEY,
+                api_secret=CLOUDINARY_API_SECRET
+            )
+            _configured = True
+    return cloudinary
+
+def _public_id(object_key: str) -> str:
+    return os.path.splitext(object_key)[0]
+
+def get_public_url(object_key: str) -> str:
+    """URL that serves an uploaded PDF for viewing"""
+    # Format: https://res.cloudinary.com/{cloud_name}/pdf/upload/fl_attachment/{public_id}.pdf
+    return f"https://res.cloudinary.com/{CLOUDINARY_CLOUD_NAME}/pdf/upload/fl_attachment/{_public_id(object_key)}.pdf"
+
+async def upload_pdf(pdf: Union[str, bytes, UploadFile], object_key: Optional[str] = None) -> str:
     """
     Upload a PDF file to Cloudinary and return a URL that can be used to view the PDF
-    
+
     Parameters:
     -----------
-    pdf : Union[str, UploadFile]
-        Either a file path (str) or an UploadFile object
-        
+    pdf : Union[str, bytes, UploadFile]
+        A file path (str), the PDF contents (bytes) or an UploadFile object
+    object_key : str, optional
+        Key to store the object under. Defaults to a Cloudinary-assigned id.
+
     Returns:
     --------
     str
         The secure URL of the uploaded PDF that can be viewed in a browser
     """
     try:
-        
         upload_options = {
-            # "resource_type": "pdf",  
-            "format": "pdf",           
+            "format": "pdf",
         }
+        if object_key:
+            upload_options.update(public_id=_public_id(object_key), overwrite=True)
 
         if isinstance(pdf, str):
             # If pdf is a file path
             logger.info(f"Uploading PDF from path: {pdf}")
-            upload_result = upload(pdf, **upload_options)
+            source = pdf
+        elif isinstance(pdf, bytes):
+            # If pdf is already in memory
+            logger.info(f"Uploading PDF from memory ({len(pdf)} bytes)")
+            source = io.BytesIO(pdf)
         else:
             # If pdf is an UploadFile object
             logger.info(f"Uploading PDF from UploadFile: {pdf.filename}")
-            # Save the file temporarily
-            temp_path = f"temp_{pdf.filename}"
-            try:
-                with open(temp_path, "wb") as buffer:
-                    content = await pdf.read()
-                    buffer.write(content)
-                upload_result = upload(temp_path, **upload_options)
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-        
-        # Get the necessary information from the upload result
-        public_id = upload_result['public_id']
-        version = upload_result.get('version', '')
-        
+            source = io.BytesIO(await pdf.read())
+
+        cloudinary = _sdk()
+        upload_result = await asyncio.to_thread(cloudinary.uploader.upload, source, **upload_options)
+
         # Create a properly formatted URL for PDF viewing
-        # Format: https://res.cloudinary.com/{cloud_name}/pdf/upload/fl_attachment/{public_id}.pdf
-        cloud_name = os.getenv("CLOUDINARY_CLOUD_NAME")
-        file_url = f"https://res.cloudinary.com/{cloud_name}/pdf/upload/fl_attachment/{public_id}.pdf"
-        
+        file_url = get_public_url(upload_result['public_id'])
+
         logger.info(f"PDF uploaded successfully. URL: {file_url}")
         return file_url
-        
+
     except Exception as e:
         logger.error(f"Error uploading PDF: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error uploading PDF: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+async def pdf_exists(object_key: str) -> bool:
+    """True if a PDF with this key has been uploaded to Cloudinary"""
+    try:
+        cloudinary = _sdk()
+        await asyncio.to_thread(cloudinary.api.resource, _public_id(object_key))
+        return True
+    except Exception as e:
+        if type(e).__name__ != "NotFound":
+            logger.warning(f"Error checking PDF in Cloudinary: {str(e)}")
+        return False
+
+async def reachable() -> bool:
+    """True if the Cloudinary API answers with the configured credentials"""
+    try:
+        cloudinary = _sdk()
+        await asyncio.to_thread(cloudinary.api.ping)
+        return True
+    except Exception as e:
+        logger.warning(f"Cloudinary is not reachable: {str(e)}")
+        return False
+
+async def delete_pdf(object_key: str) -> bool:
+    """Delete an uploaded PDF from Cloudinary, returning True on success"""
+    try:
+        cloudinary = _sdk()
+        result = await asyncio.to_thread(cloudinary.uploader.destroy, _public_id(object_key))
+        return result.get("result") == "ok"
+    except Exception as e:
+        logger.error(f"Error deleting PDF from Cloudinary: {str(e)}")
+        return False
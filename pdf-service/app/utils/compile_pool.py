@@ -0,0 +1,358 @@
+import asyncio
+import os
+import re
+import time
+import shutil
+import tempfile
+import math
+import logging
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple, Dict, Any
+from app.utils.metrics import record_stage
+from app.utils.admission import BULK, INTERACTIVE, current_admission
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Compile pool configuration
+COMPILE_WORKERS = settings.get_int("PDF_COMPILE_WORKERS", os.cpu_count() or 1)
+COMPILE_QUEUE_SIZE = settings.get_int("PDF_COMPILE_QUEUE_SIZE", 32)
+COMPILE_TIMEOUT = settings.get_float("PDF_COMPILE_TIMEOUT", 30)
+# Slots bulk work (batches and jobs) may never take, kept free for interactive requests
+COMPILE_INTERACTIVE_RESERVED = settings.get_int("PDF_COMPILE_INTERACTIVE_RESERVED", 0)
+# While both are waiting, every Nth free slot goes to bulk work so it is not starved; 0 never
+COMPILE_BULK_EVERY = settings.get_int("PDF_COMPILE_BULK_EVERY", 4)
+# Where compile working directories are created, e.g. /dev/shm. Defaults to the system temp dir.
+COMPILE_TEMP_DIR = settings.get("PDF_COMPILE_TEMP_DIR") or None
+
+# Compile working directories are named "pdf-<kind>-<pid>-..." so that directories
+# left behind by a worker that was killed can be told apart from live ones
+_temp_dir_name = re.compile(r"^pdf-[a-z-]+?-(\d+)-")
+
+
+def compile_temp_dir(kind: str = "compile") -> str:
+    """Create a working directory for a compile, tagged with this process id"""
+    return tempfile.mkdtemp(prefix=f"pdf-{kind}-{os.getpid()}-", dir=COMPILE_TEMP_DIR)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def remove_orphaned_temp_dirs() -> int:
+    """
+    Remove compile working directories of processes that no longer run
+
+    A worker that shuts down cleanly removes its own; this catches those of a
+    worker that was killed mid-compile. Returns how many were removed.
+    """
+    temp_dir = COMPILE_TEMP_DIR or tempfile.gettempdir()
+    removed = 0
+    try:
+        names = os.listdir(temp_dir)
+    except OSError:
+        return 0
+    for name in names:
+        match = _temp_dir_name.match(name)
+        if match and int(match.group(1)) != os.getpid() and not _process_alive(int(match.group(1))):
+            shutil.rmtree(os.path.join(temp_dir, name), ignore_errors=True)
+            removed += 1
+    if removed:
+        logger.info(f"Removed {removed} compile directories left by stopped workers")
+    return removed
+
+
+class CompileQueueFull(Exception):
+    """Raised when every compile slot is busy and the wait queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("PDF compile queue is full")
+        self.retry_after = retry_after
+
+
+class CompileTimeout(Exception):
+    """Raised when a compile runs past its timeout and has been killed"""
+
+
+class CompilePool:
+    """
+    Bounded pool of compile slots shared by every request in the process.
+
+    At most ``workers`` subprocesses run at once; up to ``queue_size`` callers
+    may wait for a slot, anything beyond that is rejected with CompileQueueFull
+    so the caller can answer 503 instead of piling up on the event loop.
+
+    Waiting callers are served by fair queueing rather than in arrival order:
+    interactive work before bulk work (except every ``bulk_every``-th slot,
+    so bulk is not starved), and within a class one waiter per caller in
+    turn, so a caller with many queued compiles does not hold up the others.
+    ``interactive_reserved`` slots are never given to bulk work. The caller
+    and class come from the admission context of the request or job.
+    """
+
+    def __init__(self, workers: int = COMPILE_WORKERS,
+                 queue_size: int = COMPILE_QUEUE_SIZE,
+                 timeout: float = COMPILE_TIMEOUT,
+                 interactive_reserved: int = COMPILE_INTERACTIVE_RESERVED,
+                 bulk_every: int = COMPILE_BULK_EVERY):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        # At least one slot stays usable by bulk work
+        self.bulk_slots = max(1, self.workers - max(0, interactive_reserved))
+        self.bulk_every = max(0, bulk_every)
+        self._free = self.workers
+        self._held = {INTERACTIVE: 0, BULK: 0}
+        # Priority class -> caller -> waiters, callers in turn order
+        self._waiters: Dict[str, "OrderedDict[str, deque]"] = {INTERACTIVE: OrderedDict(), BULK: OrderedDict()}
+        # Interactive slots handed out in a row while bulk work was waiting
+        self._interactive_streak = 0
+
+        # Live state and counters
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+        self._recent_durations = deque(maxlen=50)
+        # When each slot in use was taken
+        self._held_since: List[float] = []
+
+    def _average_duration(self) -> float:
+        if not self._recent_durations:
+            return 2.0
+        return sum(self._recent_durations) / len(self._recent_durations)
+
+    @property
+    def free_slots(self) -> int:
+        return self._free
+
+    def busy_for(self) -> float:
+        """Seconds every slot has been in use without one being released; 0 while a slot is free"""
+        if self.running < self.workers or not self._held_since:
+            return 0.0
+        return time.monotonic() - max(self._held_since)
+
+    def recent_p95(self) -> Optional[float]:
+        """95th percentile in seconds of the recent compiles, or None before the first one"""
+        if not self._recent_durations:
+            return None
+        recent = sorted(self._recent_durations)
+        return recent[min(len(recent) - 1, int(0.95 * len(recent)))]
+
+    def retry_after(self) -> int:
+        """Estimate in seconds until a queued job would get a slot"""
+        rounds = self.waiting / self.workers + 1
+        return max(1, math.ceil(rounds * self._average_duration()))
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one compile slot for the duration of the block
+
+        Raises CompileQueueFull immediately if every slot is busy and the wait
+        queue is full. Used by ``run`` and by callers that drive their own TeX
+        process, such as the warm worker pool.
+        """
+        caller, priority = current_admission()
+        if self.waiting >= self.queue_size and not self._can_start(priority):
+            self.rejected += 1
+            raise CompileQueueFull(self.retry_after())
+
+        self.waiting += 1
+        enqueued_at = time.monotonic()
+        try:
+            await self._acquire(caller, priority)
+        finally:
+            self.waiting -= 1
+
+        wait = time.monotonic() - enqueued_at
+        record_stage("queue", wait)
+        self.last_wait = wait
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+        self.running += 1
+        started_at = time.monotonic()
+        self._held_since.append(started_at)
+        try:
+            yield
+        except CompileTimeout:
+            self.timed_out += 1
+            raise
+        finally:
+            self.running -= 1
+            self._held_since.remove(started_at)
+            self.completed += 1
+            self._recent_durations.append(time.monotonic() - started_at)
+            self._release(priority)
+
+    def _can_start(self, priority: str) -> bool:
+        return self._free > 0 and (priority != BULK or self._held[BULK] < self.bulk_slots)
+
+    async def _acquire(self, caller: str, priority: str) -> None:
+        if self._can_start(priority):
+            self._grant(priority)
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[priority].setdefault(caller, deque()).append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as it was cancelled: pass it on
+                self._release(priority)
+            else:
+                queue = self._waiters[priority].get(caller)
+                if queue is not None and waiter in queue:
+                    queue.remove(waiter)
+                    if not queue:
+                        del self._waiters[priority][caller]
+            raise
+
+    def _grant(self, priority: str) -> None:
+        self._free -= 1
+        self._held[priority] += 1
+
+    def _release(self, priority: str) -> None:
+        self._held[priority] -= 1
+        self._free += 1
+        while self._free > 0:
+            next_priority = self._next_priority()
+            if next_priority is None:
+                break
+            waiter = self._next_waiter(next_priority)
+            if waiter is not None:
+                self._grant(next_priority)
+                waiter.set_result(None)
+
+    def _next_priority(self) -> Optional[str]:
+        """Class of the waiter to hand the next free slot to, or None if nobody can take it"""
+        interactive = bool(self._waiters[INTERACTIVE])
+        bulk = bool(self._waiters[BULK]) and self._can_start(BULK)
+        if interactive and bulk and self.bulk_every and self._interactive_streak >= self.bulk_every - 1:
+            self._interactive_streak = 0
+            return BULK
+        if interactive:
+            if bulk:
+                self._interactive_streak += 1
+            return INTERACTIVE
+        return BULK if bulk else None
+
+    def _next_waiter(self, priority: str) -> Optional[asyncio.Future]:
+        """Next waiter of the class, taking callers in turn; None if only cancelled waiters were left"""
+        waiters = self._waiters[priority]
+        while waiters:
+            caller, queue = next(iter(waiters.items()))
+            waiter = queue.popleft()
+            del waiters[caller]
+            if queue:
+                # The caller's next waiter goes to the back of the line
+                waiters[caller] = queue
+            if not waiter.done():
+                return waiter
+        return None
+
+    async def run(self, args: List[str], cwd: Optional[str] = None,
+                  timeout: Optional[float] = None,
+                  env: Optional[Dict[str, str]] = None) -> Tuple[int, bytes, bytes]:
+        """
+        Run a command in a compile slot without blocking the event loop
+
+        Parameters:
+        -----------
+        args : List[str]
+            Command and arguments to execute
+        cwd : str, optional
+            Working directory for the subprocess
+        timeout : float, optional
+            Seconds before the subprocess is killed. Defaults to the pool timeout.
+        env : Dict[str, str], optional
+            Environment for the subprocess. Defaults to the service environment.
+
+        Returns:
+        --------
+        Tuple[int, bytes, bytes]
+            Return code, stdout and stderr of the process
+        """
+        async with self.slot():
+            return await self._execute(args, cwd, timeout or self.timeout, env)
+
+    async def _execute(self, args: List[str], cwd: Optional[str], timeout: float,
+                       env: Optional[Dict[str, str]] = None) -> Tuple[int, bytes, bytes]:
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            cwd=cwd,
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await self.kill(process)
+            raise CompileTimeout(f"Compilation timed out after {timeout:g} seconds")
+        except asyncio.CancelledError:
+            await self.kill(process)
+            raise
+        return process.returncode, stdout, stderr
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Wait for running and queued compiles to finish, e.g. before shutting down
+
+        Returns:
+        --------
+        bool
+            True if the pool went idle within ``timeout`` seconds
+        """
+        deadline = time.monotonic() + timeout
+        while self.running or self.waiting:
+            if time.monotonic() >= deadline:
+                logger.warning(f"Shutting down with {self.running} compiles running and {self.waiting} queued")
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    @staticmethod
+    async def kill(process: asyncio.subprocess.Process) -> None:
+        """Kill a subprocess if it is still running and reap it"""
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, slot usage and wait times"""
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queue_depth": self.waiting,
+            "queue_depth_by_priority": {priority: sum(len(queue) for queue in waiters.values())
+                                        for priority, waiters in self._waiters.items()},
+            "callers_waiting": len(set().union(*(waiters.keys() for waiters in self._waiters.values()))),
+            "queue_capacity": self.queue_size,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "last_wait_ms": round(self.last_wait * 1000, 2),
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+# Shared pool used by the PDF routes
+compile_pool = CompilePool()
@@ -0,0 +1,436 @@
+import re
+import json
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from app.utils.pdf_fonts import FONTS, text_width, to_winansi
+
+# Bump whenever the direct layout changes so cached PDFs are not reused
+DIRECT_TEMPLATE_VERSION = "jake-gutierrez-direct-1"
+# Layouts the direct engine can draw
+DIRECT_LAYOUTS = ("jake-gutierrez",)
+
+# First line of a direct engine document source; keeps its cache keys apart from LaTeX documents
+SOURCE_HEADER = f"%direct-pdf {DIRECT_TEMPLATE_VERSION}\n"
+
+# A run of text in one style: (text, style, size)
+Run = Tuple[str, str, float]
+
+# Renderer geometry for each page-fit level (see app.utils.page_fit), matching
+# the LaTeX commands the levels add; each level includes the ones before it
+_FIT_SPACING = {"ITEM_SPACING": -1.5, "SECTION_SPACING": -8.0}
+_FIT_MARGINS = dict(_FIT_SPACING, MARGIN=28.8, TOP=792.0 - 25.2, BOTTOM=25.2,
+                    TEXT_WIDTH=612.0 - 2 * 28.8, COLUMN_WIDTH=0.97 * (612.0 - 2 * 28.8))
+_FIT_FONT = dict(_FIT_MARGINS, NORMAL=10.0, SMALL=9.0, NORMAL_LEADING=12.0, SMALL_LEADING=11.0)
+FIT_ADJUSTMENTS: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "spacing": _FIT_SPACING,
+    "margins": _FIT_MARGINS,
+    "font": _FIT_FONT,
+}
+
+
+def document_source(data: Dict[str, Any], fit_level: Optional[str] = None) -> str:
+    """Serialized resume data, the direct engine's counterpart of the LaTeX source"""
+    fit_line = f"%fit {fit_level}\n" if fit_level and fit_level != "default" else ""
+    return SOURCE_HEADER + fit_line + json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def render_pdf(source: str) -> bytes:
+    """Lay out a document source produced by ``document_source`` and return the PDF bytes"""
+    if not source.startswith(SOURCE_HEADER):
+        raise ValueError("Not a direct engine document source")
+    body = source[len(SOURCE_HEADER):]
+    adjustments: Dict[str, Any] = {}
+    if body.startswith("%fit "):
+        fit_line, body = body.split("\n", 1)
+        adjustments = FIT_ADJUSTMENTS[fit_line[len("%fit "):]]
+    return DirectResumeRenderer(adjustments).render(json.loads(body))
+
+
+def page_count(pdf_bytes: bytes) -> Optional[int]:
+    """Number of pages of a PDF written by ``PdfWriter``"""
+    match = re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", pdf_bytes)
+    return int(match.group(1)) if match else None
+
+
+def _typeset(text: str) -> str:
+    """Text as the standard fonts can show it, with TeX's dash ligatures applied"""
+    text = to_winansi(text)
+    if "--" in text:
+        text = text.replace("---", "\u2014").replace("--", "\u2013")
+    return text
+
+
+def _pdf_string(text: str) -> bytes:
+    """PDF literal string for WinAnsi text"""
+    out = bytearray(b"(")
+    for byte in text.encode("cp1252", errors="replace"):
+        if byte in b"()\\":
+            out += b"\\" + bytes([byte])
+        elif 32 <= byte <= 126:
+            out.append(byte)
+        else:
+            out += b"\\%03o" % byte
+    out += b")"
+    return bytes(out)
+
+
+def _number(value: float) -> bytes:
+    return (b"%.2f" % value).rstrip(b"0").rstrip(b".") or b"0"
+
+
+class PdfWriter:
+    """
+    Minimal PDF writer: pages of text in the standard Times fonts, rules and links.
+
+    Text is written with WinAnsiEncoding, which viewers and ATS parsers map
+    back to Unicode without a ToUnicode table, so the text layer is searchable
+    and extractable like the pdflatex output with ``\\pdfgentounicode=1``.
+    """
+
+    def __init__(self, width: float = 612, height: float = 792, title: str = ""):
+        self.width = width
+        self.height = height
+        self.title = title
+        self._font_names = {style: f"F{i}".encode() for i, style in enumerate(FONTS, start=1)}
+        self.pages: List[Dict[str, Any]] = []
+
+    def new_page(self) -> None:
+        self.pages.append({"content": [], "links": []})
+
+    def text(self, x: float, y: float, text: str, style: str, size: float) -> None:
+        if text:
+            self.pages[-1]["content"].append(
+                b"BT /" + self._font_names[style] + b" " + _number(size) + b" Tf 1 0 0 1 "
+                + _number(x) + b" " + _number(y) + b" Tm " + _pdf_string(text) + b" Tj ET"
+            )
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float = 0.4) -> None:
+        self.pages[-1]["content"].append(
+            _number(width) + b" w " + _number(x1) + b" " + _number(y1) + b" m "
+            + _number(x2) + b" " + _number(y2) + b" l S"
+        )
+
+    def link(self, x1: float, y1: float, x2: float, y2: float, uri: str) -> None:
+        self.pages[-1]["links"].append(((x1, y1, x2, y2), uri))
+
+    def tobytes(self) -> bytes:
+        """Serialize the document"""
+        objects: List[bytes] = []
+
+        def add(body: bytes) -> int:
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(b"")
+        pages = add(b"")
+        fonts = b" ".join(
+            b"/" + self._font_names[style] + b" %d 0 R" % add(
+                b"<< /Type /Font /Subtype /Type1 /BaseFont /" + name.encode()
+                + b" /Encoding /WinAnsiEncoding >>"
+            )
+            for style, name in FONTS.items()
+        )
+        page_refs = []
+        for page in self.pages:
+            stream = zlib.compress(b"\n".join(page["content"]))
+            content = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+            annots = [
+                add(b"<< /Type /Annot /Subtype /Link /Border [0 0 0] /Rect ["
+                    + b" ".join(_number(v) for v in rect) + b"] /A << /S /URI /URI "
+                    + _pdf_string(uri) + b" >> >>")
+                for rect, uri in page["links"]
+            ]
+            page_refs.append(add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 " % pages
+                + _number(self.width) + b" " + _number(self.height) + b"] /Resources << /Font << "
+                + fonts + b" >> >> /Contents %d 0 R" % content
+                + (b" /Annots [" + b" ".join(b"%d 0 R" % ref for ref in annots) + b"]" if annots else b"")
+                + b" >>"
+            ))
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages
+        objects[pages - 1] = (b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % ref for ref in page_refs)
+                              + b"] /Count %d >>" % len(page_refs))
+        info = add(b"<< /Producer (resume-ai direct renderer) /Title " + _pdf_string(self.title) + b" >>")
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += (b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                % (len(objects) + 1, catalog, info, xref))
+        return bytes(out)
+
+
+class _PageCounter:
+    """Stands in for PdfWriter when only the layout of a document is wanted"""
+
+    def __init__(self):
+        self.pages: List[None] = []
+
+    def new_page(self) -> None:
+        self.pages.append(None)
+
+    def text(self, *args: Any) -> None:
+        pass
+
+    line = link = text
+
+
+class DirectResumeRenderer:
+    """
+    Draws the Jake Gutierrez resume straight to PDF.
+
+    Follows the geometry of the LaTeX template (letter paper, half-inch
+    margins, the same font sizes, indents and column layout) with Times in
+    place of Computer Modern, so documents match closely but not exactly.
+    """
+
+    PAGE_WIDTH = 612.0
+    PAGE_HEIGHT = 792.0
+    MARGIN = 36.0
+    # includehead / includefoot: the empty header and footer still take space
+    TOP = PAGE_HEIGHT - MARGIN - 37.0
+    BOTTOM = MARGIN + 30.0
+    TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+
+    NORMAL = 11.0
+    SMALL = 10.0
+    LARGE = 12.0
+    HUGE = 24.88
+    LIST_INDENT = 10.8           # resumeSubHeadingListStart leftmargin=0.15in
+    ITEM_INDENT = 24.2           # second-level itemize leftmargin (2.2em)
+    COLUMN_WIDTH = 0.97 * TEXT_WIDTH
+    NORMAL_LEADING = NORMAL * 1.236
+    SMALL_LEADING = SMALL * 1.2
+    # Extra space after every bullet and above every section title
+    ITEM_SPACING = 0.0
+    SECTION_SPACING = 0.0
+    # Factor applied to every text width, by style
+    WIDTH_SCALE: Dict[str, float] = {}
+
+    def __init__(self, adjustments: Optional[Dict[str, Any]] = None):
+        # Per-document overrides of the class geometry, e.g. FIT_ADJUSTMENTS[level]
+        for name, value in (adjustments or {}).items():
+            setattr(self, name, value)
+        self.pdf: Optional[PdfWriter] = None
+        self.y = self.TOP
+        # (path, page) of every bullet, education entry and skill line, where it
+        # ends, e.g. ("experience_entries/0/responsibilities/2", 1)
+        self.placements: List[Tuple[str, int]] = []
+
+    def render(self, data: Dict[str, Any]) -> bytes:
+        """Lay out validated resume data and return the PDF bytes"""
+        self.pdf = PdfWriter(self.PAGE_WIDTH, self.PAGE_HEIGHT, title=to_winansi(data.get('full_name') or ""))
+        self._layout(data)
+        return self.pdf.tobytes()
+
+    def measure(self, data: Dict[str, Any]) -> int:
+        """
+        Lay out validated resume data without drawing it and return the page count
+
+        Afterwards ``y`` is the position the document ends at on its last page
+        and ``placements`` tells which page every bullet ended on.
+        """
+        self.pdf = _PageCounter()
+        self._layout(data)
+        return len(self.pdf.pages)
+
+    def _layout(self, data: Dict[str, Any]) -> None:
+        self.pdf.new_page()
+        self.y = self.TOP
+        self.placements = []
+        self._header(data)
+        self._education(data.get('education_entries') or [])
+        self._experience(data.get('experience_entries') or [])
+        self._projects(data.get('project_entries') or [])
+        self._skills(data.get('skill_categories') or [])
+
+    # ---------- primitives ----------
+
+    def _advance(self, height: float) -> None:
+        """Move down by ``height``, starting a new page if it does not fit"""
+        if self.y - height < self.BOTTOM:
+            self.pdf.new_page()
+            self.y = self.TOP
+        self.y -= height
+
+    def _width(self, text: str, style: str, size: float) -> float:
+        width = text_width(text, style, size)
+        return width * self.WIDTH_SCALE[style] if style in self.WIDTH_SCALE else width
+
+    def _draw_runs(self, x: float, runs: List[Run]) -> float:
+        for text, style, size in runs:
+            self.pdf.text(x, self.y, text, style, size)
+            x += self._width(text, style, size)
+        return x
+
+    def _runs_width(self, runs: List[Run]) -> float:
+        return sum(self._width(text, style, size) for text, style, size in runs)
+
+    @staticmethod
+    def _small_caps(text: str, style: str, size: float) -> List[Run]:
+        """Runs approximating small caps: lowercase letters as smaller capitals"""
+        runs: List[Run] = []
+        for char in _typeset(text):
+            small = char.islower()
+            run = (char.upper(), style, round(size * 0.8, 2) if small else size)
+            if runs and runs[-1][1:] == run[1:]:
+                runs[-1] = (runs[-1][0] + run[0], style, run[2])
+            else:
+                runs.append(run)
+        return runs
+
+    def _wrap(self, runs: List[Run], width: float) -> List[List[Run]]:
+        """Break runs into lines no wider than ``width``, ragged right"""
+        words: List[Tuple[str, str, float, bool]] = []
+        for text, style, size in runs:
+            text = _typeset(text)
+            parts = text.split(" ")
+            for i, part in enumerate(parts):
+                if part:
+                    words.append((part, style, size, False))
+                if i < len(parts) - 1:
+                    words.append((" ", style, size, True))
+
+        lines: List[List[Run]] = [[]]
+        line_width = 0.0
+        pending_space: Optional[Run] = None
+        for text, style, size, is_space in words:
+            if is_space:
+                if lines[-1]:
+                    pending_space = (" ", style, size)
+                continue
+            word_width = self._width(text, style, size)
+            space_width = self._width(" ", pending_space[1], pending_space[2]) if pending_space else 0.0
+            if lines[-1] and line_width + space_width + word_width > width:
+                lines.append([])
+                line_width = 0.0
+                pending_space = None
+                space_width = 0.0
+            if pending_space:
+                lines[-1].append(pending_space)
+            lines[-1].append((text, style, size))
+            line_width += space_width + word_width
+            pending_space = None
+
+        merged: List[List[Run]] = []
+        for line in lines:
+            out: List[Run] = []
+            for run in line:
+                if out and out[-1][1:] == run[1:]:
+                    out[-1] = (out[-1][0] + run[0], run[1], run[2])
+                else:
+                    out.append(run)
+            merged.append(out)
+        return merged
+
+    def _paragraph(self, x: float, runs: List[Run], width: float, leading: float) -> None:
+        for line in self._wrap(runs, width):
+            self._advance(leading)
+            self._draw_runs(x, line)
+
+    def _row(self, x: float, left: List[Run], right: List[Run], leading: float) -> None:
+        """A tabular* row: left column flush left, right column flush right"""
+        self._advance(leading)
+        right = [(_typeset(text), style, size) for text, style, size in right]
+        right_width = self._runs_width(right)
+        left_lines = self._wrap(left, max(self.COLUMN_WIDTH - right_width - 6, self.COLUMN_WIDTH / 2))
+        # Left column first so extracted text reads in order
+        self._draw_runs(x, left_lines[0])
+        self._draw_runs(self.COLUMN_WIDTH + x - right_width, right)
+        for line in left_lines[1:]:
+            self._advance(leading)
+            self._draw_runs(x, line)
+
+    # ---------- sections ----------
+
+    def _header(self, data: Dict[str, Any]) -> None:
+        name = self._small_caps(data.get('full_name') or "", "bold", self.HUGE)
+        self._advance(self.HUGE * 0.8)
+        self._draw_runs(self.MARGIN + (self.TEXT_WIDTH - self._runs_width(name)) / 2, name)
+
+        links = [(data['email'], f"mailto:{data['email']}")] if data.get('email') else []
+        for field in ('linkedin_url', 'github_url', 'website_url'):
+            if data.get(field):
+                links.append((data[field], f"https://{data[field]}"))
+        separator = " | "
+        pieces = [_typeset(text) for text, _ in links]
+        total = (sum(self._width(piece, "regular", self.NORMAL) for piece in pieces)
+                 + self._width(separator, "regular", self.NORMAL) * max(0, len(pieces) - 1))
+        self._advance(self.NORMAL_LEADING + 2)
+        x = self.MARGIN + (self.TEXT_WIDTH - total) / 2
+        for i, (piece, (_, uri)) in enumerate(zip(pieces, links)):
+            if i:
+                x = self._draw_runs(x, [(separator, "regular", self.NORMAL)])
+            end = self._draw_runs(x, [(piece, "regular", self.NORMAL)])
+            self.pdf.line(x, self.y - 1.5, end, self.y - 1.5)
+            self.pdf.link(x, self.y - 3, end, self.y + self.NORMAL * 0.8, uri)
+            x = end
+        self.y -= 4
+
+    def _section(self, title: str) -> None:
+        self._advance(self.LARGE * 1.2 + 6 + self.SECTION_SPACING)
+        self._draw_runs(self.MARGIN, self._small_caps(title, "regular", self.LARGE))
+        self.pdf.line(self.MARGIN, self.y - 3, self.MARGIN + self.TEXT_WIDTH, self.y - 3)
+        self.y -= 5
+
+    def _subheading(self, title: str, dates: str, subtitle: str, location: str) -> None:
+        x = self.MARGIN + self.LIST_INDENT
+        self.y -= 1
+        self._row(x, [(title, "bold", self.NORMAL)], [(dates, "regular", self.NORMAL)], self.NORMAL_LEADING)
+        self._row(x, [(subtitle, "italic", self.SMALL)], [(location or "", "italic", self.SMALL)], self.SMALL_LEADING)
+
+    def _items(self, texts: List[str], path: str) -> None:
+        x = self.MARGIN + self.LIST_INDENT + self.ITEM_INDENT
+        width = self.TEXT_WIDTH - self.LIST_INDENT - self.ITEM_INDENT
+        self.y -= 2
+        for index, text in enumerate(texts):
+            lines = self._wrap([(text, "regular", self.SMALL)], width)
+            for i, line in enumerate(lines):
+                self._advance(self.SMALL_LEADING)
+                if i == 0:
+                    self.pdf.text(x - 8, self.y + 1.5, "•", "regular", 6)
+                self._draw_runs(x, line)
+            self.y -= self.ITEM_SPACING
+            self.placements.append((f"{path}/{index}", len(self.pdf.pages)))
+        self.y -= 3
+
+    def _education(self, entries: List[Dict[str, Any]]) -> None:
+        self._section("Education")
+        for index, edu in enumerate(entries):
+            self._subheading(edu['institution'], edu.get('location') or "", edu['degree'], edu['date_range'])
+            self.placements.append((f"education_entries/{index}", len(self.pdf.pages)))
+
+    def _experience(self, entries: List[Dict[str, Any]]) -> None:
+        self._section("Experience")
+        for index, exp in enumerate(entries):
+            self._subheading(exp['title'], exp['dates'], exp['organization'], exp.get('location') or "")
+            self._items(exp['responsibilities'], f"experience_entries/{index}/responsibilities")
+
+    def _projects(self, entries: List[Dict[str, Any]]) -> None:
+        self._section("Projects")
+        for index, proj in enumerate(entries):
+            self.y -= 1
+            self._row(self.MARGIN + self.LIST_INDENT,
+                      [(proj['name'], "bold", self.SMALL), (" | ", "regular", self.SMALL),
+                       (proj['technologies'], "italic", self.SMALL)],
+                      [(proj.get('date_range') or "", "regular", self.NORMAL)],
+                      self.NORMAL_LEADING)
+            self._items(proj['details'], f"project_entries/{index}/details")
+
+    def _skills(self, categories: List[Dict[str, Any]]) -> None:
+        if not categories:
+            return
+        self._section("Technical Skills")
+        x = self.MARGIN + self.LIST_INDENT
+        for index, category in enumerate(categories):
+            if category['skills']:
+                self._paragraph(x, [(category['category_name'], "bold", self.SMALL),
+                                    (": " + ", ".join(category['skills']), "regular", self.SMALL)],
+                                self.TEXT_WIDTH - self.LIST_INDENT, self.SMALL_LEADING)
+                self.placements.append((f"skill_categories/{index}", len(self.pdf.pages)))
@@ -0,0 +1,44 @@
+import os
+import fcntl
+from typing import Optional
+
+
+def lock_file(path: str, blocking: bool = True) -> Optional[int]:
+    """
+    Take an exclusive lock shared by every process on the host
+
+    Used where workers of a multi-process deployment share a directory, e.g.
+    so only one of them builds the LaTeX format. The lock is released by
+    ``unlock_file`` or when the process exits.
+
+    Parameters:
+    -----------
+    path : str
+        Lock file, created if missing
+    blocking : bool, optional
+        Wait for the lock; otherwise return None at once if it is held
+
+    Returns:
+    --------
+    Optional[int]
+        File descriptor holding the lock, or None if it was not taken
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+def unlock_file(fd: int) -> None:
+    """Release a lock taken by ``lock_file``"""
+    try:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
@@ -0,0 +1,257 @@
+import os
+import re
+import copy
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from app.utils.template_engine import Layout
+from app.utils.page_fit import FitResult
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+PDF_FRAGMENT_CACHE_ENTRIES = settings.get_int("PDF_FRAGMENT_CACHE_ENTRIES", 4096)
+PDF_DOCUMENT_CACHE_ENTRIES = settings.get_int("PDF_DOCUMENT_CACHE_ENTRIES", 1024)
+# Directory the workers of a multi-process deployment share documents through, so an
+# edit can be served by any of them; empty keeps documents in process memory only
+PDF_DOCUMENT_DIR = settings.get("PDF_DOCUMENT_DIR", "")
+
+_document_id = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class RenderedDocument(NamedTuple):
+    latex_content: str
+    # Content key of every section, to render later edits of this document against
+    section_keys: Dict[str, str]
+    # Sections that had to be rendered rather than taken from the cache
+    rendered: List[str]
+    # Page fit chosen for the document, when fitting was asked for
+    fit: Optional[FitResult] = None
+
+
+class StoredDocument(NamedTuple):
+    data: Dict[str, Any]
+    layout: str
+    section_keys: Dict[str, str]
+    engine: str
+
+
+class FragmentCache:
+    """
+    LRU of rendered LaTeX sections keyed by ``Layout.section_key``.
+
+    A document is assembled from cached fragments, so only sections whose
+    input changed since an earlier render are rendered again.
+    """
+
+    def __init__(self, max_entries: int = PDF_FRAGMENT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._fragments: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, layout: Layout, data: Dict[str, Any],
+               section_keys: Optional[Dict[str, str]] = None) -> RenderedDocument:
+        """
+        Render a document, reusing cached sections
+
+        Parameters:
+        -----------
+        layout : Layout
+            Layout to render with
+        data : Dict[str, Any]
+            Validated resume data
+        section_keys : Dict[str, str], optional
+            Known keys of sections whose input is unchanged, e.g. taken from the
+            base document of an edit; other sections are hashed from ``data``
+
+        Returns:
+        --------
+        RenderedDocument
+            The LaTeX source, the key of every section and the sections rendered
+        """
+        section_keys = section_keys or {}
+        keys: Dict[str, str] = {}
+        rendered: List[str] = []
+        parts = [layout.prefix]
+        for section in layout.SECTIONS:
+            key = section_keys.get(section) or layout.section_key(section, data)
+            fragment = self._fragments.get(key)
+            if fragment is None:
+                fragment = layout.render_section(section, data)
+                self._fragments[key] = fragment
+                while len(self._fragments) > self.max_entries:
+                    self._fragments.popitem(last=False)
+                rendered.append(section)
+                self.misses += 1
+            else:
+                self._fragments.move_to_end(key)
+                self.hits += 1
+            keys[section] = key
+            parts.append(fragment)
+        parts.append(layout.suffix)
+        return RenderedDocument("".join(parts), keys, rendered)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters and size"""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._fragments)}
+
+
+class DocumentStore:
+    """
+    LRU of recently rendered documents by document id, the base for partial updates.
+
+    Documents are kept in process memory and, when ``shared_dir`` is set, also
+    written there as JSON for the other workers. An edit against a document
+    that has been evicted everywhere has to send the full resume again.
+    """
+
+    def __init__(self, max_entries: int = PDF_DOCUMENT_CACHE_ENTRIES, shared_dir: str = PDF_DOCUMENT_DIR):
+        self.max_entries = max_entries
+        self.shared_dir = shared_dir
+        self._documents: "OrderedDict[str, StoredDocument]" = OrderedDict()
+        self._writes = 0
+
+    def put(self, document_id: str, data: Dict[str, Any], layout: str, section_keys: Dict[str, str],
+            engine: str) -> None:
+        """Remember the data, section keys and engine a document was rendered with"""
+        document = StoredDocument(data, layout, section_keys, engine)
+        known = document_id in self._documents
+        self._remember(document_id, document)
+        if self.shared_dir and not known:
+            self._write(document_id, document)
+
+    def get(self, document_id: str) -> Optional[StoredDocument]:
+        """Return a stored document, or None if unknown or evicted"""
+        document = self._documents.get(document_id)
+        if document is not None:
+            self._documents.move_to_end(document_id)
+        elif self.shared_dir and _document_id.match(document_id):
+            document = self._read(document_id)
+            if document is not None:
+                self._remember(document_id, document)
+        return document
+
+    def _remember(self, document_id: str, document: StoredDocument) -> None:
+        self._documents[document_id] = document
+        self._documents.move_to_end(document_id)
+        while len(self._documents) > self.max_entries:
+            self._documents.popitem(last=False)
+
+    def _path(self, document_id: str) -> str:
+        return os.path.join(self.shared_dir, f"{document_id}.json")
+
+    def _write(self, document_id: str, document: StoredDocument) -> None:
+        try:
+            os.makedirs(self.shared_dir, exist_ok=True)
+            temp_path = f"{self._path(document_id)}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as document_file:
+                json.dump(document._asdict(), document_file, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_path, self._path(document_id))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Error sharing document {document_id}: {str(e)}")
+            return
+        self._writes += 1
+        if self._writes % max(1, self.max_entries // 10) == 0:
+            self._prune()
+
+    def _read(self, document_id: str) -> Optional[StoredDocument]:
+        try:
+            with open(self._path(document_id), encoding="utf-8") as document_file:
+                return StoredDocument(**json.load(document_file))
+        except FileNotFoundError:
+            return None
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Error reading shared document {document_id}: {str(e)}")
+            return None
+
+    def _prune(self) -> None:
+        """Keep the ``max_entries`` most recently written shared documents"""
+        entries = []
+        with os.scandir(self.shared_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        pass
+        for _, path in sorted(entries, reverse=True)[self.max_entries:]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._documents)}
+
+
+def apply_update(data: Dict[str, Any], changes: Dict[str, Any],
+                 edits: List[Tuple[str, Any]], fields: Set[str]) -> Tuple[Dict[str, Any], Set[str]]:
+    """
+    Apply a partial update to stored resume data
+
+    Parameters:
+    -----------
+    data : Dict[str, Any]
+        Resume data of the base document; left unmodified
+    changes : Dict[str, Any]
+        Top-level fields to replace
+    edits : List[Tuple[str, Any]]
+        (path, value) pairs applied after ``changes``. The path is slash-separated,
+        e.g. "experience_entries/0/responsibilities/2"; a list index equal to the
+        list length appends.
+    fields : Set[str]
+        Top-level fields that may be updated
+
+    Returns:
+    --------
+    Tuple[Dict[str, Any], Set[str]]
+        The updated data and the top-level fields touched
+    """
+    touched = set(changes) | {path.strip("/").split("/")[0] for path, _ in edits}
+    unknown = touched - fields
+    if unknown:
+        raise ValueError(f"Unknown resume fields: {', '.join(sorted(unknown))}")
+
+    # Only the touched fields are copied; the rest is shared with the base document
+    updated = dict(data)
+    for field in touched:
+        updated[field] = copy.deepcopy(data.get(field))
+    updated.update(copy.deepcopy(changes))
+
+    for path, value in edits:
+        segments = path.strip("/").split("/")
+        target: Any = updated
+        for depth, segment in enumerate(segments):
+            last = depth == len(segments) - 1
+            if isinstance(target, list):
+                try:
+                    index = int(segment)
+                except ValueError:
+                    raise ValueError(f"Invalid list index '{segment}' in edit path '{path}'")
+                if not 0 <= index <= len(target) - (0 if last else 1):
+                    raise ValueError(f"Index {index} out of range in edit path '{path}'")
+                if last:
+                    if index == len(target):
+                        target.append(value)
+                    else:
+                        target[index] = value
+                else:
+                    target = target[index]
+            elif isinstance(target, dict):
+                if last:
+                    target[segment] = value
+                elif segment not in target or target[segment] is None:
+                    raise ValueError(f"Edit path '{path}' does not exist in the base document")
+                else:
+                    target = target[segment]
+            else:
+                raise ValueError(f"Edit path '{path}' does not exist in the base document")
+    return updated, touched
+
+
+# Shared caches used by the PDF routes
+fragment_cache = FragmentCache()
+documents = DocumentStore()
@@ -0,0 +1,112 @@
+import os
+import time
+import shutil
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+from app.config import settings
+from app.utils.compile_pool import compile_pool
+from app.utils.pdf_generator import PDF_ENGINE
+from app.utils.storage import get_storage
+from app.utils.warm_tex import warm_tex_pool
+from app.utils.warmup import warmup
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds every compile slot may stay in use before the process counts as wedged;
+# longer than any compile or format build is allowed to run
+PDF_LIVENESS_STALL_AFTER = settings.get_float("PDF_LIVENESS_STALL_AFTER", 300)
+# How often readiness checks that the storage backend is reachable, and how long a check may take
+PDF_READY_STORAGE_INTERVAL = settings.get_float("PDF_READY_STORAGE_INTERVAL", 30)
+PDF_READY_STORAGE_TIMEOUT = settings.get_float("PDF_READY_STORAGE_TIMEOUT", 5)
+
+
+class Health:
+    """
+    Liveness, readiness and spare capacity of this process, for load balancers.
+
+    Live means the event loop answers and the compile slots are not wedged;
+    a process that is not live should be restarted. Ready means a request
+    sent now would be served: warm-up has finished, pdflatex is installed
+    when it is the default engine, the compile queue has room and storage
+    is reachable. Storage is checked at most every
+    ``PDF_READY_STORAGE_INTERVAL`` seconds so that probes stay cheap, and
+    keeps being checked while the process is not ready, so it recovers
+    without traffic.
+    """
+
+    def __init__(self, engine: str = PDF_ENGINE, stall_after: float = PDF_LIVENESS_STALL_AFTER,
+                 storage_interval: float = PDF_READY_STORAGE_INTERVAL,
+                 storage_timeout: float = PDF_READY_STORAGE_TIMEOUT):
+        self.engine = engine
+        self.stall_after = stall_after
+        self.storage_interval = storage_interval
+        self.storage_timeout = storage_timeout
+        self._storage_ok: Optional[bool] = None
+        self._storage_checked_at = 0.0
+        self._storage_lock = asyncio.Lock()
+
+    def liveness(self) -> Tuple[bool, Dict[str, Any]]:
+        """Whether the process is live, with the compile pool state it was judged on"""
+        busy_for = compile_pool.busy_for()
+        live = busy_for < self.stall_after
+        if not live:
+            logger.error(f"All {compile_pool.workers} compile slots busy for {busy_for:.0f}s")
+        return live, {"status": "ok" if live else "stalled", "compile_slots_busy_for_s": round(busy_for, 1)}
+
+    async def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """Whether the process should receive requests, with the result of each check"""
+        checks = {
+            "warmup": warmup.ready,
+            "pdflatex": self.engine != "latex" or shutil.which("pdflatex") is not None,
+            "compile_queue": compile_pool.waiting < compile_pool.queue_size or compile_pool.free_slots > 0,
+            "compile_slots": compile_pool.busy_for() < self.stall_after,
+            "storage": await self._check_storage(),
+        }
+        ready = all(checks.values())
+        return ready, {"status": "ready" if ready else "not ready", "checks": checks}
+
+    async def _check_storage(self) -> bool:
+        async with self._storage_lock:
+            if self._storage_ok is None or time.monotonic() - self._storage_checked_at >= self.storage_interval:
+                try:
+                    self._storage_ok = await asyncio.wait_for(get_storage().check(), self.storage_timeout)
+                except Exception as e:
+                    logger.warning(f"Storage check failed: {str(e)}")
+                    self._storage_ok = False
+                self._storage_checked_at = time.monotonic()
+            return self._storage_ok
+
+    def capacity(self, jobs_queued: int = 0) -> Dict[str, Any]:
+        """
+        Spare capacity of this process, for least-loaded routing
+
+        Parameters:
+        -----------
+        jobs_queued : int, optional
+            Generation jobs waiting in the job queue
+
+        Returns:
+        --------
+        Dict[str, Any]
+            Free and total compile slots, queued compiles and jobs, ready warm
+            TeX workers, the p95 of recent compiles and ``load``: compiles
+            running and queued per slot, where below 1 means a slot is free
+        """
+        p95 = compile_pool.recent_p95()
+        return {
+            "pid": os.getpid(),
+            "warmed_up": warmup.ready,
+            "compile_slots": compile_pool.workers,
+            "free_slots": compile_pool.free_slots,
+            "compile_queue_depth": compile_pool.waiting,
+            "compile_queue_capacity": compile_pool.queue_size,
+            "jobs_queued": jobs_queued,
+            "warm_workers_ready": warm_tex_pool.stats()["ready"],
+            "compile_p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            "load": round((compile_pool.running + compile_pool.waiting) / compile_pool.workers, 3),
+        }
+
+
+health = Health()
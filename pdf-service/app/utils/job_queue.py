@@ -0,0 +1,425 @@
+import abc
+import os
+import json
+import socket
+import ipaddress
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+import itertools
+import logging
+import urllib.request
+from urllib.parse import urlparse
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from app.utils.log_config import request_context
+from app.utils.admission import BULK, admission_context
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Job queue configuration
+PDF_JOB_STORE = settings.get("PDF_JOB_STORE", "sqlite")
+PDF_JOB_DB_PATH = settings.get("PDF_JOB_DB_PATH", os.path.join(os.getcwd(), "pdf_jobs.sqlite3"))
+PDF_JOB_WORKERS = settings.get_int("PDF_JOB_WORKERS", 2)
+PDF_JOB_TTL = settings.get_float("PDF_JOB_TTL", 24 * 3600)
+# A job left running this long is taken to belong to a worker that died. Running jobs
+# are not recovered sooner, since with several workers they may be running elsewhere.
+PDF_JOB_STALE_AFTER = settings.get_float("PDF_JOB_STALE_AFTER", 300)
+# Hosts callbacks may be sent to. When empty, any host resolving only to public addresses is
+# accepted; listed hosts are trusted as they are, so internal receivers must be listed here
+PDF_JOB_CALLBACK_HOSTS = settings.get_list("PDF_JOB_CALLBACK_HOSTS")
+PDF_JOB_CALLBACK_TIMEOUT = settings.get_float("PDF_JOB_CALLBACK_TIMEOUT", 10)
+PDF_JOB_CALLBACK_ATTEMPTS = settings.get_int("PDF_JOB_CALLBACK_ATTEMPTS", 3)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobStore(abc.ABC):
+    """Persistence for job records. Jobs are plain dicts with JSON-serializable values."""
+
+    # Whether the methods do I/O, and so are run in a thread rather than on the event loop
+    blocking = False
+
+    @abc.abstractmethod
+    def create(self, job: Dict[str, Any]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abc.abstractmethod
+    def update(self, job_id: str, **fields: Any) -> None:
+        ...
+
+    @abc.abstractmethod
+    def claim(self, job_id: str, now: float) -> bool:
+        """Mark a queued job as running, returning False if another worker got to it first"""
+
+    @abc.abstractmethod
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Jobs that were queued or running, oldest first"""
+
+    @abc.abstractmethod
+    def purge(self, finished_before: float) -> int:
+        """Delete finished jobs last updated before a timestamp, returning how many"""
+
+
+class MemoryJobStore(JobStore):
+    """Job store kept in process memory; jobs are lost on restart"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    def create(self, job: Dict[str, Any]) -> None:
+        self._jobs[job["id"]] = dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if job_id in self._jobs:
+            self._jobs[job_id].update(fields)
+
+    def claim(self, job_id: str, now: float) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job["status"] != QUEUED:
+            return False
+        job.update(status=RUNNING, updated_at=now)
+        return True
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        jobs = [dict(job) for job in self._jobs.values() if job["status"] in (QUEUED, RUNNING)]
+        return sorted(jobs, key=lambda job: job["created_at"])
+
+    def purge(self, finished_before: float) -> int:
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job["status"] in (SUCCEEDED, FAILED) and job["updated_at"] < finished_before]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+
+class SqliteJobStore(JobStore):
+    """Job store in a local SQLite file so queued jobs survive a restart"""
+
+    blocking = True
+
+    COLUMNS = ("id", "status", "priority", "payload", "callback_url",
+               "result", "error", "created_at", "updated_at", "caller")
+
+    def __init__(self, path: str = PDF_JOB_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS pdf_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    callback_url TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    caller TEXT
+                )"""
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(pdf_jobs)")}
+            if "caller" not in columns:
+                # Databases created before jobs were attributed to their caller
+                self._conn.execute("ALTER TABLE pdf_jobs ADD COLUMN caller TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pdf_jobs_status ON pdf_jobs (status, created_at)")
+
+    @staticmethod
+    def _encode(field: str, value: Any) -> Any:
+        return json.dumps(value) if field in ("payload", "result") and value is not None else value
+
+    def _decode(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        for field in ("payload", "result"):
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+    def create(self, job: Dict[str, Any]) -> None:
+        values = [self._encode(column, job.get(column)) for column in self.COLUMNS]
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO pdf_jobs ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                values
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM pdf_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        columns = [column for column in fields if column in self.COLUMNS and column != "id"]
+        if not columns:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE pdf_jobs SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                [self._encode(column, fields[column]) for column in columns] + [job_id]
+            )
+
+    def claim(self, job_id: str, now: float) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE pdf_jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, now, job_id, QUEUED)
+            )
+        return cursor.rowcount == 1
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM pdf_jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def purge(self, finished_before: float) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM pdf_jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (SUCCEEDED, FAILED, finished_before)
+            )
+        return cursor.rowcount
+
+
+def create_job_store(kind: str = PDF_JOB_STORE) -> JobStore:
+    """Build the configured job store backend"""
+    if kind == "memory":
+        return MemoryJobStore()
+    if kind == "sqlite":
+        return SqliteJobStore()
+    raise ValueError(f"Unknown job store: {kind}")
+
+
+def validate_callback_url(url: str) -> None:
+    """
+    Reject callback URLs the service must not POST to
+
+    The URL must be absolute http(s). With PDF_JOB_CALLBACK_HOSTS set its host
+    must be listed; otherwise every address the host resolves to must be
+    public, so callers cannot reach loopback, private, link-local (cloud
+    metadata) or other internal addresses. Resolves the host, so it blocks.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("callback_url must be an absolute http(s) URL")
+    if PDF_JOB_CALLBACK_HOSTS:
+        if parsed.hostname not in PDF_JOB_CALLBACK_HOSTS:
+            raise ValueError(f"callback_url host {parsed.hostname} is not allowed")
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(parsed.hostname, parsed.port or None,
+                                                                proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"callback_url host {parsed.hostname} does not resolve")
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%")[0]).is_global:
+            raise ValueError(f"callback_url host {parsed.hostname} is not a public address")
+
+
+class _NoRedirects(urllib.request.HTTPRedirectHandler):
+    """Fail on redirects instead of following them past validate_callback_url"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirects)
+
+
+def public_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job fields returned to API callers and webhooks (no payload)"""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "priority": job["priority"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+class JobQueue:
+    """
+    In-process priority queue of generation jobs backed by a JobStore.
+
+    Lower ``priority`` values run first and equal priorities run in submission
+    order. On start, jobs the store still has as queued (for example after a
+    restart) are put back on the queue, as are running jobs that have not been
+    updated for ``PDF_JOB_STALE_AFTER``. Several worker processes may share a
+    SQLite store: each job is claimed before it runs, so only one of them runs it.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 store: Optional[JobStore] = None, workers: int = PDF_JOB_WORKERS):
+        self.handler = handler
+        self.store = store
+        self.workers = max(1, workers)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._busy: Set[asyncio.Task] = set()
+        self._stopping = False
+        self._sequence = itertools.count()
+
+    def _ensure_store(self) -> JobStore:
+        if self.store is None:
+            self.store = create_job_store()
+        return self.store
+
+    async def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Call a store method, in a thread if the store does I/O"""
+        store = self._ensure_store()
+        if store.blocking:
+            return await asyncio.to_thread(getattr(store, method), *args, **kwargs)
+        return getattr(store, method)(*args, **kwargs)
+
+    async def start(self) -> None:
+        """Recover unfinished jobs and start the worker tasks"""
+        self._queue = asyncio.PriorityQueue()
+        self._stopping = False
+        purged = await self._call("purge", time.time() - PDF_JOB_TTL)
+        if purged:
+            logger.info(f"Purged {purged} expired jobs")
+        for job in await self._call("unfinished"):
+            if job["status"] == RUNNING:
+                if job["updated_at"] > time.time() - PDF_JOB_STALE_AFTER:
+                    continue
+                await self._call("update", job["id"], status=QUEUED, updated_at=time.time())
+            self._queue.put_nowait((job["priority"], next(self._sequence), job["id"]))
+        if self._queue.qsize():
+            logger.info(f"Recovered {self._queue.qsize()} unfinished jobs")
+        self._tasks = [asyncio.ensure_future(self._work()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout: float = 0) -> None:
+        """
+        Stop the worker tasks; unfinished jobs stay in the store
+
+        Parameters:
+        -----------
+        drain_timeout : float, optional
+            Seconds to let running jobs finish before they are cancelled and
+            put back as queued. Workers waiting for a job stop at once.
+        """
+        self._stopping = True
+        for task in self._tasks:
+            if task not in self._busy:
+                task.cancel()
+        if self._busy and drain_timeout > 0:
+            logger.info(f"Waiting for {len(self._busy)} running jobs to finish")
+            await asyncio.wait(list(self._busy), timeout=drain_timeout)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, payload: Dict[str, Any], priority: int = 5,
+                     callback_url: Optional[str] = None, caller: Optional[str] = None) -> Dict[str, Any]:
+        """Persist a new job and queue it, returning the stored job; ``caller`` is who submitted it"""
+        if callback_url:
+            await asyncio.to_thread(validate_callback_url, callback_url)
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": QUEUED,
+            "priority": priority,
+            "payload": payload,
+            "callback_url": callback_url,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "caller": caller,
+        }
+        await self._call("create", job)
+        self._queue.put_nowait((priority, next(self._sequence), job["id"]))
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._call("get", job_id)
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _work(self) -> None:
+        while not self._stopping:
+            _, _, job_id = await self._queue.get()
+            task = asyncio.current_task()
+            self._busy.add(task)
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Error running job {job_id}: {str(e)}")
+            finally:
+                self._busy.discard(task)
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        # Log the job's records under its id, as a request's are under the request id
+        with request_context(job_id):
+            await self._run_job(job_id)
+
+    async def _run_job(self, job_id: str) -> None:
+        job = await self._call("get", job_id)
+        if job is None or not await self._call("claim", job_id, time.time()):
+            return
+        try:
+            # Its compiles queue as bulk work of the caller that submitted it, behind
+            # interactive requests and taking turns with other callers' jobs
+            with admission_context(job.get("caller") or "jobs", BULK):
+                result = await self.handler(job["payload"])
+            await self._call("update", job_id, status=SUCCEEDED, result=result, updated_at=time.time())
+        except asyncio.CancelledError:
+            # Leave it for recovery on the next start; done in place, since the
+            # task is being cancelled and must not wait on anything more
+            self.store.update(job_id, status=QUEUED, updated_at=time.time())
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            await self._call("update", job_id, status=FAILED, error=str(getattr(e, "detail", e)),
+                             updated_at=time.time())
+
+        job = await self._call("get", job_id)
+        if job and job.get("callback_url"):
+            await self._notify(job)
+
+    async def _notify(self, job: Dict[str, Any]) -> None:
+        body = json.dumps(public_view(job)).encode('utf-8')
+        for attempt in range(1, PDF_JOB_CALLBACK_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(self._post, job["callback_url"], body)
+                logger.info(f"Delivered callback for job {job['id']}")
+                return
+            except Exception as e:
+                logger.warning(f"Callback for job {job['id']} failed (attempt {attempt}): {str(e)}")
+                if attempt < PDF_JOB_CALLBACK_ATTEMPTS:
+                    await asyncio.sleep(2 ** attempt)
+
+    @staticmethod
+    def _post(url: str, body: bytes) -> None:
+        # Checked again: the host may resolve differently than when the job was submitted
+        validate_callback_url(url)
+        request = urllib.request.Request(
+            url, data=body, method="POST",
+            headers={"Content-Type": "application/json"}
+        )
+        with _callback_opener.open(request, timeout=PDF_JOB_CALLBACK_TIMEOUT) as response:
+            response.read()
@@ -0,0 +1,182 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Optional
+
+# ASCII characters LaTeX treats specially, in the order they are replaced. Braces
+# go first because later replacements introduce braces of their own; backslashes
+# are parked on a placeholder until the end for the same reason.
+ASCII_REPLACEMENTS = (
+    ('{', r'\{'),
+    ('}', r'\}'),
+    ('&', r'\&'),
+    ('%', r'\%'),
+    ('$', r'\$'),
+    ('#', r'\#'),
+    ('_', r'\_'),
+    ('~', r'\textasciitilde{}'),
+    ('^', r'\^{}'),
+    ('<', r'\textless{}'),
+    ('>', r'\textgreater{}'),
+)
+BACKSLASH = '\\'
+BACKSLASH_REPLACEMENT = r'\textbackslash{}'
+_PLACEHOLDER = '\x00'
+
+# Control characters pdflatex rejects as "invalid character" (tab, newline and CR are fine)
+_CONTROL = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+_ASCII_SPECIAL = re.compile(r'[{}&%$#_~^<>\\\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+# A Latin letter followed by combining marks that NFC has no precomposed letter for
+_ACCENT_SEQUENCE = re.compile(r'[A-Za-z][\u0300-\u036f]+')
+
+# Non-ASCII characters that resumes actually contain and the default OT1 setup
+# cannot typeset from UTF-8 input, or typesets only through inputenc guesswork
+UNICODE_REPLACEMENTS = {
+    # Quotes
+    '‘': '`', '’': "'", '‚': ',', '‛': '`',
+    '“': '``', '”': "''", '„': ',,', '‟': '``',
+    '′': "'", '″': "''", '«': '``', '»': "''",
+    '‹': '`', '›': "'",
+    # Dashes and hyphens
+    '‐': '-', '‑': '-', '‒': '--', '–': '--',
+    '—': '---', '―': '---', '−': '-',
+    # Spaces and invisible characters
+    '\u00a0': '~', '\u202f': '~', '\u2002': ' ', '\u2003': ' ', '\u2009': ' ', '\u200a': ' ',
+    '\u200b': '', '\u200c': '', '\u200d': '', '\u2060': '', '\ufeff': '', '\u00ad': '',
+    # Punctuation and symbols
+    '…': r'\ldots{}', '•': r'\textbullet{}', '●': r'\textbullet{}',
+    '·': r'\textperiodcentered{}', '§': r'\S{}', '¶': r'\P{}',
+    '©': r'\copyright{}', '®': r'\textregistered{}', '™': r'\texttrademark{}',
+    '£': r'\pounds{}', '€': 'EUR', '¥': 'JPY', '₹': 'INR',
+    '¿': r'\textquestiondown{}', '¡': r'\textexclamdown{}',
+    # Math
+    '→': r'$\rightarrow$', '←': r'$\leftarrow$', '↔': r'$\leftrightarrow$',
+    '⇒': r'$\Rightarrow$', '↑': r'$\uparrow$', '↓': r'$\downarrow$',
+    '≤': r'$\leq$', '≥': r'$\geq$', '≠': r'$\neq$', '≈': r'$\approx$',
+    '×': r'$\times$', '÷': r'$\div$', '±': r'$\pm$', '∞': r'$\infty$',
+    '°': r'$^{\circ}$', '¹': r'$^{1}$', '²': r'$^{2}$', '³': r'$^{3}$',
+    'μ': r'$\mu$', 'µ': r'$\mu$',
+    # Letters without a combining-accent decomposition
+    'ß': r'\ss{}', 'æ': r'\ae{}', 'Æ': r'\AE{}', 'œ': r'\oe{}', 'Œ': r'\OE{}',
+    'ø': r'\o{}', 'Ø': r'\O{}', 'ł': r'\l{}', 'Ł': r'\L{}',
+    'ı': r'\i{}', 'ȷ': r'\j{}',
+    'đ': 'd', 'Đ': 'D', 'ð': 'd', 'Ð': 'D', 'þ': 'th', 'Þ': 'Th',
+}
+
+# Combining marks and the LaTeX accent command that puts them on a letter
+COMBINING_ACCENTS = {
+    '\u0300': '`', '\u0301': "'", '\u0302': '^', '\u0303': '~', '\u0304': '=',
+    '\u0306': 'u', '\u0307': '.', '\u0308': '"', '\u030a': 'r', '\u030b': 'H',
+    '\u030c': 'v', '\u0323': 'd', '\u0327': 'c', '\u0328': 'k', '\u0331': 'b',
+}
+# Accents go on the dotless i and j
+_DOTLESS = {'i': r'\i', 'j': r'\j'}
+
+# Unicode categories with nothing pdflatex could typeset: emoji and other symbols,
+# format characters, stray combining marks, private use and unassigned code points
+_DROPPED_CATEGORIES = {'So', 'Sk', 'Cf', 'Cs', 'Co', 'Cn', 'Mn', 'Me'}
+
+
+def _escape_ascii(text: str) -> str:
+    if _CONTROL.search(text) is not None:
+        text = _CONTROL.sub('', text)
+    backslash = BACKSLASH in text
+    if backslash:
+        text = text.replace(BACKSLASH, _PLACEHOLDER)
+    for char, replacement in ASCII_REPLACEMENTS:
+        if char in text:
+            text = text.replace(char, replacement)
+    if backslash:
+        text = text.replace(_PLACEHOLDER, BACKSLASH_REPLACEMENT)
+    return text
+
+
+def _accented(char: str) -> Optional[str]:
+    """LaTeX accent commands for a letter that decomposes into ASCII plus combining marks"""
+    return _accent_commands(unicodedata.normalize('NFD', char))
+
+
+def _accent_commands(decomposed: str) -> Optional[str]:
+    base, marks = decomposed[0], decomposed[1:]
+    if not marks or not ('a' <= base.lower() <= 'z') or any(mark not in COMBINING_ACCENTS for mark in marks):
+        return None
+    # Accents sit on a dotless i/j in LaTeX
+    result = _DOTLESS.get(base, base)
+    for mark in marks:
+        result = f"\\{COMBINING_ACCENTS[mark]}{{{result}}}"
+    return result
+
+
+@lru_cache(maxsize=4096)
+def unicode_replacement(char: str) -> str:
+    """
+    LaTeX for a single non-ASCII character
+
+    Explicit replacements come first, then accented Latin letters as accent
+    commands, then characters whose compatibility form is plain ASCII
+    (ligatures, full-width forms). Symbols that cannot be typeset are dropped
+    and anything else, such as other scripts, is passed through unchanged.
+    """
+    replacement = UNICODE_REPLACEMENTS.get(char)
+    if replacement is not None:
+        return replacement
+    accented = _accented(char)
+    if accented is not None:
+        return accented
+    compatible = unicodedata.normalize('NFKD', char)
+    if compatible != char and compatible.isascii():
+        return _escape_ascii(compatible)
+    if unicodedata.category(char) in _DROPPED_CATEGORIES:
+        return ''
+    return char
+
+
+def _replace_unicode(match: "re.Match") -> str:
+    return unicode_replacement(match.group())
+
+
+def _replace_accent_sequence(match: "re.Match") -> str:
+    accented = _accent_commands(match.group())
+    # Marks without an accent command are dropped later, keeping the letter
+    return accented if accented is not None else match.group()
+
+
+def escape_latex(text: str) -> str:
+    """
+    Escape text for use in the LaTeX template
+
+    Plain ASCII text without special characters is returned as is after a
+    single regex scan. Special ASCII characters are replaced with one
+    ``str.replace`` per character present, and non-ASCII characters are mapped
+    with ``unicode_replacement`` after composing the text to NFC, so accents
+    typed as combining marks are kept.
+    """
+    ascii_only = text.isascii()
+    if ascii_only and _ASCII_SPECIAL.search(text) is None:
+        return text
+    if not ascii_only and not unicodedata.is_normalized('NFC', text):
+        # Decomposed input (e.g. pasted on macOS) carries accents as separate combining marks
+        text = unicodedata.normalize('NFC', text)
+    text = _escape_ascii(text)
+    if not ascii_only:
+        # After the ASCII pass so the commands inserted here are not escaped again
+        text = _ACCENT_SEQUENCE.sub(_replace_accent_sequence, text)
+        text = _NON_ASCII.sub(_replace_unicode, text)
+    return text
+
+
+def escape_many(texts: List[str]) -> List[str]:
+    """
+    Escape a list of strings, e.g. all bullets of an entry, in one pass
+
+    The strings are joined on newlines, escaped together and split again,
+    which also lets a list with nothing to escape be checked with a single scan.
+    """
+    if len(texts) < 2:
+        return [escape_latex(text) for text in texts]
+    joined = '\n'.join(texts)
+    if joined.count('\n') != len(texts) - 1:
+        # A string contains a newline of its own, so the split would not line up
+        return [escape_latex(text) for text in texts]
+    return escape_latex(joined).split('\n')
@@ -0,0 +1,202 @@
+import os
+import glob
+import time
+import asyncio
+import hashlib
+import tempfile
+import shutil
+import logging
+from typing import List, Dict, Optional
+from app.utils.compile_pool import compile_pool
+from app.utils.resume_template import TEMPLATE_VERSION, LATEX_PREAMBLE
+from app.utils.log_config import tex_errors
+from app.utils.file_lock import lock_file, unlock_file
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Format file configuration
+LATEX_FORMAT_DIR = settings.get("LATEX_FORMAT_DIR", os.path.join(os.getcwd(), "latex_formats"))
+LATEX_FORMAT_ENABLED = settings.get_bool("LATEX_FORMAT_ENABLED", True)
+LATEX_FORMAT_BUILD_TIMEOUT = settings.get_float("LATEX_FORMAT_BUILD_TIMEOUT", 120)
+# After a failed build, wait this long before building again, doubling with every further
+# failure up to LATEX_FORMAT_RETRY_MAX; compiles use the slow path meanwhile
+LATEX_FORMAT_RETRY_AFTER = settings.get_float("LATEX_FORMAT_RETRY_AFTER", 30)
+LATEX_FORMAT_RETRY_MAX = settings.get_float("LATEX_FORMAT_RETRY_MAX", 3600)
+
+# Messages pdflatex prints when it cannot use a format file
+FORMAT_ERRORS = (
+    "I can't find the format file",
+    "Fatal format file error",
+    "---! ",
+)
+
+
+class LatexFormat:
+    """
+    Precompiled LaTeX format holding the static resume preamble.
+
+    The format is built with mylatexformat from ``LATEX_PREAMBLE`` and named after
+    a hash of the preamble and template version, so a template change produces a
+    new format and the old one is treated as stale. Callers should check
+    ``available()`` before every compile and fall back to a plain run otherwise.
+    A failed build (e.g. a timeout under load) is retried with backoff; a
+    format pdflatex rejects is not used again by this process.
+    """
+
+    def __init__(self, preamble: str = LATEX_PREAMBLE,
+                 format_dir: str = LATEX_FORMAT_DIR,
+                 enabled: bool = LATEX_FORMAT_ENABLED):
+        digest = hashlib.sha256(f"{TEMPLATE_VERSION}\0{preamble}".encode('utf-8')).hexdigest()[:16]
+        self.preamble = preamble
+        self.format_dir = format_dir
+        self.enabled = enabled
+        self.name = f"resume-{digest}"
+        self.failed = False
+        self.build_failures = 0
+        self._retry_at = 0.0
+        self._build_lock = asyncio.Lock()
+        self._build_task: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.format_dir, f"{self.name}.fmt")
+
+    def available(self) -> bool:
+        """True if the current format exists and has not been rejected by pdflatex"""
+        return self.enabled and not self.failed and os.path.exists(self.path)
+
+    def matches(self, latex_content: str) -> bool:
+        """True if a document starts with the preamble this format was built from"""
+        return latex_content.startswith(self.preamble)
+
+    def compile_args(self) -> List[str]:
+        """Extra pdflatex arguments to compile against the format"""
+        return [f"-fmt={self.name}"]
+
+    def compile_env(self) -> Dict[str, str]:
+        """Environment that lets kpathsea find the format next to the system ones"""
+        env = dict(os.environ)
+        env["TEXFORMATS"] = f"{self.format_dir}{os.pathsep}{env.get('TEXFORMATS', '')}"
+        return env
+
+    def is_format_error(self, output: str) -> bool:
+        """True if pdflatex output shows the format could not be loaded"""
+        return any(marker in output for marker in FORMAT_ERRORS)
+
+    def invalidate(self) -> None:
+        """Stop using the format after pdflatex rejected it"""
+        if not self.failed:
+            logger.warning(f"LaTeX format {self.name} rejected by pdflatex, falling back to plain compiles")
+        self.failed = True
+
+    def schedule_build(self) -> None:
+        """Start a background build if the format is missing and no build is running"""
+        if not self.enabled or self.failed or os.path.exists(self.path):
+            return
+        if time.monotonic() < self._retry_at:
+            return
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.ensure_future(self.build())
+
+    async def build(self, force: bool = False) -> bool:
+        """
+        Build the format file if it is missing or stale
+
+        Parameters:
+        -----------
+        force : bool, optional
+            Rebuild even if a format with the current name already exists
+
+        Returns:
+        --------
+        bool
+            True if a usable format is in place afterwards
+        """
+        if not self.enabled:
+            return False
+
+        async with self._build_lock:
+            if not force and os.path.exists(self.path):
+                self._built()
+                return True
+
+            # Workers share the format directory: one builds, the others wait and reuse its format
+            lock = await asyncio.to_thread(lock_file, os.path.join(self.format_dir, f"{self.name}.lock"))
+            if not force and os.path.exists(self.path):
+                unlock_file(lock)
+                self._built()
+                return True
+
+            build_dir = tempfile.mkdtemp(dir=self.format_dir)
+            try:
+                source_path = os.path.join(build_dir, "resume_preamble.tex")
+                with open(source_path, "w", encoding='utf-8') as source_file:
+                    source_file.write(self.preamble)
+                    source_file.write("\n\\csname endofdump\\endcsname\n\\begin{document}\n\\end{document}\n")
+
+                logger.info(f"Building LaTeX format {self.name}")
+                returncode, stdout, _ = await compile_pool.run(
+                    ["pdflatex", "-ini", "-interaction=nonstopmode", f"-jobname={self.name}",
+                     "&pdflatex", "mylatexformat.ltx", "resume_preamble.tex"],
+                    cwd=build_dir,
+                    timeout=LATEX_FORMAT_BUILD_TIMEOUT
+                )
+                built_path = os.path.join(build_dir, f"{self.name}.fmt")
+                if returncode != 0 or not os.path.exists(built_path):
+                    logger.error(f"Building LaTeX format failed with status {returncode}",
+                                 extra={"tex_errors": tex_errors(stdout.decode('utf-8', errors='replace'))})
+                    self._build_failed()
+                    return False
+
+                # Atomic so concurrent compiles never see a half-written format
+                os.replace(built_path, self.path)
+                self._built()
+                self._remove_stale()
+                logger.info(f"LaTeX format built at: {self.path}")
+                return True
+
+            except Exception as e:
+                logger.error(f"Error building LaTeX format: {str(e)}")
+                self._build_failed()
+                return False
+            finally:
+                shutil.rmtree(build_dir, ignore_errors=True)
+                unlock_file(lock)
+
+    def _built(self) -> None:
+        self.failed = False
+        self.build_failures = 0
+        self._retry_at = 0.0
+
+    def _build_failed(self) -> None:
+        self.build_failures += 1
+        delay = min(LATEX_FORMAT_RETRY_MAX, LATEX_FORMAT_RETRY_AFTER * 2 ** (self.build_failures - 1))
+        self._retry_at = time.monotonic() + delay
+        logger.warning(f"LaTeX format build failed {self.build_failures} times in a row, retrying in {delay:.0f}s")
+
+    def _remove_stale(self) -> None:
+        # Formats of other template versions, unless a worker (e.g. of an older deployment
+        # still draining) is building one. Lock files are left in place: removing one that
+        # another process has open would let a third take the same lock.
+        for path in glob.glob(os.path.join(self.format_dir, "resume-*.fmt")):
+            if path == self.path:
+                continue
+            lock_path = f"{os.path.splitext(path)[0]}.lock"
+            lock = None
+            if os.path.exists(lock_path):
+                lock = lock_file(lock_path, blocking=False)
+                if lock is None:
+                    continue
+            try:
+                os.remove(path)
+                logger.info(f"Removed stale LaTeX format: {path}")
+            except OSError as e:
+                logger.warning(f"Error removing stale LaTeX format {path}: {str(e)}")
+            finally:
+                if lock is not None:
+                    unlock_file(lock)
+
+
+# Shared format used by ResumeGenerator
+latex_format = LatexFormat()
@@ -0,0 +1,141 @@
+import re
+import json
+import uuid
+import random
+import hashlib
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Iterator, List, Optional, Tuple
+from app.config import settings
+
+
+# "json" for one JSON object per line, "text" for the plain logging format
+PDF_LOG_FORMAT = settings.get("PDF_LOG_FORMAT", "json")
+PDF_LOG_LEVEL = settings.get("PDF_LOG_LEVEL", "INFO").upper()
+# Share of requests whose info and debug records are logged; warnings and errors always are
+PDF_LOG_SAMPLE_RATE = settings.get_float("PDF_LOG_SAMPLE_RATE", 1.0)
+
+# TeX error lines kept in logs and error messages, and the longest kept line
+TEX_ERROR_LINES = 8
+TEX_ERROR_LINE_LENGTH = 200
+
+# Longest request id accepted from the X-Request-ID header
+MAX_REQUEST_ID_LENGTH = 64
+
+# Attributes every LogRecord has; anything else was passed in ``extra`` and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# (request id, whether its info records are logged) of the request being handled
+_request_context: ContextVar[Optional[Tuple[str, bool]]] = ContextVar("pdf_request_context", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    context = _request_context.get()
+    return context[0] if context else None
+
+
+def new_request_id(header: Optional[str] = None) -> str:
+    """The caller's X-Request-ID if it is a sane token, otherwise a new id"""
+    if (header and len(header) <= MAX_REQUEST_ID_LENGTH
+            and all(char.isalnum() or char in "-_.:" for char in header)):
+        return header
+    return uuid.uuid4().hex
+
+
+@contextmanager
+def request_context(request_id: str, sample_rate: Optional[float] = None) -> Iterator[str]:
+    """
+    Tag the records logged inside the block with ``request_id``
+
+    Whether the request's info and debug records are kept is decided once,
+    so a sampled request is logged completely rather than line by line.
+    """
+    rate = PDF_LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+    token = _request_context.set((request_id, rate >= 1 or random.random() < rate))
+    try:
+        yield request_id
+    finally:
+        _request_context.reset(token)
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Short stable hash of a payload, to correlate log lines without logging its contents
+
+    Parameters:
+    -----------
+    value : Any
+        JSON-serializable payload, e.g. resume fields
+
+    Returns:
+    --------
+    str
+        First 16 hex digits of the SHA-256 of the canonical JSON
+    """
+    canonical = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def tex_errors(log: str) -> List[str]:
+    """
+    The error lines of pdflatex output: each "! ..." message and the "l.<n>"
+    line that locates it, instead of the whole log
+    """
+    errors = []
+    for line in log.splitlines():
+        if line.startswith(("!", "---!")) or re.match(r"l\.\d+ ", line):
+            errors.append(line[:TEX_ERROR_LINE_LENGTH])
+            if len(errors) == TEX_ERROR_LINES:
+                break
+    return errors
+
+
+class RequestContextFilter(logging.Filter):
+    """Adds ``request_id`` to records and drops the info records of requests not sampled"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _request_context.get()
+        record.request_id = context[0] if context else "-"
+        return context is None or context[1] or record.levelno >= logging.WARNING
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object: time, level, logger, message, request id and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", "-") != "-":
+            entry["request_id"] = record.request_id
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and name != "request_id":
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(log_format: str = PDF_LOG_FORMAT, level: str = PDF_LOG_LEVEL) -> None:
+    """
+    Send the service's logs to stderr through one handler, as JSON lines or plain text
+
+    Called once by the entry points (app.main, app.serve); replaces any handlers
+    already installed on the root logger.
+    """
+    handler = logging.StreamHandler()
+    handler.addFilter(RequestContextFilter())
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(request_id)s:%(message)s"))
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
@@ -0,0 +1,139 @@
+import re
+import copy
+from typing import Any, Dict, List, NamedTuple, Optional
+from app.utils.template_engine import Layout
+from app.utils.direct_pdf import DirectResumeRenderer, DIRECT_LAYOUTS, FIT_ADJUSTMENTS
+from app.config import settings
+
+# Fit configuration
+PDF_FIT_WIDTH_SCALE = settings.get_float("PDF_FIT_WIDTH_SCALE", 1.0)
+PDF_FIT_SAFETY_MARGIN = settings.get_float("PDF_FIT_SAFETY_MARGIN", 14)
+
+# Adjustments tried in order until the resume fits; each includes the ones before it
+FIT_LEVELS = ("default", "spacing", "margins", "font")
+
+# Layouts the estimator knows the geometry of
+FIT_LAYOUTS = DIRECT_LAYOUTS
+
+_FIT_SPACING = r"""% Fit to one page: tighter bullets and section titles
+\RenewDocumentCommand{\resumeItem}{m}{
+  \item\small{
+    {#1 \vspace{-3.5pt}}
+  }
+}
+\titlespacing*{\section}{0pt}{2.5ex plus 1ex minus .2ex}{1.5ex plus .2ex}
+"""
+
+_FIT_MARGINS = r"""% Fit to one page: narrower margins, no room kept for the empty header and footer
+\newgeometry{top=0.35in, bottom=0.35in, left=0.4in, right=0.4in}
+"""
+
+_FIT_FONT = r"""% Fit to one page: 10pt text and 9pt bullets
+\renewcommand{\normalsize}{\fontsize{10}{12}\selectfont}
+\renewcommand{\small}{\fontsize{9}{11}\selectfont}
+\normalsize
+"""
+
+# LaTeX each level adds right after \begin{document}. Being in the body, it leaves
+# the preamble alone, so fitted documents still use the precompiled format and
+# the warm workers.
+LATEX_FIT_COMMANDS: Dict[str, str] = {
+    "default": "",
+    "spacing": _FIT_SPACING,
+    "margins": _FIT_SPACING + _FIT_MARGINS,
+    "font": _FIT_SPACING + _FIT_MARGINS + _FIT_FONT,
+}
+
+# The estimator measures text with the Times metrics of the direct renderer;
+# Computer Modern sets wider, most of all in bold
+CM_WIDTH_SCALE: Dict[str, float] = {"regular": 1.1, "bold": 1.15, "italic": 1.05, "bold-italic": 1.12}
+
+# "Output written on resume.pdf (2 pages, 48211 bytes)."
+_OUTPUT_WRITTEN = re.compile(r"Output written on .+? \((\d+) pages?")
+
+
+class PageEstimate(NamedTuple):
+    pages: int
+    # Height in points left below the last line of the last page
+    free_height: float
+    # Edit paths of the bullets, education entries and skill lines that end past the first page
+    overflowing: List[str]
+
+
+class FitResult(NamedTuple):
+    # Level the document is rendered with
+    level: str
+    # Whether the estimate leaves it on one page with PDF_FIT_SAFETY_MARGIN to spare
+    fits: bool
+    estimated_pages: int
+    # Bullets and lines still past the first page at this level, the ones to trim
+    overflowing: List[str]
+
+
+def estimate_pages(data: Dict[str, Any], level: str = "default",
+                   width_scale: Optional[Dict[str, float]] = None) -> PageEstimate:
+    """
+    Estimate the pages a resume takes at a fit level, without TeX
+
+    Parameters:
+    -----------
+    data : Dict[str, Any]
+        Validated resume data
+    level : str, optional
+        One of FIT_LEVELS
+    width_scale : Dict[str, float], optional
+        Factor applied to text widths by style. None measures the direct
+        engine's own output, which makes the estimate exact for it.
+
+    Returns:
+    --------
+    PageEstimate
+        Page count, space left on the last page and what ends past page one
+    """
+    adjustments = dict(FIT_ADJUSTMENTS[level])
+    if width_scale:
+        adjustments["WIDTH_SCALE"] = width_scale
+    renderer = DirectResumeRenderer(adjustments)
+    pages = renderer.measure(data)
+    return PageEstimate(
+        pages=pages,
+        free_height=renderer.y - renderer.BOTTOM,
+        overflowing=[path for path, page in renderer.placements if page > 1],
+    )
+
+
+def choose_fit(data: Dict[str, Any], engine: str = "latex") -> FitResult:
+    """
+    Pick the first fit level at which a resume is estimated to fit on one page
+
+    If none does, the last level is returned together with the bullets and
+    lines that still overflow, so the document is compiled once either way.
+    """
+    if engine == "direct":
+        width_scale, margin = None, 0.0
+    else:
+        width_scale = {style: factor * PDF_FIT_WIDTH_SCALE for style, factor in CM_WIDTH_SCALE.items()}
+        margin = PDF_FIT_SAFETY_MARGIN
+
+    for level in FIT_LEVELS:
+        estimate = estimate_pages(data, level, width_scale)
+        if estimate.pages == 1 and estimate.free_height >= margin:
+            return FitResult(level, True, 1, [])
+    return FitResult(level, False, estimate.pages, estimate.overflowing)
+
+
+def fitted_layout(layout: Layout, level: str) -> Layout:
+    """The layout with a fit level's commands added after \\begin{document}"""
+    if not LATEX_FIT_COMMANDS[level]:
+        return layout
+    fitted = copy.copy(layout)
+    # Section names and versions are unchanged, so cached fragments are shared
+    fitted.prefix = layout.prefix + LATEX_FIT_COMMANDS[level]
+    return fitted
+
+
+def pages_from_log(log: str) -> Optional[int]:
+    """Page count pdflatex reports in its log or terminal output, or None if it wrote no PDF"""
+    # TeX wraps log lines at 79 characters, which can split a long output path
+    match = _OUTPUT_WRITTEN.search(log.replace("\n", ""))
+    return int(match.group(1)) if match else None
@@ -0,0 +1,231 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+from app.utils.resume_template import TEMPLATE_VERSION
+from app.utils.storage import get_storage
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration
+PDF_CACHE_DIR = settings.get("PDF_CACHE_DIR", os.path.join(os.getcwd(), "pdf_cache"))
+PDF_CACHE_MEMORY_ENTRIES = settings.get_int("PDF_CACHE_MEMORY_ENTRIES", 1024)
+PDF_CACHE_DISK_MAX_BYTES = settings.get_int("PDF_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024)
+# Workers of a multi-process deployment share the cache directory; each rescans it at most
+# this often before evicting, so files written by the others count towards the size limit
+PDF_CACHE_RESCAN_INTERVAL = settings.get_float("PDF_CACHE_RESCAN_INTERVAL", 30)
+# URLs not served by this process for this long are checked with storage again. An object
+# is only deleted after going unserved for PDF_SUPERSEDED_GRACE, and another worker may be
+# the one deleting it, so keep this well below the grace period.
+PDF_CACHE_MEMORY_TTL = settings.get_float("PDF_CACHE_MEMORY_TTL", 3600)
+
+
+def cache_key(latex_content: str, template_version: str = TEMPLATE_VERSION) -> str:
+    """Content address of a rendered document: hash of the template version and LaTeX source"""
+    digest = hashlib.sha256()
+    digest.update(template_version.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(latex_content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def object_key(key: str) -> str:
+    """Storage object name for a cache key"""
+    return f"{key}.pdf"
+
+
+class PdfCache:
+    """
+    Three-tier cache of generated PDFs addressed by ``cache_key``.
+
+    - memory: LRU of key -> public URL, answers repeat requests with no I/O for up to ``memory_ttl``
+    - disk: compiled PDFs under ``cache_dir``, evicted oldest-first by total size; the
+      directory may be shared by several worker processes. Its file I/O runs in threads.
+    - storage: the object is published under ``<key>.pdf``, so an existence check tells us it is already uploaded
+    """
+
+    def __init__(self, cache_dir: str = PDF_CACHE_DIR,
+                 memory_entries: int = PDF_CACHE_MEMORY_ENTRIES,
+                 disk_max_bytes: int = PDF_CACHE_DISK_MAX_BYTES,
+                 rescan_interval: float = PDF_CACHE_RESCAN_INTERVAL,
+                 memory_ttl: float = PDF_CACHE_MEMORY_TTL):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+        self.rescan_interval = rescan_interval
+        self.memory_ttl = memory_ttl
+        self._disk_scanned_at = 0.0
+        # key -> (public URL, when it was last served)
+        self._urls: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._pages: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_sizes: Optional[Dict[str, int]] = None
+        # Guards the disk index, which the threads doing disk I/O update
+        self._disk_lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0, "storage": 0}
+        self.misses = 0
+
+    # ---------- memory tier ----------
+
+    def remember(self, key: str, url: str) -> None:
+        """Record the public URL for a key in the memory tier"""
+        self._urls[key] = (url, time.monotonic())
+        self._urls.move_to_end(key)
+        while len(self._urls) > self.memory_entries:
+            self._urls.popitem(last=False)
+
+    def forget(self, key: str) -> None:
+        """Drop a key from the memory tier, e.g. once its stored object is deleted"""
+        self._urls.pop(key, None)
+
+    def remember_pages(self, key: str, pages: Optional[int]) -> None:
+        """Record the page count a compile reported for a key"""
+        if pages is None:
+            return
+        self._pages[key] = pages
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.memory_entries:
+            self._pages.popitem(last=False)
+
+    def page_count(self, key: str) -> Optional[int]:
+        """Page count of a document compiled by this process, or None if unknown"""
+        return self._pages.get(key)
+
+    async def lookup_url(self, key: str) -> Optional[str]:
+        """
+        Return the public URL for a key if the PDF is already uploaded
+
+        Checks the memory tier first and falls back to asking the storage backend.
+        """
+        entry = self._urls.get(key)
+        if entry is not None and time.monotonic() - entry[1] < self.memory_ttl:
+            self.remember(key, entry[0])
+            self.hits["memory"] += 1
+            return entry[0]
+
+        storage = get_storage()
+        if await storage.exists(object_key(key)):
+            url = storage.public_url(object_key(key))
+            self.remember(key, url)
+            self.hits["storage"] += 1
+            return url
+
+        return None
+
+    # ---------- disk tier ----------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, object_key(key))
+
+    def _load_disk_index(self) -> Dict[str, int]:
+        # Called with _disk_lock held
+        if self._disk_sizes is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(".pdf"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+            # Oldest first so eviction order matches last use
+            self._disk_sizes = {key: size for _, key, size in sorted(entries)}
+            self._disk_scanned_at = time.monotonic()
+        return self._disk_sizes
+
+    async def get_pdf(self, key: str) -> Optional[bytes]:
+        """Return the bytes of a cached PDF on disk, or None"""
+        pdf_bytes = await asyncio.to_thread(self._read_pdf, key)
+        if pdf_bytes is None:
+            self.misses += 1
+        else:
+            self.hits["disk"] += 1
+        return pdf_bytes
+
+    def _read_pdf(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as pdf_file:
+                pdf_bytes = pdf_file.read()
+            # Mark as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            with self._disk_lock:
+                self._load_disk_index().pop(key, None)
+            return None
+        with self._disk_lock:
+            sizes = self._load_disk_index()
+            sizes[key] = sizes.pop(key, len(pdf_bytes))
+        return pdf_bytes
+
+    async def put_pdf(self, key: str, pdf_bytes: bytes) -> None:
+        """
+        Store freshly compiled PDF bytes in the disk tier
+
+        Parameters:
+        -----------
+        key : str
+            Cache key of the document
+        pdf_bytes : bytes
+            Contents of the compiled PDF
+        """
+        if self.disk_max_bytes <= 0:
+            return
+        await asyncio.to_thread(self._write_pdf, key, pdf_bytes)
+
+    def _write_pdf(self, key: str, pdf_bytes: bytes) -> None:
+        with self._disk_lock:
+            # Creates the cache directory on first use
+            self._load_disk_index()
+        path = self._path(key)
+        # Write then rename so readers never see a partial file
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as pdf_file:
+            pdf_file.write(pdf_bytes)
+        os.replace(temp_path, path)
+        with self._disk_lock:
+            sizes = self._load_disk_index()
+            sizes.pop(key, None)
+            sizes[key] = len(pdf_bytes)
+            self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        # Called with _disk_lock held
+        if time.monotonic() - self._disk_scanned_at > self.rescan_interval:
+            # Pick up what other workers wrote and used since the last scan
+            self._disk_sizes = None
+        sizes = self._load_disk_index()
+        total = sum(sizes.values())
+        for key in list(sizes):
+            if total <= self.disk_max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Error evicting cached PDF {key}: {str(e)}")
+                continue
+            total -= sizes.pop(key)
+            logger.info(f"Evicted cached PDF {key} from disk")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters and tier sizes"""
+        with self._disk_lock:
+            sizes = dict(self._disk_sizes or {})
+        return {
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "memory_entries": len(self._urls),
+            "disk_entries": len(sizes),
+            "disk_bytes": sum(sizes.values()),
+        }
+
+
+# Shared cache used by the PDF routes
+pdf_cache = PdfCache()
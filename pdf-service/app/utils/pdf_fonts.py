@@ -0,0 +1,124 @@
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List
+
+# The PDF standard Times fonts used by the direct renderer, by style. Every
+# viewer provides these, so nothing has to be embedded.
+FONTS: Dict[str, str] = {
+    "regular": "Times-Roman",
+    "bold": "Times-Bold",
+    "italic": "Times-Italic",
+    "bold-italic": "Times-BoldItalic",
+}
+
+# Advance widths (1/1000 em) of character codes 32-126, from the Adobe AFM files
+_ASCII_WIDTHS: Dict[str, List[int]] = {
+    "regular": [
+        250, 333, 408, 500, 500, 833, 778, 180, 333, 333, 500, 564, 250, 333, 250, 278,
+        500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 278, 278, 564, 564, 564, 444,
+        921, 722, 667, 667, 722, 611, 556, 722, 722, 333, 389, 722, 611, 889, 722, 722,
+        556, 722, 667, 556, 611, 722, 722, 944, 722, 722, 611, 333, 278, 333, 469, 500,
+        333, 444, 500, 444, 500, 444, 333, 500, 500, 278, 278, 500, 278, 778, 500, 500,
+        500, 500, 333, 389, 278, 500, 500, 722, 500, 500, 444, 480, 200, 480, 541,
+    ],
+    "bold": [
+        250, 333, 555, 500, 500, 1000, 833, 278, 333, 333, 500, 570, 250, 333, 250, 278,
+        500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 333, 333, 570, 570, 570, 500,
+        930, 722, 667, 722, 722, 667, 611, 778, 778, 389, 500, 778, 667, 944, 722, 778,
+        611, 778, 722, 556, 667, 722, 722, 1000, 722, 722, 667, 333, 278, 333, 581, 500,
+        333, 500, 556, 444, 556, 444, 333, 500, 556, 278, 333, 556, 278, 833, 556, 500,
+        556, 556, 444, 389, 333, 556, 500, 722, 500, 500, 444, 394, 220, 394, 520,
+    ],
+    "italic": [
+        250, 333, 420, 500, 500, 833, 778, 214, 333, 333, 500, 675, 250, 333, 250, 278,
+        500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 333, 333, 675, 675, 675, 500,
+        920, 611, 611, 667, 722, 611, 611, 722, 722, 333, 444, 667, 556, 833, 667, 722,
+        611, 722, 611, 500, 556, 722, 611, 833, 611, 556, 556, 389, 278, 389, 422, 500,
+        333, 500, 500, 444, 500, 444, 278, 500, 500, 278, 278, 444, 278, 722, 500, 500,
+        500, 500, 389, 389, 278, 500, 444, 667, 444, 444, 389, 400, 275, 400, 541,
+    ],
+    "bold-italic": [
+        250, 389, 555, 500, 500, 833, 778, 278, 333, 333, 500, 570, 250, 333, 250, 278,
+        500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 333, 333, 570, 570, 570, 500,
+        832, 667, 667, 667, 722, 667, 667, 722, 778, 389, 500, 667, 611, 889, 722, 722,
+        611, 722, 667, 556, 611, 722, 667, 889, 667, 611, 611, 333, 278, 333, 570, 500,
+        333, 500, 500, 444, 500, 444, 333, 500, 556, 278, 278, 500, 278, 778, 556, 500,
+        500, 500, 389, 389, 278, 556, 444, 667, 500, 444, 389, 348, 220, 348, 570,
+    ],
+}
+
+# Widths of the non-ASCII WinAnsi characters resumes use that are not accented
+# letters; the Times styles differ little here, so one table serves all four
+_EXTRA_WIDTHS: Dict[str, int] = {
+    '\u00a0': 250, '•': 350, '–': 500, '—': 1000, '‘': 333, '’': 333, '‚': 333,
+    '“': 444, '”': 444, '„': 444, '…': 1000, '™': 980, '©': 760, '®': 760,
+    '°': 400, '§': 500, '¶': 453, '×': 564, '÷': 564, '±': 564, '€': 500,
+    '£': 500, '¥': 500, '¢': 500, 'ß': 500, 'æ': 667, 'Æ': 889, 'œ': 722,
+    'Œ': 889, 'ø': 500, 'Ø': 722, '·': 250, '«': 500, '»': 500, '‹': 333,
+    '›': 333, '†': 500, '‡': 500, 'µ': 500, 'ð': 500, 'Ð': 722, 'þ': 500,
+    'Þ': 556, '¿': 444, '¡': 333, '¹': 300, '²': 300, '³': 300,
+}
+
+# Characters outside WinAnsi that have a readable ASCII stand-in
+_SUBSTITUTES: Dict[str, str] = {
+    '→': '->', '←': '<-', '↔': '<->', '⇒': '=>', '≤': '<=', '≥': '>=',
+    '≠': '!=', '≈': '~', '−': '-', '‐': '-', '‑': '-', '‒': '-', '―': '—',
+    '′': "'", '″': '"', '∞': 'infinity', 'ı': 'i', 'ł': 'l', 'Ł': 'L',
+    '\u2002': ' ', '\u2003': ' ', '\u2009': ' ', '\u200a': ' ', '\u202f': ' ',
+}
+
+
+def _encodable(char: str) -> bool:
+    try:
+        char.encode("cp1252")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+@lru_cache(maxsize=4096)
+def _winansi_char(char: str) -> str:
+    if _encodable(char):
+        return char if char >= ' ' or char in '\t\n' else ''
+    substitute = _SUBSTITUTES.get(char)
+    if substitute is not None:
+        return substitute
+    # Accented letters WinAnsi lacks keep their base letter; "ﬁ" becomes "fi"
+    for form in ('NFKC', 'NFKD'):
+        normalized = "".join(c for c in unicodedata.normalize(form, char) if not unicodedata.combining(c))
+        if normalized and normalized != char and all(_encodable(c) for c in normalized):
+            return normalized
+    return ''
+
+
+def to_winansi(text: str) -> str:
+    """
+    Text restricted to characters the standard fonts can show
+
+    WinAnsi (cp1252) covers Western European text; other characters are
+    replaced with a close equivalent or dropped.
+    """
+    if text.isascii() and text.isprintable():
+        return text
+    return "".join(_winansi_char(char) for char in unicodedata.normalize('NFC', text))
+
+
+@lru_cache(maxsize=8192)
+def _char_width(char: str, style: str) -> int:
+    code = ord(char)
+    if 32 <= code <= 126:
+        return _ASCII_WIDTHS[style][code - 32]
+    if char in _EXTRA_WIDTHS:
+        return _EXTRA_WIDTHS[char]
+    base = unicodedata.normalize('NFKD', char)[:1]
+    if base and base != char and 32 <= ord(base) <= 126:
+        return _ASCII_WIDTHS[style][ord(base) - 32]
+    return 500
+
+
+def text_width(text: str, style: str, size: float) -> float:
+    """Width in points of WinAnsi text set in one of the Times styles"""
+    widths = _ASCII_WIDTHS[style]
+    if text.isascii():
+        return sum(widths[ord(char) - 32] if ' ' <= char <= '~' else 0 for char in text) * size / 1000
+    return sum(_char_width(char, style) for char in text) * size / 1000
@@ -1,19 +1,38 @@
 import os
-import tempfile
-import subprocess
+import asyncio
 import shutil
 from typing import List, Dict, Optional, Tuple, Any
 import logging
 import re
+import time
 from datetime import datetime
-import json
+from app.utils.compile_pool import compile_pool, compile_temp_dir, CompileQueueFull, CompileTimeout
+from app.utils.latex_format import latex_format
+from app.utils.warm_tex import warm_tex_pool
+from app.utils.resume_template import get_layout, DEFAULT_LAYOUT
+from app.utils.latex_escape import escape_latex
+from app.utils.fragment_cache import FragmentCache, RenderedDocument
+from app.utils.template_engine import Layout
+from app.utils.page_fit import FitResult
+from app.utils import direct_pdf, page_fit
+from app.utils.metrics import Counter, stage
+from app.utils.profiling import profiling_active, record_tex
+from app.utils.log_config import fingerprint, tex_errors
+from app.config import settings
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rendering engines: "latex" compiles with pdflatex, "direct" draws the PDF in-process
+ENGINES = ("latex", "direct")
+PDF_ENGINE = settings.get("PDF_ENGINE", "latex")
+
+compile_errors = Counter("pdf_compile_errors_total", "Compiles that failed, by engine", ("engine",))
+
+class LatexCompileError(Exception):
+    """Raised when pdflatex exits with a non-zero status"""
+
 class ResumeGenerator:
-    def __init__(self, output_dir: str = None):
+    def __init__(self, output_dir: str = None, layout: str = DEFAULT_LAYOUT, engine: Optional[str] = None):
         """
         Initialize the resume generator
         
@@ -21,14 +40,23 @@ class ResumeGenerator:
         -----------
         output_dir : str, optional
             Directory to save the output PDF. Defaults to current directory.
+        layout : str, optional
+            Name of a registered resume layout. Defaults to the Jake Gutierrez template.
+        engine : str, optional
+            "latex" or "direct". Defaults to PDF_ENGINE. With the direct engine the
+            rendered source is serialized resume data rather than LaTeX, and
+            compiling lays it out in-process without TeX.
         """
-        # Set up the output directory structure
+        self.layout = get_layout(layout)
+        self.engine = engine or PDF_ENGINE
+        if self.engine not in ENGINES:
+            raise ValueError(f"Unknown PDF engine: {self.engine}")
+        if self.engine == "direct" and self.layout.name not in direct_pdf.DIRECT_LAYOUTS:
+            raise ValueError(f"The direct engine cannot render the {self.layout.name} layout")
+        # Output directory structure, created by compile_latex, the only path writing there;
+        # generators are built per request and most never write to disk
         self.base_dir = output_dir or os.getcwd()
         self.pdf_dir = os.path.join(self.base_dir, "generated_pdfs")
-        
-        # Create necessary directories
-        os.makedirs(self.base_dir, exist_ok=True)
-        os.makedirs(self.pdf_dir, exist_ok=True)
 
     def _validate_input_data(self, data: Dict[str, Any]) -> None:
         """
@@ -94,37 +122,47 @@ class ResumeGenerator:
         """
         Escape special LaTeX characters in the text
         """
-        special_chars = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\^{}',
-            '\\': r'\textbackslash{}',
-            '<': r'\textless{}',
-            '>': r'\textgreater{}',
-        }
-        return ''.join(special_chars.get(c, c) for c in text)
-
-    def generate_resume(self,
-                        # Personal Information
-                        full_name: str,
-                        email: str,
-                        linkedin_url: str,
-                        github_url: str,
-                        education_entries: List[Dict[str, str]],
-                        experience_entries: List[Dict[str, Any]],
-                        project_entries: List[Dict[str, Any]],
-                        skill_categories: List[Dict[str, Any]],
-                        output_filename: str = "resume.pdf",
-                        phone_number: Optional[str] = None,
-                        website_url: Optional[str] = None) -> str:
+        return escape_latex(text)
+
+    def fit_to_page(self, data: Dict[str, Any]) -> FitResult:
         """
-        Generate a PDF resume from the provided information
+        Choose how to fit resume data on one page, without compiling
+
+        The height of the document is estimated from font metrics for each fit
+        level in turn (tighter spacing, then narrower margins, then a smaller
+        font) and the first level that fits is picked. If even the last one
+        overflows, the result lists the bullets and lines that end past the first page.
+        """
+        if self.layout.name not in page_fit.FIT_LAYOUTS:
+            raise ValueError(f"Fitting to one page is not supported for the {self.layout.name} layout")
+        self._validate_input_data(data)
+        with stage("fit"):
+            return page_fit.choose_fit(data, self.engine)
+
+    def _fitted(self, data: Dict[str, Any], fit_to_page: bool) -> Tuple[Layout, Optional[FitResult]]:
+        """The layout to render validated data with, adjusted to fit one page if asked"""
+        if not fit_to_page:
+            return self.layout, None
+        fit = self.fit_to_page(data)
+        logger.info(f"Fitting to one page with level {fit.level} (estimated {fit.estimated_pages} pages)")
+        return page_fit.fitted_layout(self.layout, fit.level), fit
+
+    def render_latex(self,
+                     # Personal Information
+                     full_name: str,
+                     email: str,
+                     linkedin_url: str,
+                     github_url: str,
+                     education_entries: List[Dict[str, str]],
+                     experience_entries: List[Dict[str, Any]],
+                     project_entries: List[Dict[str, Any]],
+                     skill_categories: List[Dict[str, Any]],
+                     phone_number: Optional[str] = None,
+                     website_url: Optional[str] = None,
+                     fit_to_page: bool = False) -> str:
+        """
+        Validate the provided information and render the LaTeX source for it,
+        adjusted to fit on one page when ``fit_to_page`` is set
         """
         try:
             # Validate input data
@@ -141,80 +179,228 @@ class ResumeGenerator:
             }
             
             logger.info("Validating input data...")
-            self._validate_input_data(input_data)
+            with stage("validate"):
+                self._validate_input_data(input_data)
             logger.info("Input data validation successful")
 
-            # Generate filename with timestamp
-            output_filename = self._generate_filename(output_filename)
+            # Create the LaTeX content
+            return self._create_latex_content(
+                full_name, email, linkedin_url, github_url,
+                education_entries, experience_entries, project_entries,
+                skill_categories, phone_number, website_url, fit_to_page
+            )
+
+        except Exception as e:
+            # The resume itself is personal data: log a hash to correlate requests instead
+            logger.error(f"Error in render_latex: {str(e)}", extra={"payload_hash": fingerprint(input_data)})
+            raise
+
+    def render_document(self, data: Dict[str, Any], fragments: FragmentCache,
+                        section_keys: Optional[Dict[str, str]] = None,
+                        fit_to_page: bool = False) -> RenderedDocument:
+        """
+        Validate resume data and render it, reusing sections cached in ``fragments``
+
+        Parameters:
+        -----------
+        data : Dict[str, Any]
+            Resume fields as taken by render_latex; defaults are filled in place
+        fragments : FragmentCache
+            Cache of rendered sections
+        section_keys : Dict[str, str], optional
+            Keys of sections known to be unchanged since an earlier render
+        fit_to_page : bool, optional
+            Adjust spacing, margins and font size so the resume fits on one page
+
+        Returns:
+        --------
+        RenderedDocument
+            The LaTeX source, the key of every section, the sections rendered
+            and the page fit chosen
+        """
+        with stage("validate"):
+            self._validate_input_data(data)
+        layout, fit = self._fitted(data, fit_to_page)
+        with stage("render"):
+            if self.engine == "direct":
+                # Laid out as a whole at compile time; there are no fragments to reuse
+                source = direct_pdf.document_source(data, fit.level if fit else None)
+                return RenderedDocument(source, {}, list(self.layout.SECTIONS), fit)
+            return fragments.render(layout, data, section_keys)._replace(fit=fit)
+
+    async def compile_pdf(self, latex_content: str) -> bytes:
+        """
+        Compile LaTeX source and return the PDF bytes
+
+        Compilation happens in a throwaway directory (under PDF_COMPILE_TEMP_DIR,
+        e.g. a tmpfs, when set) and nothing is written to the output directory.
+        The direct engine lays the document out in a worker thread instead,
+        holding a compile slot like a pdflatex run.
+        """
+        pdf_bytes, _ = await self.compile_pdf_with_page_count(latex_content)
+        return pdf_bytes
+
+    async def compile_pdf_with_page_count(self, latex_content: str) -> Tuple[bytes, Optional[int]]:
+        """
+        Like compile_pdf, but also return the page count
+
+        The count is read from the pdflatex output, so checking whether a
+        document fits on one page costs no extra compile. It is None if
+        pdflatex did not report it.
+        """
+        if self.engine == "direct":
+            async with compile_pool.slot():
+                try:
+                    with stage("compile"):
+                        pdf_bytes = await asyncio.to_thread(direct_pdf.render_pdf, latex_content)
+                    return pdf_bytes, direct_pdf.page_count(pdf_bytes)
+                except Exception as e:
+                    compile_errors.inc(engine="direct")
+                    logger.error(f"Error rendering PDF directly: {str(e)}")
+                    raise Exception(f"Error generating PDF: {str(e)}")
+        
+        # Create a temporary directory to store LaTeX files
+        temp_dir = compile_temp_dir()
+        try:
+            logger.info("Starting PDF generation process")
+            
+            # Write LaTeX content to a file
+            tex_path = os.path.join(temp_dir, "resume.tex")
+            with open(tex_path, "w", encoding='utf-8') as tex_file:
+                tex_file.write(latex_content)
             
-            # Create a temporary directory to store LaTeX files
-            temp_dir = tempfile.mkdtemp()
+            logger.info("LaTeX file created, starting compilation")
+            
+            # Compile the LaTeX file to PDF in a compile slot with timeout
             try:
-                logger.info("Starting PDF generation process")
+                with stage("compile"):
+                    returncode, stdout, stderr = await self._run_pdflatex(temp_dir, tex_path, latex_content)
+                if returncode != 0:
+                    compile_errors.inc(engine="latex")
+                    errors = tex_errors(self._read_log(temp_dir) or stdout.decode('utf-8', errors='replace'))
+                    logger.error(f"Error compiling LaTeX: pdflatex exited with status {returncode}",
+                                 extra={"tex_errors": errors})
+                    raise LatexCompileError(f"Error generating PDF: {'; '.join(errors) or f'pdflatex exited with status {returncode}'}")
                 
-                # Create the LaTeX content
-                latex_content = self._create_latex_content(
-                    full_name, email, linkedin_url, github_url,
-                    education_entries, experience_entries, project_entries,
-                    skill_categories, phone_number, website_url
-                )
+                logger.info("PDF compilation completed")
                 
-                # Write LaTeX content to a file
-                tex_path = os.path.join(temp_dir, "resume.tex")
-                with open(tex_path, "w", encoding='utf-8') as tex_file:
-                    tex_file.write(latex_content)
+                pdf_path = os.path.join(temp_dir, "resume.pdf")
+                if not os.path.exists(pdf_path):
+                    raise FileNotFoundError("Generated PDF file not found")
                 
-                logger.info("LaTeX file created, starting compilation")
+                with stage("copy"), open(pdf_path, "rb") as pdf_file:
+                    pdf_bytes = pdf_file.read()
                 
-                # Compile the LaTeX file to PDF with timeout
-                try:
-                    process = subprocess.run(
-                        ["pdflatex", "-interaction=nonstopmode", "-output-directory", temp_dir, tex_path],
-                        check=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        timeout=30  # 30 seconds timeout
-                    )
-                    
-                    logger.info("PDF compilation completed")
-                    
-                    # Copy the PDF to the output directory
-                    pdf_path = os.path.join(temp_dir, "resume.pdf")
-                    output_path = os.path.join(self.pdf_dir, output_filename)
-                    
-                    if not os.path.exists(pdf_path):
-                        raise FileNotFoundError("Generated PDF file not found")
-                    
-                    # Copy the file instead of reading and writing
-                    shutil.copy2(pdf_path, output_path)
-                    
-                    logger.info(f"PDF successfully generated at: {output_path}")
-                    return output_path
-                    
-                except subprocess.TimeoutExpired:
-                    logger.error("PDF generation timed out after 30 seconds")
-                    raise Exception("PDF generation timed out. Please try again.")
-                except subprocess.CalledProcessError as e:
-                    logger.error(f"Error compiling LaTeX: {e}")
-                    logger.error(f"STDOUT: {e.stdout.decode('utf-8')}")
-                    logger.error(f"STDERR: {e.stderr.decode('utf-8')}")
-                    raise Exception(f"Error generating PDF: {e.stderr.decode('utf-8')}")
-                except Exception as e:
-                    logger.error(f"Unexpected error during PDF generation: {str(e)}")
-                    raise Exception(f"Error generating PDF: {str(e)}")
-                    
-            finally:
-                # Clean up temporary directory
-                try:
+                pages = page_fit.pages_from_log(stdout.decode('utf-8', errors='replace'))
+                if pages is None:
+                    pages = page_fit.pages_from_log(self._read_log(temp_dir))
+                return pdf_bytes, pages
+                
+            except (CompileQueueFull, LatexCompileError):
+                raise
+            except CompileTimeout:
+                logger.error(f"PDF generation timed out after {compile_pool.timeout:g} seconds")
+                raise Exception("PDF generation timed out. Please try again.")
+            except Exception as e:
+                logger.error(f"Unexpected error during PDF generation: {str(e)}")
+                raise Exception(f"Error generating PDF: {str(e)}")
+                
+        finally:
+            # Clean up temporary directory
+            try:
+                with stage("cleanup"):
                     shutil.rmtree(temp_dir)
-                    logger.info("Temporary files cleaned up")
-                except Exception as e:
-                    logger.warning(f"Error cleaning up temporary files: {str(e)}")
-                    
-        except Exception as e:
-            logger.error(f"Error in generate_resume: {str(e)}")
-            logger.error(f"Input data: {json.dumps(input_data, indent=2)}")
-            raise
+                logger.info("Temporary files cleaned up")
+            except Exception as e:
+                logger.warning(f"Error cleaning up temporary files: {str(e)}")
+
+    async def compile_latex(self, latex_content: str, output_filename: str = "resume.pdf") -> str:
+        """
+        Compile LaTeX source to a PDF in the output directory and return its path
+        """
+        # Generate filename with timestamp
+        output_filename = self._generate_filename(output_filename)
+        output_path = os.path.join(self.pdf_dir, output_filename)
+        
+        pdf_bytes = await self.compile_pdf(latex_content)
+        os.makedirs(self.pdf_dir, exist_ok=True)
+        with stage("copy"), open(output_path, "wb") as output_file:
+            output_file.write(pdf_bytes)
+        
+        logger.info(f"PDF successfully generated at: {output_path}")
+        return output_path
+
+    @staticmethod
+    def _read_log(temp_dir: str) -> str:
+        """The pdflatex log of a compile, or an empty string if none was written"""
+        try:
+            with open(os.path.join(temp_dir, "resume.log"), encoding='utf-8', errors='replace') as log_file:
+                return log_file.read()
+        except OSError:
+            return ""
+
+    async def _run_pdflatex(self, temp_dir: str, tex_path: str, latex_content: str) -> Tuple[int, bytes, bytes]:
+        """
+        Run pdflatex on a file, preferring a warm worker and then the precompiled
+        preamble format, and falling back to a plain compile
+        """
+        started_at = time.perf_counter()
+        warm_result = await warm_tex_pool.compile(latex_content, os.path.join(temp_dir, "resume.pdf"))
+        if warm_result is not None:
+            returncode, stdout = warm_result
+            record_tex("warm", time.perf_counter() - started_at, returncode, stdout)
+            return returncode, stdout, b""
+
+        # batchmode: nothing is written to the terminal, so there is no output to pipe
+        # and buffer; the page count and any errors are read from resume.log
+        args = ["pdflatex", "-interaction=batchmode", "-output-directory", temp_dir, tex_path]
+        if profiling_active():
+            # Lists every file TeX reads in resume.fls, for the request's profile
+            args.insert(1, "-recorder")
+
+        if latex_format.available() and latex_format.matches(latex_content):
+            started_at = time.perf_counter()
+            returncode, stdout, stderr = await compile_pool.run(
+                args[:1] + latex_format.compile_args() + args[1:],
+                cwd=temp_dir,
+                env=latex_format.compile_env()
+            )
+            record_tex("format", time.perf_counter() - started_at, returncode, stdout, temp_dir)
+            if returncode == 0 or not latex_format.is_format_error(stdout.decode('utf-8', errors='replace')):
+                return returncode, stdout, stderr
+            # The format is unusable (e.g. written by another pdfTeX version)
+            latex_format.invalidate()
+        else:
+            latex_format.schedule_build()
+
+        started_at = time.perf_counter()
+        returncode, stdout, stderr = await compile_pool.run(args, cwd=temp_dir)
+        record_tex("plain", time.perf_counter() - started_at, returncode, stdout, temp_dir)
+        return returncode, stdout, stderr
+
+    async def generate_resume(self,
+                              # Personal Information
+                              full_name: str,
+                              email: str,
+                              linkedin_url: str,
+                              github_url: str,
+                              education_entries: List[Dict[str, str]],
+                              experience_entries: List[Dict[str, Any]],
+                              project_entries: List[Dict[str, Any]],
+                              skill_categories: List[Dict[str, Any]],
+                              output_filename: str = "resume.pdf",
+                              phone_number: Optional[str] = None,
+                              website_url: Optional[str] = None,
+                              fit_to_page: bool = False) -> str:
+        """
+        Generate a PDF resume from the provided information
+        """
+        latex_content = self.render_latex(
+            full_name, email, linkedin_url, github_url,
+            education_entries, experience_entries, project_entries,
+            skill_categories, phone_number, website_url, fit_to_page
+        )
+        return await self.compile_latex(latex_content, output_filename)
 
     def _create_latex_content(self,
                               full_name: str,
@@ -226,236 +412,28 @@ class ResumeGenerator:
                               project_entries: List[Dict[str, Any]],
                               skill_categories: List[Dict[str, Any]],
                               phone_number: Optional[str] = None,
-                              website_url: Optional[str] = None) -> str:
-        """Create the LaTeX content for the resume"""
-        # Escape all text inputs
-        full_name = self._escape_latex(full_name)
-        phone_number = self._escape_latex(phone_number) if phone_number else ''
-        email = self._escape_latex(email)
-        linkedin_url = self._escape_latex(linkedin_url) if linkedin_url else ''
-        github_url = self._escape_latex(github_url) if github_url else ''
-        website_url = self._escape_latex(website_url) if website_url else ''
-
-        # Preamble
-        latex_content = r"""%-------------------------
-% Resume in Latex
-% Author : Jake Gutierrez
-% Based off of: https://github.com/sb2nov/resume
-% License : MIT
-%------------------------
-
-\documentclass[letterpaper,11pt]{article}
-
-\usepackage{latexsym}
-\usepackage[empty]{fullpage}
-\usepackage{titlesec}
-\usepackage{marvosym}
-\usepackage[usenames,dvipsnames]{color}
-\usepackage{verbatim}
-\usepackage{enumitem}
-\usepackage[hidelinks]{hyperref}
-\usepackage{fancyhdr}
-\usepackage[english]{babel}
-\usepackage{tabularx}
-\usepackage{graphicx}
-\usepackage{float}
-\usepackage{geometry}
-\usepackage{xparse}
-\input{glyphtounicode}
-
-% Adjust margins to use more space
-\geometry{
-    top=0.5in,
-    bottom=0.5in,
-    left=0.5in,
-    right=0.5in,
-    includehead,
-    includefoot
-}
-
-%----------FONT OPTIONS----------
-% sans-serif
-% \usepackage[sfdefault]{FiraSans}
-% \usepackage[sfdefault]{roboto}
-% \usepackage[sfdefault]{noto-sans}
-% \usepackage[default]{sourcesanspro}
-
-% serif
-% \usepackage{CormorantGaramond}
-% \usepackage{charter}
-
-\pagestyle{fancy}
-\fancyhf{} % clear all header and footer fields
-\fancyfoot{}
-\renewcommand{\headrulewidth}{0pt}
-\renewcommand{\footrulewidth}{0pt}
-
-\urlstyle{same}
-
-\raggedbottom
-\raggedright
-\setlength{\tabcolsep}{0in}
-
-% Sections formatting
-\titleformat{\section}{
-  \vspace{-4pt}\scshape\raggedright\large
-}{}{0em}{}[\color{black}\titlerule \vspace{-5pt}]
-
-% Ensure that generate pdf is machine readable/ATS parsable
-\pdfgentounicode=1
-
-%-------------------------
-% Custom commands
-\NewDocumentCommand{\resumeItem}{m}{
-  \item\small{
-    {#1 \vspace{-2pt}}
-  }
-}
-
-\NewDocumentCommand{\resumeSubheading}{mmmm}{
-  \vspace{-2pt}\item
-    \begin{tabular*}{0.97\textwidth}[t]{l@{\extracolsep{\fill}}r}
-      \textbf{#1} & #2 \\
-      \textit{\small#3} & \textit{\small #4} \\
-    \end{tabular*}\vspace{-7pt}
-}
-
-\NewDocumentCommand{\resumeSubSubheading}{mm}{
-    \item
-    \begin{tabular*}{0.97\textwidth}{l@{\extracolsep{\fill}}r}
-      \textit{\small#1} & \textit{\small #2} \\
-    \end{tabular*}\vspace{-7pt}
-}
-
-\NewDocumentCommand{\resumeProjectHeading}{mm}{
-    \item
-    \begin{tabular*}{0.97\textwidth}{l@{\extracolsep{\fill}}r}
-      \small#1 & #2 \\
-    \end{tabular*}\vspace{-7pt}
-}
-
-\NewDocumentCommand{\resumeSubItem}{m}{\resumeItem{#1}\vspace{-4pt}}
-
-\renewcommand\labelitemii{$\vcenter{\hbox{\tiny$\bullet$}}$}
-
-\NewDocumentEnvironment{resumeSubHeadingListStart}{}{
-  \begin{itemize}[leftmargin=0.15in, label={}]
-}{
-  \end{itemize}
-}
-
-\NewDocumentEnvironment{resumeItemListStart}{}{
-  \begin{itemize}
-}{
-  \end{itemize}\vspace{-5pt}
-}
-
-%-------------------------------------------
-%%%%%%  RESUME STARTS HERE  %%%%%%%%%%%%%%%%%%%%%%%%%%%%
-
-
-\begin{document}
-"""
-
-        # Header
-        website_part = f" $|$ \\href{{https://{website_url}}}{{\\underline{{{website_url}}}}}" if website_url else ""
-        latex_content += f"""
-%----------HEADING----------
-\\begin{{center}}
-    \\textbf{{\\Huge \\scshape {full_name}}} \\\\
-    \\vspace{{2pt}}
-    \\href{{mailto:{email}}}{{\\underline{{{email}}}}} $|$ 
-    \\href{{https://{linkedin_url}}}{{\\underline{{{linkedin_url}}}}} $|$
-    \\href{{https://{github_url}}}{{\\underline{{{github_url}}}}}{website_part}
-\\end{{center}}
-
-"""
-
-        # Education section
-        latex_content += r"""
-%-----------EDUCATION-----------
-\section{Education}
-  \begin{resumeSubHeadingListStart}
-"""
-        for edu in education_entries:
-            latex_content += fr"""    \resumeSubheading
-      {{{self._escape_latex(edu['institution'])}}}{{{self._escape_latex(edu['location'])}}}
-      {{{self._escape_latex(edu['degree'])}}}{{{self._escape_latex(edu['date_range'])}}}
-"""
-        latex_content += r"""  \end{resumeSubHeadingListStart}
-
-"""
-
-        # Experience section
-        latex_content += r"""
-%-----------EXPERIENCE-----------
-\section{Experience}
-  \begin{resumeSubHeadingListStart}
-"""
-        for exp in experience_entries:
-            latex_content += fr"""
-    \resumeSubheading
-      {{{self._escape_latex(exp['title'])}}}{{{self._escape_latex(exp['dates'])}}}
-      {{{self._escape_latex(exp['organization'])}}}{{{self._escape_latex(exp['location'])}}}
-      \begin{{resumeItemListStart}}
-"""
-            for resp in exp['responsibilities']:
-                latex_content += fr"""        \resumeItem{{{self._escape_latex(resp)}}}
-"""
-            latex_content += r"""      \end{resumeItemListStart}
-"""
-        latex_content += r"""
-  \end{resumeSubHeadingListStart}
-
-"""
-
-        # Projects section
-        latex_content += r"""
-%-----------PROJECTS-----------
-\section{Projects}
-    \begin{resumeSubHeadingListStart}
-"""
-        for proj in project_entries:
-            latex_content += fr"""      \resumeProjectHeading
-          {{\textbf{{{self._escape_latex(proj['name'])}}} $|$ \emph{{{self._escape_latex(proj['technologies'])}}}}}{{{"" if 'date_range' not in proj else self._escape_latex(proj['date_range'])}}}
-          \begin{{resumeItemListStart}}
-"""
-            for detail in proj['details']:
-                latex_content += fr"""            \resumeItem{{{self._escape_latex(detail)}}}
-"""
-            latex_content += r"""          \end{resumeItemListStart}
-"""
-        latex_content += r"""    \end{resumeSubHeadingListStart}
-
-"""
-
-        # Technical Skills section
-        if skill_categories:
-            latex_content += r"""
-%-----------TECHNICAL SKILLS-----------
-\section{Technical Skills}
- \begin{itemize}[leftmargin=0.15in, label={}, nosep]
-"""
-            for category in skill_categories:
-                if category['skills']:  # Only add category if it has skills
-                    skills_str = ', '.join(self._escape_latex(skill) for skill in category['skills'])
-                    latex_content += fr"""    \small{{\item{{
-     \textbf{{{self._escape_latex(category['category_name'])}}}{{: {skills_str}}}
-    }}}}
-"""
-            latex_content += r""" \end{itemize}
-
-"""
-
-        # End document
-        latex_content += r"""
-%-------------------------------------------
-\end{document}
-"""
-        return latex_content
-
-
-def generate_resume_pdf(
+                              website_url: Optional[str] = None,
+                              fit_to_page: bool = False) -> str:
+        """Create the LaTeX content for the resume, or the document source for the direct engine"""
+        data = {
+            'full_name': full_name,
+            'email': email,
+            'phone_number': phone_number,
+            'linkedin_url': linkedin_url,
+            'github_url': github_url,
+            'website_url': website_url,
+            'education_entries': education_entries,
+            'experience_entries': experience_entries,
+            'project_entries': project_entries,
+            'skill_categories': skill_categories,
+        }
+        layout, fit = self._fitted(data, fit_to_page)
+        with stage("render"):
+            if self.engine == "direct":
+                return direct_pdf.document_source(data, fit.level if fit else None)
+            return layout.render(data)
+
+async def generate_resume_pdf(
     # Personal Information
     full_name: str,
     phone_number: str,
@@ -525,7 +503,7 @@ def generate_resume_pdf(
         Path to the generated PDF file
     """
     generator = ResumeGenerator(output_dir=output_dir)
-    return generator.generate_resume(
+    return await generator.generate_resume(
         full_name, email, linkedin_url, github_url,
         education_entries, experience_entries, project_entries,
         skill_categories, output_filename, phone_number, website_url
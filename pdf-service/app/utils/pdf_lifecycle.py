@@ -0,0 +1,300 @@
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.utils.storage import get_storage
+from app.utils.pdf_cache import pdf_cache
+from app.utils.file_lock import lock_file, unlock_file
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lifecycle configuration
+PDF_LIFECYCLE_ENABLED = settings.get_bool("PDF_LIFECYCLE_ENABLED", True)
+PDF_LIFECYCLE_DB_PATH = settings.get("PDF_LIFECYCLE_DB_PATH", os.path.join(os.getcwd(), "pdf_objects.sqlite3"))
+# Unowned objects are deleted this long after they were last served; 0 keeps them forever.
+# Off by default: callers that send no owner_id/resume_id may still hold the URL
+PDF_OBJECT_TTL = settings.get_float("PDF_OBJECT_TTL", 0)
+# Superseded versions of a user's resume stay this long, since their URLs may still be open
+PDF_SUPERSEDED_GRACE = settings.get_float("PDF_SUPERSEDED_GRACE", 24 * 3600)
+PDF_SWEEP_INTERVAL = settings.get_float("PDF_SWEEP_INTERVAL", 3600)
+# DeleteObjects accepts at most 1000 keys per request
+PDF_SWEEP_BATCH_SIZE = min(1000, settings.get_int("PDF_SWEEP_BATCH_SIZE", 1000))
+
+Reference = Tuple[str, str]
+
+
+class PdfLifecycle:
+    """
+    Tracks which stored PDFs are still in use and deletes the rest.
+
+    Objects are content-addressed, so every upload of an identical document
+    lands on the same key. Each (owner_id, resume_id) pair references the key
+    of its latest version; when a new version is published the old key loses
+    that reference. The sweeper deletes, in batches:
+
+    - superseded objects: once referenced, now unreferenced, and not served
+      for ``superseded_grace`` seconds
+    - unowned objects: never referenced and not served for ``ttl`` seconds,
+      only if a ``ttl`` is set, since the service cannot tell whether a
+      caller that sent no references kept the URL
+
+    Objects uploaded before tracking started are not in the table and are
+    never touched.
+    """
+
+    def __init__(self, path: str = PDF_LIFECYCLE_DB_PATH,
+                 ttl: float = PDF_OBJECT_TTL,
+                 superseded_grace: float = PDF_SUPERSEDED_GRACE,
+                 interval: float = PDF_SWEEP_INTERVAL,
+                 batch_size: int = PDF_SWEEP_BATCH_SIZE,
+                 enabled: bool = PDF_LIFECYCLE_ENABLED):
+        self.path = path
+        self.ttl = ttl
+        self.superseded_grace = superseded_grace
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sweep_lock = asyncio.Lock()
+        self.sweeps = 0
+        self.deleted = 0
+        self.reclaimed_bytes = 0
+        self.last_sweep: Optional[Dict[str, Any]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    """CREATE TABLE IF NOT EXISTS pdf_objects (
+                        key TEXT PRIMARY KEY,
+                        size INTEGER,
+                        owned INTEGER NOT NULL DEFAULT 0,
+                        created_at REAL NOT NULL,
+                        last_used_at REAL NOT NULL,
+                        delete_failed_at REAL
+                    )"""
+                )
+                columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pdf_objects)")}
+                if "delete_failed_at" not in columns:
+                    # Databases created before failed deletes were recorded
+                    self._conn.execute("ALTER TABLE pdf_objects ADD COLUMN delete_failed_at REAL")
+                self._conn.execute(
+                    """CREATE TABLE IF NOT EXISTS pdf_refs (
+                        owner_id TEXT NOT NULL,
+                        resume_id TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        updated_at REAL NOT NULL,
+                        PRIMARY KEY (owner_id, resume_id)
+                    )"""
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS pdf_refs_key ON pdf_refs (key)")
+                self._conn.execute("CREATE INDEX IF NOT EXISTS pdf_objects_used ON pdf_objects (owned, last_used_at)")
+        return self._conn
+
+    async def record(self, key: str, size: Optional[int] = None, references: Iterable[Reference] = ()) -> None:
+        """
+        Note that a stored object was just served, and which resumes now point at it
+
+        Parameters:
+        -----------
+        key : str
+            Storage object key
+        size : int, optional
+            Object size in bytes, when it was just uploaded
+        references : Iterable[Tuple[str, str]], optional
+            (owner_id, resume_id) pairs whose current version is this object
+        """
+        if not self.enabled:
+            return
+        await asyncio.to_thread(self._record, key, size, list(references))
+
+    def _record(self, key: str, size: Optional[int], references: List[Reference]) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    """INSERT INTO pdf_objects (key, size, owned, created_at, last_used_at)
+                       VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT (key) DO UPDATE SET
+                           size = COALESCE(excluded.size, pdf_objects.size),
+                           owned = MAX(pdf_objects.owned, excluded.owned),
+                           last_used_at = excluded.last_used_at""",
+                    (key, size, 1 if references else 0, now, now)
+                )
+                conn.executemany(
+                    """INSERT INTO pdf_refs (owner_id, resume_id, key, updated_at) VALUES (?, ?, ?, ?)
+                       ON CONFLICT (owner_id, resume_id) DO UPDATE SET
+                           key = excluded.key, updated_at = excluded.updated_at""",
+                    [(owner_id, resume_id, key, now) for owner_id, resume_id in references]
+                )
+
+    def _expired(self, limit: int, sweep_started_at: float) -> List[Tuple[str, int]]:
+        """Objects due for deletion, except those that already failed to delete in this sweep"""
+        now = time.time()
+        conditions = ["(o.owned = 1 AND o.last_used_at < ?)"]
+        params: List[Any] = [now - self.superseded_grace]
+        if self.ttl > 0:
+            conditions.append("(o.owned = 0 AND o.last_used_at < ?)")
+            params.append(now - self.ttl)
+        with self._lock:
+            rows = self._connect().execute(
+                f"""SELECT o.key, COALESCE(o.size, 0) FROM pdf_objects o
+                    WHERE ({' OR '.join(conditions)})
+                      AND NOT EXISTS (SELECT 1 FROM pdf_refs r WHERE r.key = o.key)
+                      AND (o.delete_failed_at IS NULL OR o.delete_failed_at < ?)
+                    ORDER BY o.last_used_at LIMIT ?""",
+                params + [sweep_started_at, limit]
+            ).fetchall()
+        return rows
+
+    def _mark_failed(self, keys: List[str], now: float) -> None:
+        """Skip objects storage refused to delete for the rest of the sweep; the next one retries them"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany("UPDATE pdf_objects SET delete_failed_at = ? WHERE key = ?",
+                                 [(now, key) for key in keys])
+
+    def _forget(self, keys: List[str], cutoff: float) -> List[str]:
+        """Drop rows for deleted objects that were not served again during the sweep"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                revived = [row[0] for row in conn.execute(
+                    f"SELECT key FROM pdf_objects WHERE key IN ({', '.join('?' * len(keys))}) AND last_used_at >= ?",
+                    keys + [cutoff]
+                )]
+                conn.executemany(
+                    "DELETE FROM pdf_objects WHERE key = ? AND last_used_at < ?",
+                    [(key, cutoff) for key in keys]
+                )
+        return revived
+
+    async def sweep(self) -> Dict[str, Any]:
+        """
+        Delete superseded and expired objects from storage in batches
+
+        Returns:
+        --------
+        Dict[str, Any]
+            Number of objects deleted and failed, bytes reclaimed and duration
+        """
+        async with self._sweep_lock:
+            # Workers of a multi-process deployment share the database; one sweep at a time is enough
+            lock = lock_file(f"{self.path}.sweep.lock", blocking=False)
+            if lock is None:
+                logger.info("PDF sweep skipped, another worker is sweeping")
+                return {"deleted": 0, "failed": 0, "reclaimed_bytes": 0, "seconds": 0.0,
+                        "finished_at": time.time(), "skipped": True}
+            try:
+                return await self._sweep()
+            finally:
+                unlock_file(lock)
+
+    async def _sweep(self) -> Dict[str, Any]:
+        started_at = time.time()
+        storage = get_storage()
+        deleted = failed = reclaimed = 0
+        while True:
+            batch = await asyncio.to_thread(self._expired, self.batch_size, started_at)
+            if not batch:
+                break
+            sizes = dict(batch)
+            keys = list(sizes)
+            # Stop handing out URLs for these before they disappear
+            for key in keys:
+                pdf_cache.forget(os.path.splitext(key)[0])
+            removed = await storage.delete_many(keys)
+            removed_set = set(removed)
+            revived = await asyncio.to_thread(self._forget, removed, started_at) if removed else []
+            if revived:
+                # Served again mid-sweep: the object is gone, so make the next request re-upload it
+                for key in revived:
+                    pdf_cache.forget(os.path.splitext(key)[0])
+                logger.warning(f"{len(revived)} objects were requested while being deleted")
+            failed_keys = [key for key in keys if key not in removed_set]
+            if failed_keys:
+                await asyncio.to_thread(self._mark_failed, failed_keys, time.time())
+            deleted += len(removed)
+            reclaimed += sum(sizes[key] for key in removed)
+            failed += len(failed_keys)
+            if not removed:
+                # Nothing in the batch could be deleted, e.g. storage is down: try again next sweep
+                logger.warning(f"PDF sweep stopped, none of {len(keys)} objects could be deleted")
+                break
+            if len(batch) < self.batch_size:
+                break
+
+        result = {
+            "deleted": deleted,
+            "failed": failed,
+            "reclaimed_bytes": reclaimed,
+            "seconds": round(time.time() - started_at, 3),
+            "finished_at": time.time(),
+        }
+        self.sweeps += 1
+        self.deleted += deleted
+        self.reclaimed_bytes += reclaimed
+        self.last_sweep = result
+        if deleted or failed:
+            logger.info(f"PDF sweep deleted {deleted} objects ({reclaimed} bytes), {failed} failed")
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Error sweeping stored PDFs: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the periodic sweeper"""
+        if self.enabled and self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop the sweeper"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def stats(self) -> Dict[str, Any]:
+        """Tracked objects and references, and what sweeps have reclaimed"""
+        tracked = {"objects": 0, "tracked_bytes": 0, "references": 0}
+        if self.enabled:
+            tracked = await asyncio.to_thread(self._tracked)
+        return {
+            "enabled": self.enabled,
+            **tracked,
+            "sweeps": self.sweeps,
+            "deleted": self.deleted,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "last_sweep": self.last_sweep,
+        }
+
+
+    def _tracked(self) -> Dict[str, int]:
+        with self._lock:
+            conn = self._connect()
+            objects, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pdf_objects").fetchone()
+            references = conn.execute("SELECT COUNT(*) FROM pdf_refs").fetchone()[0]
+        return {"objects": objects, "tracked_bytes": size, "references": references}
+
+
+# Shared lifecycle tracker used by the PDF routes
+pdf_lifecycle = PdfLifecycle()
@@ -0,0 +1,338 @@
+import os
+import asyncio
+import html
+import itertools
+import logging
+import shutil
+import tempfile
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from app.utils.compile_pool import compile_pool, COMPILE_TEMP_DIR
+from app.utils.template_engine import Layout
+from app.utils.resume_template import TEMPLATE_VERSION
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Preview configuration
+PDF_PREVIEW_DPI = settings.get_int("PDF_PREVIEW_DPI", 50)
+PDF_PREVIEW_MAX_DPI = settings.get_int("PDF_PREVIEW_MAX_DPI", 150)
+# How long a preview waits for a newer request from the same session before starting work
+PDF_PREVIEW_DEBOUNCE_MS = settings.get_float("PDF_PREVIEW_DEBOUNCE_MS", 30)
+PDF_PREVIEW_CACHE_ENTRIES = settings.get_int("PDF_PREVIEW_CACHE_ENTRIES", 256)
+PDF_PREVIEW_RASTERIZER = settings.get("PDF_PREVIEW_RASTERIZER", "pdftoppm")
+PDF_PREVIEW_TIMEOUT = settings.get_float("PDF_PREVIEW_TIMEOUT", 5)
+
+
+class PreviewSuperseded(Exception):
+    """Raised for a preview request replaced by a newer one from the same session"""
+
+
+class PreviewUnavailable(Exception):
+    """Raised when a preview format cannot be produced on this host"""
+
+
+def _escape_html(text: Optional[str]) -> str:
+    return html.escape(text) if text else ""
+
+
+class HtmlPreviewLayout(Layout):
+    """
+    HTML approximation of the Jake Gutierrez resume for live previews.
+
+    Mirrors the structure of the LaTeX layout closely enough to edit against;
+    the PDF remains the reference rendering.
+    """
+
+    name = "jake-gutierrez-html"
+    version = TEMPLATE_VERSION
+    prefix = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Resume preview</title><style>
+body{margin:0;background:#fff;color:#000;font:11pt/1.25 "Latin Modern Roman","Computer Modern Serif",Georgia,serif}
+.page{width:7.5in;margin:0 auto;padding:.5in}
+header{text-align:center;margin-bottom:6pt}
+header h1{font-size:24pt;font-variant:small-caps;font-weight:bold;margin:0 0 4pt}
+header a{color:inherit}
+h2{font-size:13pt;font-variant:small-caps;font-weight:normal;border-bottom:1px solid #000;margin:10pt 0 4pt}
+.row{display:flex;justify-content:space-between}
+.entry{margin:0 0 4pt .15in}
+.sub{font-style:italic;font-size:10pt}
+ul{margin:2pt 0 4pt .15in;padding-left:.2in;font-size:10pt}
+li{margin:0}
+.skills{margin-left:.15in;font-size:10pt}
+</style></head><body><div class="page">
+"""
+    suffix = "</div></body></html>\n"
+    SECTIONS = ("header", "education", "experience", "projects", "skills")
+    SECTION_FIELDS = {
+        "header": ("full_name", "email", "phone_number", "linkedin_url", "github_url", "website_url"),
+        "education": ("education_entries",),
+        "experience": ("experience_entries",),
+        "projects": ("project_entries",),
+        "skills": ("skill_categories",),
+    }
+    TEMPLATES = {
+        "header": '<header><h1><<full_name>></h1><div><<contacts>></div></header>\n',
+        "contact": '<a href="<<href>>"><<text>></a>',
+        "section_start": '<section><h2><<title>></h2>\n',
+        "section_end": '</section>\n',
+        "entry": '<div class="entry"><div class="row"><b><<left>></b><span><<right>></span></div>'
+                 '<div class="row sub"><span><<sub_left>></span><span><<sub_right>></span></div></div>\n',
+        "project_entry": '<div class="entry"><div class="row"><span><b><<name>></b> | <i><<technologies>></i></span>'
+                         '<span><<date_range>></span></div></div>\n',
+        "item": '<li><<text>></li>',
+        "skill_category": '<div class="skills"><b><<category_name>></b>: <<skills>></div>\n',
+    }
+
+    def render_header(self, data: Dict[str, Any]) -> str:
+        contact = self.templates["contact"].fill
+        contacts = []
+        if data.get('phone_number'):
+            contacts.append(_escape_html(data['phone_number']))
+        contacts.append(contact(_escape_html(f"mailto:{data['email']}"), _escape_html(data['email'])))
+        for field in ('linkedin_url', 'github_url', 'website_url'):
+            if data.get(field):
+                contacts.append(contact(_escape_html(f"https://{data[field]}"), _escape_html(data[field])))
+        return self.templates["header"].fill(_escape_html(data['full_name']), " | ".join(contacts))
+
+    def _items(self, texts) -> str:
+        if not texts:
+            return ""
+        return "<ul>" + self.templates["item"].render_each([_escape_html(text) for text in texts]) + "</ul>\n"
+
+    def render_education(self, data: Dict[str, Any]) -> str:
+        templates = self.templates
+        out = [templates["section_start"].fill("Education")]
+        for edu in data['education_entries']:
+            out.append(templates["entry"].fill(
+                _escape_html(edu['institution']), _escape_html(edu.get('location')),
+                _escape_html(edu['degree']), _escape_html(edu['date_range'])
+            ))
+        out.append(templates["section_end"].source)
+        return "".join(out)
+
+    def render_experience(self, data: Dict[str, Any]) -> str:
+        templates = self.templates
+        out = [templates["section_start"].fill("Experience")]
+        for exp in data['experience_entries']:
+            out.append(templates["entry"].fill(
+                _escape_html(exp['title']), _escape_html(exp['dates']),
+                _escape_html(exp['organization']), _escape_html(exp.get('location'))
+            ))
+            out.append(self._items(exp['responsibilities']))
+        out.append(templates["section_end"].source)
+        return "".join(out)
+
+    def render_projects(self, data: Dict[str, Any]) -> str:
+        templates = self.templates
+        out = [templates["section_start"].fill("Projects")]
+        for proj in data['project_entries']:
+            out.append(templates["project_entry"].fill(
+                _escape_html(proj['name']), _escape_html(proj['technologies']),
+                _escape_html(proj.get('date_range'))
+            ))
+            out.append(self._items(proj['details']))
+        out.append(templates["section_end"].source)
+        return "".join(out)
+
+    def render_skills(self, data: Dict[str, Any]) -> str:
+        if not data.get('skill_categories'):
+            return ""
+        templates = self.templates
+        out = [templates["section_start"].fill("Technical Skills")]
+        for skill_category in data['skill_categories']:
+            if skill_category['skills']:
+                out.append(templates["skill_category"].fill(
+                    _escape_html(skill_category['category_name']),
+                    ", ".join(_escape_html(skill) for skill in skill_category['skills'])
+                ))
+        out.append(templates["section_end"].source)
+        return "".join(out)
+
+
+html_preview_layout = HtmlPreviewLayout()
+
+
+def preview_dpi(dpi: Optional[int]) -> int:
+    """Requested resolution clamped to what previews allow"""
+    return max(10, min(dpi or PDF_PREVIEW_DPI, PDF_PREVIEW_MAX_DPI))
+
+
+class PageRasterizer:
+    """
+    Renders the first page of a PDF to PNG with poppler's ``pdftoppm``.
+
+    Results are kept in a small LRU by document key and resolution, since a
+    session typically flips back and forth between a few versions.
+    """
+
+    def __init__(self, command: str = PDF_PREVIEW_RASTERIZER,
+                 cache_entries: int = PDF_PREVIEW_CACHE_ENTRIES,
+                 timeout: float = PDF_PREVIEW_TIMEOUT):
+        self.command = command
+        self.cache_entries = cache_entries
+        self.timeout = timeout
+        self._images: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+
+    def available(self) -> bool:
+        return shutil.which(self.command) is not None
+
+    def cached(self, key: str, dpi: int) -> Optional[bytes]:
+        """PNG of a document already rendered at this resolution, or None"""
+        image = self._images.get((key, dpi))
+        if image is not None:
+            self._images.move_to_end((key, dpi))
+        return image
+
+    async def rasterize(self, key: str, pdf_bytes: bytes, dpi: int) -> bytes:
+        """
+        Render page 1 of a PDF to PNG
+
+        Parameters:
+        -----------
+        key : str
+            Cache key of the document
+        pdf_bytes : bytes
+            The compiled PDF
+        dpi : int
+            Output resolution
+
+        Returns:
+        --------
+        bytes
+            PNG image of the first page
+        """
+        if not self.available():
+            raise PreviewUnavailable(f"{self.command} is not installed, PNG previews are unavailable")
+        temp_dir = tempfile.mkdtemp(dir=COMPILE_TEMP_DIR)
+        try:
+            pdf_path = os.path.join(temp_dir, "preview.pdf")
+            with open(pdf_path, "wb") as pdf_file:
+                pdf_file.write(pdf_bytes)
+            returncode, _, stderr = await compile_pool.run(
+                [self.command, "-png", "-r", str(dpi), "-f", "1", "-l", "1", "-singlefile",
+                 pdf_path, os.path.join(temp_dir, "page")],
+                cwd=temp_dir,
+                timeout=self.timeout
+            )
+            if returncode != 0:
+                raise RuntimeError(f"Rasterizing preview failed: {stderr.decode('utf-8', errors='replace')}")
+            with open(os.path.join(temp_dir, "page.png"), "rb") as image_file:
+                image = image_file.read()
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        self._images[(key, dpi)] = image
+        while len(self._images) > self.cache_entries:
+            self._images.popitem(last=False)
+        return image
+
+
+class PreviewSessions:
+    """
+    Coalesces rapid preview requests per session.
+
+    A new request from a session supersedes the previous one: a request still
+    in its debounce window never starts, and one already compiling is
+    cancelled, which kills its TeX process. Superseded callers get
+    PreviewSuperseded. Requests without a session id run independently.
+    """
+
+    def __init__(self, debounce_ms: float = PDF_PREVIEW_DEBOUNCE_MS):
+        self.debounce = max(0.0, debounce_ms) / 1000
+        self._generations = itertools.count(1)
+        self._latest: Dict[str, int] = {}
+        self._tasks: Dict[str, "asyncio.Task"] = {}
+        self._superseded: Set["asyncio.Task"] = set()
+        self.requests = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self._durations: Dict[str, deque] = {}
+
+    async def run(self, session_id: Optional[str], kind: str,
+                  make: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``make()`` as the session's current preview
+
+        Parameters:
+        -----------
+        session_id : str, optional
+            Session the request belongs to
+        kind : str
+            Preview format, for latency stats
+        make : Callable[[], Awaitable[Any]]
+            Produces the preview
+
+        Returns:
+        --------
+        Any
+            Result of ``make()``
+        """
+        self.requests += 1
+        started_at = time.monotonic()
+        if not session_id:
+            result = await make()
+            self._record(kind, started_at)
+            return result
+
+        generation = next(self._generations)
+        self._latest[session_id] = generation
+        previous = self._tasks.get(session_id)
+        if previous is not None and not previous.done():
+            self._superseded.add(previous)
+            previous.cancel()
+            self.cancelled += 1
+
+        try:
+            if self.debounce:
+                await asyncio.sleep(self.debounce)
+            if self._latest.get(session_id) != generation:
+                self.coalesced += 1
+                raise PreviewSuperseded()
+
+            task = asyncio.ensure_future(make())
+            self._tasks[session_id] = task
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                if task in self._superseded:
+                    raise PreviewSuperseded()
+                # The caller itself went away
+                task.cancel()
+                raise
+            finally:
+                self._superseded.discard(task)
+                if self._tasks.get(session_id) is task:
+                    del self._tasks[session_id]
+        finally:
+            if self._latest.get(session_id) == generation and session_id not in self._tasks:
+                del self._latest[session_id]
+
+        self._record(kind, started_at)
+        return result
+
+    def _record(self, kind: str, started_at: float) -> None:
+        self._durations.setdefault(kind, deque(maxlen=200)).append((time.monotonic() - started_at) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counters and recent latency per format"""
+        latency = {}
+        for kind, durations in self._durations.items():
+            ordered = sorted(durations)
+            latency[kind] = {
+                "samples": len(ordered),
+                "p50_ms": round(ordered[int(0.5 * (len(ordered) - 1))], 2),
+                "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 2),
+            }
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "cancelled_in_flight": self.cancelled,
+            "active_sessions": len(self._tasks),
+            "latency": latency,
+        }
+
+
+# Shared preview state used by the PDF routes
+page_rasterizer = PageRasterizer()
+preview_sessions = PreviewSessions()
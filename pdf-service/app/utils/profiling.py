@@ -0,0 +1,316 @@
+import os
+import re
+import sys
+import time
+import uuid
+import logging
+import secrets
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from app.utils.metrics import current_timings
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Requests slower than this are profiled and kept; 0 profiles only requests that ask for it
+PDF_PROFILE_SLOW_MS = settings.get_float("PDF_PROFILE_SLOW_MS", 0)
+# How often the sampler takes a stack sample of a profiled request
+PDF_PROFILE_INTERVAL_MS = settings.get_float("PDF_PROFILE_INTERVAL_MS", 5)
+# Number of recent profiles kept for the admin endpoint
+PDF_PROFILE_BUFFER = settings.get_int("PDF_PROFILE_BUFFER", 50)
+# Guards the admin endpoints and the X-Profile header; both are disabled when unset
+PDF_ADMIN_TOKEN = settings.get("PDF_ADMIN_TOKEN", "")
+
+# Deepest stack kept per sample, counted from the innermost frame
+MAX_STACK_DEPTH = 64
+# Frames and stacks listed in a profile
+TOP_FRAMES = 25
+TOP_STACKS = 50
+# TeX log lines kept in a profile
+TEX_LOG_LINES = 40
+
+# Innermost (function, file) of a thread that is waiting rather than working: the
+# event loop polling (uvloop polls in C, under asyncio.run), or an idle executor thread
+_IDLE_FRAMES = {("select", "selectors.py"), ("run", "runners.py"), ("wait", "threading.py"),
+                ("_wait_for_tstate_lock", "threading.py"), ("_worker", "thread.py")}
+
+_log_warning = re.compile(r"^(?:LaTeX|Package|Class) .*Warning")
+_log_overfull = re.compile(r"^(?:Overfull|Underfull) \\[hv]box")
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    for prefix in sorted((p for p in sys.path if p), key=len, reverse=True):
+        if path.startswith(prefix + os.sep):
+            path = path[len(prefix) + 1:]
+            break
+    return f"{code.co_name} ({path}:{code.co_firstlineno})"
+
+
+def _stack(frame) -> List[str]:
+    """Labels of a thread's frames, outermost first"""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class RequestProfile:
+    """Stack samples, stage timings and TeX runs collected while handling one request"""
+
+    def __init__(self, method: str, path: str, trigger: str, loop_thread: int):
+        self.id: Optional[str] = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.loop_thread = loop_thread
+        self.started_at = datetime.now(timezone.utc)
+        self.status: Optional[int] = None
+        self.duration = 0.0
+        # Shared with the Server-Timing collection of the request, when there is one
+        timings = current_timings()
+        self.stages: List[Tuple[str, float]] = timings if timings is not None else []
+        self.tex: List[Dict[str, Any]] = []
+        # Folded stack ("outer;inner") -> number of samples
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self.idle_samples = 0
+        self.concurrent = 1
+
+    def add_sample(self, stacks: List[List[str]], idle: bool) -> None:
+        self.samples += 1
+        if idle:
+            self.idle_samples += 1
+        for stack in stacks:
+            folded = ";".join(stack)
+            self.stacks[folded] = self.stacks.get(folded, 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 2),
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """The full profile, with self and total samples per frame"""
+        self_samples: Dict[str, int] = {}
+        total_samples: Dict[str, int] = {}
+        for folded, count in self.stacks.items():
+            frames = folded.split(";")
+            self_samples[frames[-1]] = self_samples.get(frames[-1], 0) + count
+            for label in set(frames):
+                total_samples[label] = total_samples.get(label, 0) + count
+        top = sorted(total_samples, key=lambda label: (-self_samples.get(label, 0), -total_samples[label]))
+        stages: Dict[str, float] = {}
+        for name, seconds in self.stages:
+            stages[name] = stages.get(name, 0.0) + seconds
+        return {
+            **self.summary(),
+            "stages_ms": {name: round(seconds * 1000, 2) for name, seconds in stages.items()},
+            "python": {
+                "interval_ms": PDF_PROFILE_INTERVAL_MS,
+                "samples": self.samples,
+                # Samples where the event loop had nothing to run: awaiting TeX, storage or a slot
+                "idle_samples": self.idle_samples,
+                "concurrent_requests": self.concurrent,
+                "top_frames": [{"frame": label, "self": self_samples.get(label, 0), "total": total_samples[label]}
+                               for label in top[:TOP_FRAMES]],
+                "stacks": dict(sorted(self.stacks.items(), key=lambda item: -item[1])[:TOP_STACKS]),
+            },
+            "tex": self.tex,
+        }
+
+
+class Profiler:
+    """
+    Opt-in sampling profiler for requests, with a ring buffer of recent profiles.
+
+    A request is profiled when it sends ``X-Profile`` with the admin token, or
+    for every request when ``PDF_PROFILE_SLOW_MS`` is set, in which case only
+    the profiles of requests slower than the threshold are kept. A sampler
+    thread walks the stacks of the event loop and the thread pool every
+    ``PDF_PROFILE_INTERVAL_MS`` while a profiled request is in flight, so its
+    cost is paid only then. Requests share the event loop, so samples taken
+    while several profiled requests overlap are attributed to each of them;
+    ``concurrent_requests`` in the profile tells when that happened.
+    """
+
+    def __init__(self, slow_ms: float = PDF_PROFILE_SLOW_MS, interval_ms: float = PDF_PROFILE_INTERVAL_MS,
+                 buffer_size: int = PDF_PROFILE_BUFFER):
+        self.slow = slow_ms / 1000
+        self.interval = interval_ms / 1000
+        self.profiles: Deque[RequestProfile] = deque(maxlen=buffer_size)
+        self._active: List[RequestProfile] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def wants(self, header: Optional[str]) -> Optional[str]:
+        """Why a request should be profiled ("header" or "slow"), or None"""
+        if header and check_admin_token(header):
+            return "header"
+        if self.slow > 0:
+            return "slow"
+        return None
+
+    @contextmanager
+    def profile(self, method: str, path: str, trigger: str) -> Iterator[RequestProfile]:
+        """Sample the stacks while the block runs and keep the profile if it was asked for or slow"""
+        profile = RequestProfile(method, path, trigger, threading.get_ident())
+        token = _current_profile.set(profile)
+        with self._lock:
+            self._active.append(profile)
+            for other in self._active:
+                other.concurrent = max(other.concurrent, len(self._active))
+            self._ensure_sampler()
+        self._wake.set()
+        started_at = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            profile.duration = time.perf_counter() - started_at
+            _current_profile.reset(token)
+            with self._lock:
+                self._active.remove(profile)
+            if trigger == "header" or profile.duration >= self.slow:
+                self.profiles.append(profile)
+                logger.info(f"Kept profile {profile.id} of {method} {path} ({profile.duration * 1000:.0f} ms)")
+            else:
+                # Not kept, so the id is not handed out
+                profile.id = None
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        for profile in self.profiles:
+            if profile.id == profile_id:
+                return profile
+        return None
+
+    def _ensure_sampler(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self) -> None:
+        while True:
+            # Cleared before looking, so a profile started meanwhile still wakes the loop
+            self._wake.clear()
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                self._wake.wait()
+                continue
+            frames = sys._current_frames()
+            for loop_thread in {profile.loop_thread for profile in active}:
+                stacks, idle = self._sample(frames, loop_thread)
+                for profile in active:
+                    if profile.loop_thread == loop_thread:
+                        profile.add_sample(stacks, idle)
+            del frames
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _sample(frames: Dict[int, Any], loop_thread: int):
+        """Working stacks of the event loop thread and the executor threads, and whether the loop is idle"""
+        stacks = []
+        idle = True
+        for thread in threading.enumerate():
+            frame = frames.get(thread.ident)
+            if frame is None or (thread.ident != loop_thread and not thread.name.startswith("asyncio_")):
+                continue
+            if (frame.f_code.co_name, os.path.basename(frame.f_code.co_filename)) in _IDLE_FRAMES:
+                continue
+            stacks.append(_stack(frame))
+            if thread.ident == loop_thread:
+                idle = False
+        return stacks, idle
+
+
+# Profile of the request being handled, for the TeX runs it makes
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("pdf_request_profile", default=None)
+
+
+def check_admin_token(token: Optional[str]) -> bool:
+    """True if ``token`` is the configured admin token"""
+    return bool(PDF_ADMIN_TOKEN) and token is not None and secrets.compare_digest(token, PDF_ADMIN_TOKEN)
+
+
+def profiling_active() -> bool:
+    """True while handling a profiled request; compiles then run pdflatex with -recorder"""
+    return _current_profile.get() is not None
+
+
+def tex_summary(kind: str, seconds: float, returncode: int, stdout: bytes,
+                work_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Summarize a pdflatex run from its terminal output, log and -recorder file
+
+    Parameters:
+    -----------
+    kind : str
+        How the document was compiled: "warm", "format" or "plain"
+    seconds : float
+        Wall time of the run, including the wait for a compile slot
+    returncode : int
+        Exit status of pdflatex
+    stdout : bytes
+        Terminal output of pdflatex
+    work_dir : str, optional
+        Directory holding resume.log and resume.fls; warm workers compile
+        elsewhere and only report their terminal output
+
+    Returns:
+    --------
+    Dict[str, Any]
+        Files read by type, log warnings and the tail of the log
+    """
+    summary: Dict[str, Any] = {"kind": kind, "ms": round(seconds * 1000, 2), "returncode": returncode}
+    log = stdout.decode("utf-8", errors="replace")
+    if work_dir is not None:
+        try:
+            with open(os.path.join(work_dir, "resume.log"), encoding="utf-8", errors="replace") as log_file:
+                log = log_file.read()
+        except OSError:
+            pass
+        inputs: List[str] = []
+        try:
+            with open(os.path.join(work_dir, "resume.fls"), encoding="utf-8", errors="replace") as fls_file:
+                for line in fls_file:
+                    if line.startswith("INPUT ") and line[6:].strip() not in inputs:
+                        inputs.append(line[6:].strip())
+        except OSError:
+            pass
+        by_type: Dict[str, int] = {}
+        for path in inputs:
+            extension = os.path.splitext(path)[1] or "(none)"
+            by_type[extension] = by_type.get(extension, 0) + 1
+        summary["inputs"] = {"files": len(inputs), "by_type": by_type}
+    lines = log.splitlines()
+    summary["log"] = {
+        "bytes": len(log),
+        "warnings": sum(1 for line in lines if _log_warning.match(line)),
+        "bad_boxes": sum(1 for line in lines if _log_overfull.match(line)),
+        "tail": lines[-TEX_LOG_LINES:],
+    }
+    return summary
+
+
+def record_tex(kind: str, seconds: float, returncode: int, stdout: bytes, work_dir: Optional[str] = None) -> None:
+    """Add a pdflatex run to the profile of the current request, if it is profiled"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.tex.append(tex_summary(kind, seconds, returncode, stdout, work_dir))
+
+
+profiler = Profiler()
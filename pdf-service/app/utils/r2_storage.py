@@ -1,48 +1,119 @@
 import os
+import io
+import asyncio
+import functools
+import threading
 import boto3
 from botocore.config import Config
+from botocore.exceptions import ClientError
+from boto3.s3.transfer import TransferConfig
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException, status, UploadFile
-from typing import Union
+from typing import Union, Optional, Dict, Any, Callable, List
 import logging
-from dotenv import load_dotenv
 import uuid
+from app.config import settings
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-load_dotenv()
 
 # R2 configuration
-R2_ACCOUNT_ID = os.getenv("R2_ACCOUNT_ID")
-R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
-R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
-R2_BUCKET_NAME = os.getenv("R2_BUCKET_NAME")
-R2_PUBLIC_URL = os.getenv("R2_PUBLIC_URL")  # Your R2 public URL (e.g., https://pub-xxxxx.r2.dev)
-
-# Configure S3 client for R2
-s3_client = boto3.client(
-    's3',
-    endpoint_url=f'https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com',
-    aws_access_key_id=R2_ACCESS_KEY_ID,
-    aws_secret_access_key=R2_SECRET_ACCESS_KEY,
-    config=Config(signature_version='s3v4'),
-    region_name='auto'
-)
+R2_ACCOUNT_ID = settings.get("R2_ACCOUNT_ID")
+R2_ACCESS_KEY_ID = settings.get("R2_ACCESS_KEY_ID")
+R2_SECRET_ACCESS_KEY = settings.get("R2_SECRET_ACCESS_KEY")
+R2_BUCKET_NAME = settings.get("R2_BUCKET_NAME")
+R2_PUBLIC_URL = settings.get("R2_PUBLIC_URL")  # Your R2 public URL (e.g., https://pub-xxxxx.r2.dev)
+# Override to point at an S3-compatible stand-in such as MinIO or moto_server
+R2_ENDPOINT_URL = settings.get("R2_ENDPOINT_URL") or f'https://{R2_ACCOUNT_ID}.r2.cloudflarestorage.com'
+
+# Client tuning
+R2_MAX_CONNECTIONS = settings.get_int("R2_MAX_CONNECTIONS", 32)
+R2_MAX_ATTEMPTS = settings.get_int("R2_MAX_ATTEMPTS", 4)
+R2_CONNECT_TIMEOUT = settings.get_float("R2_CONNECT_TIMEOUT", 5)
+R2_READ_TIMEOUT = settings.get_float("R2_READ_TIMEOUT", 30)
+# Objects below this size are sent with a single PUT
+R2_MULTIPART_THRESHOLD = settings.get_int("R2_MULTIPART_THRESHOLD", 8 * 1024 * 1024)
+
+_s3_client = None
+_client_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+def get_s3_client():
+    """
+    S3 client for R2, created on first use
+
+    The client keeps a pool of R2_MAX_CONNECTIONS connections and retries
+    throttling and transient errors up to R2_MAX_ATTEMPTS times with
+    exponential backoff and jitter (botocore "standard" retry mode).
+    """
+    global _s3_client
+    with _client_lock:
+        if _s3_client is None:
+            _s3_client = boto3.client(
+                's3',
+                endpoint_url=R2_ENDPOINT_URL,
+                aws_access_key_id=R2_ACCESS_KEY_ID,
+                aws_secret_access_key=R2_SECRET_ACCESS_KEY,
+                config=Config(
+                    signature_version='s3v4',
+                    max_pool_connections=R2_MAX_CONNECTIONS,
+                    connect_timeout=R2_CONNECT_TIMEOUT,
+                    read_timeout=R2_READ_TIMEOUT,
+                    retries={'max_attempts': R2_MAX_ATTEMPTS, 'mode': 'standard'}
+                ),
+                region_name='auto'
+            )
+    return _s3_client
+
+def _client_call(method: str, **kwargs) -> Any:
+    return getattr(get_s3_client(), method)(**kwargs)
+
+async def _call(fn: Callable, *args, **kwargs) -> Any:
+    """Run a blocking boto3 call on the storage executor so the event loop stays free"""
+    global _executor
+    if _executor is None:
+        # One thread per pooled connection; more would only wait on the pool
+        _executor = ThreadPoolExecutor(max_workers=R2_MAX_CONNECTIONS, thread_name_prefix="r2")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
 
 def generate_unique_filename(original_filename: str) -> str:
     """Generate a unique filename to prevent collisions"""
     ext = os.path.splitext(original_filename)[1]
     return f"{uuid.uuid4()}{ext}"
 
-async def upload_pdf(pdf: Union[str, UploadFile]) -> str:
+def get_public_url(object_key: str) -> str:
+    """Public URL of an object in the R2 bucket"""
+    return f"{R2_PUBLIC_URL}/{object_key}"
+
+def _put_bytes(content: bytes, key: str, extra_args: Dict[str, Any]) -> None:
+    client = get_s3_client()
+    if len(content) < R2_MULTIPART_THRESHOLD:
+        # Resumes are tiny: one PUT instead of the transfer manager's machinery
+        client.put_object(Bucket=R2_BUCKET_NAME, Key=key, Body=content, **extra_args)
+    else:
+        client.upload_fileobj(
+            io.BytesIO(content), R2_BUCKET_NAME, key, ExtraArgs=extra_args,
+            Config=TransferConfig(multipart_threshold=R2_MULTIPART_THRESHOLD)
+        )
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as file:
+        return file.read()
+
+async def upload_pdf(pdf: Union[str, bytes, UploadFile], object_key: Optional[str] = None,
+                     original_filename: Optional[str] = None) -> str:
     """
     Upload a PDF file to Cloudflare R2 and return a URL that can be used to view the PDF
     
     Parameters:
     -----------
-    pdf : Union[str, UploadFile]
-        Either a file path (str) or an UploadFile object
+    pdf : Union[str, bytes, UploadFile]
+        A file path (str), the PDF contents (bytes) or an UploadFile object
+    object_key : str, optional
+        Key to store the object under. Defaults to a unique random filename.
+    original_filename : str, optional
+        Filename recorded in the object metadata. Defaults to the file's own name.
         
     Returns:
     --------
@@ -52,48 +123,39 @@ async def upload_pdf(pdf: Union[str, UploadFile]) -> str:
     try:
         # Generate a unique filename
         if isinstance(pdf, str):
-            original_filename = os.path.basename(pdf)
+            original_filename = original_filename or os.path.basename(pdf)
+        elif isinstance(pdf, bytes):
+            original_filename = original_filename or "resume.pdf"
         else:
-            original_filename = pdf.filename
-        unique_filename = generate_unique_filename(original_filename)
+            original_filename = original_filename or pdf.filename
+        unique_filename = object_key or generate_unique_filename(original_filename)
+
+        extra_args = {
+            'ContentType': 'application/pdf',
+            'ACL': 'public-read',
+            'CacheControl': 'max-age=31536000',
+            'Metadata': {
+                'original-filename': original_filename
+            }
+        }
 
         if isinstance(pdf, str):
             # If pdf is a file path
             logger.info(f"Uploading PDF from path: {pdf}")
-            with open(pdf, 'rb') as file:
-                s3_client.upload_fileobj(
-                    file,
-                    R2_BUCKET_NAME,
-                    unique_filename,
-                    ExtraArgs={
-                        'ContentType': 'application/pdf',
-                        'ACL': 'public-read',
-                        'CacheControl': 'max-age=31536000',
-                        'Metadata': {
-                            'original-filename': original_filename
-                        }
-                    }
-                )
+            content = await _call(_read_file, pdf)
+        elif isinstance(pdf, bytes):
+            # If pdf is already in memory
+            logger.info(f"Uploading PDF from memory ({len(pdf)} bytes)")
+            content = pdf
         else:
             # If pdf is an UploadFile object
             logger.info(f"Uploading PDF from UploadFile: {pdf.filename}")
             content = await pdf.read()
-            s3_client.upload_fileobj(
-                content,
-                R2_BUCKET_NAME,
-                unique_filename,
-                ExtraArgs={
-                    'ContentType': 'application/pdf',
-                    'ACL': 'public-read',
-                    'CacheControl': 'max-age=31536000',
-                    'Metadata': {
-                        'original-filename': original_filename
-                    }
-                }
-            )
+
+        await _call(_put_bytes, content, unique_filename, extra_args)
 
         # Generate the public URL
-        file_url = f"{R2_PUBLIC_URL}/{unique_filename}"
+        file_url = get_public_url(unique_filename)
         
         logger.info(f"PDF uploaded successfully to R2. URL: {file_url}")
         return file_url
@@ -105,6 +167,48 @@ async def upload_pdf(pdf: Union[str, UploadFile]) -> str:
             detail=f"Error uploading PDF to R2: {str(e)}"
         )
 
+async def pdf_exists(object_key: str) -> bool:
+    """
+    Check whether an object already exists in Cloudflare R2
+    
+    Parameters:
+    -----------
+    object_key : str
+        The key of the object to look up
+        
+    Returns:
+    --------
+    bool
+        True if the object exists, False if it is missing or the lookup failed
+    """
+    try:
+        await _call(_client_call, 'head_object', Bucket=R2_BUCKET_NAME, Key=object_key)
+        return True
+    except ClientError as e:
+        missing = e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+        if not missing:
+            logger.warning(f"Error checking PDF in R2: {str(e)}")
+        return False
+    except Exception as e:
+        logger.warning(f"Error checking PDF in R2: {str(e)}")
+        return False
+
+async def bucket_reachable() -> bool:
+    """
+    Check that the R2 bucket can be reached with the configured credentials
+
+    Returns:
+    --------
+    bool
+        True if a HeadBucket request succeeded
+    """
+    try:
+        await _call(_client_call, 'head_bucket', Bucket=R2_BUCKET_NAME)
+        return True
+    except Exception as e:
+        logger.warning(f"R2 bucket is not reachable: {str(e)}")
+        return False
+
 async def delete_pdf(file_name: str) -> bool:
     """
     Delete a PDF file from Cloudflare R2
@@ -120,12 +224,37 @@ async def delete_pdf(file_name: str) -> bool:
         True if deletion was successful, False otherwise
     """
     try:
-        s3_client.delete_object(
-            Bucket=R2_BUCKET_NAME,
-            Key=file_name
-        )
+        await _call(_client_call, 'delete_object', Bucket=R2_BUCKET_NAME, Key=file_name)
         logger.info(f"PDF deleted successfully from R2: {file_name}")
         return True
     except Exception as e:
         logger.error(f"Error deleting PDF from R2: {str(e)}")
-        return False 
\ No newline at end of file
+        return False
+
+async def delete_pdfs(file_names: List[str]) -> List[str]:
+    """
+    Delete up to 1000 PDF files from Cloudflare R2 with a single DeleteObjects request
+    
+    Parameters:
+    -----------
+    file_names : List[str]
+        The names of the files to delete
+        
+    Returns:
+    --------
+    List[str]
+        The names that were deleted; failures are logged and left out
+    """
+    try:
+        response = await _call(
+            _client_call, 'delete_objects', Bucket=R2_BUCKET_NAME,
+            Delete={'Objects': [{'Key': name} for name in file_names], 'Quiet': False}
+        )
+    except Exception as e:
+        logger.error(f"Error deleting PDFs from R2: {str(e)}")
+        return []
+    for error in response.get('Errors', []):
+        logger.error(f"Error deleting PDF from R2: {error.get('Key')}: {error.get('Message')}")
+    deleted = [item['Key'] for item in response.get('Deleted', [])]
+    logger.info(f"Deleted {len(deleted)} PDFs from R2")
+    return deleted
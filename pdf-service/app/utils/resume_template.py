@@ -0,0 +1,327 @@
+from typing import Any, Dict
+from app.utils.template_engine import Layout
+from app.utils.latex_escape import escape_latex, escape_many
+
+# Bump whenever the LaTeX template changes so cached PDFs are not reused
+TEMPLATE_VERSION = "jake-gutierrez-2"
+
+# Static part of the template preamble. Everything up to the endofdump marker is
+# identical for every resume, so it can be precompiled into a LaTeX format file.
+LATEX_PREAMBLE = r"""%-------------------------
+% Resume in Latex
+% Author : Jake Gutierrez
+% Based off of: https://github.com/sb2nov/resume
+% License : MIT
+%------------------------
+
+\documentclass[letterpaper,11pt]{article}
+
+\usepackage{latexsym}
+\usepackage[empty]{fullpage}
+\usepackage{titlesec}
+\usepackage{marvosym}
+\usepackage[usenames,dvipsnames]{color}
+\usepackage{verbatim}
+\usepackage{enumitem}
+\usepackage[hidelinks]{hyperref}
+\usepackage{fancyhdr}
+\usepackage[english]{babel}
+\usepackage{tabularx}
+\usepackage{graphicx}
+\usepackage{float}
+\usepackage{geometry}
+\usepackage{xparse}
+
+% Adjust margins to use more space
+\geometry{
+    top=0.5in,
+    bottom=0.5in,
+    left=0.5in,
+    right=0.5in,
+    includehead,
+    includefoot
+}
+
+%----------FONT OPTIONS----------
+% sans-serif
+% \usepackage[sfdefault]{FiraSans}
+% \usepackage[sfdefault]{roboto}
+% \usepackage[sfdefault]{noto-sans}
+% \usepackage[default]{sourcesanspro}
+
+% serif
+% \usepackage{CormorantGaramond}
+% \usepackage{charter}
+
+\pagestyle{fancy}
+\fancyhf{} % clear all header and footer fields
+\fancyfoot{}
+\renewcommand{\headrulewidth}{0pt}
+\renewcommand{\footrulewidth}{0pt}
+
+\urlstyle{same}
+
+\raggedbottom
+\raggedright
+\setlength{\tabcolsep}{0in}
+
+% Sections formatting
+\titleformat{\section}{
+  \vspace{-4pt}\scshape\raggedright\large
+}{}{0em}{}[\color{black}\titlerule \vspace{-5pt}]
+
+%-------------------------
+% Custom commands
+\NewDocumentCommand{\resumeItem}{m}{
+  \item\small{
+    {#1 \vspace{-2pt}}
+  }
+}
+
+\NewDocumentCommand{\resumeSubheading}{mmmm}{
+  \vspace{-2pt}\item
+    \begin{tabular*}{0.97\textwidth}[t]{l@{\extracolsep{\fill}}r}
+      \textbf{#1} & #2 \\
+      \textit{\small#3} & \textit{\small #4} \\
+    \end{tabular*}\vspace{-7pt}
+}
+
+\NewDocumentCommand{\resumeSubSubheading}{mm}{
+    \item
+    \begin{tabular*}{0.97\textwidth}{l@{\extracolsep{\fill}}r}
+      \textit{\small#1} & \textit{\small #2} \\
+    \end{tabular*}\vspace{-7pt}
+}
+
+\NewDocumentCommand{\resumeProjectHeading}{mm}{
+    \item
+    \begin{tabular*}{0.97\textwidth}{l@{\extracolsep{\fill}}r}
+      \small#1 & #2 \\
+    \end{tabular*}\vspace{-7pt}
+}
+
+\NewDocumentCommand{\resumeSubItem}{m}{\resumeItem{#1}\vspace{-4pt}}
+
+\renewcommand\labelitemii{$\vcenter{\hbox{\tiny$\bullet$}}$}
+
+\NewDocumentEnvironment{resumeSubHeadingListStart}{}{
+  \begin{itemize}[leftmargin=0.15in, label={}]
+}{
+  \end{itemize}
+}
+
+\NewDocumentEnvironment{resumeItemListStart}{}{
+  \begin{itemize}
+}{
+  \end{itemize}\vspace{-5pt}
+}
+"""
+
+# Per-document preamble. \csname endofdump\endcsname is a no-op in a normal run and
+# marks where a precompiled format stops; glyph mappings are not stored in formats.
+DOCUMENT_PREAMBLE = r"""
+\csname endofdump\endcsname
+
+% Ensure that generate pdf is machine readable/ATS parsable
+\input{glyphtounicode}
+\pdfgentounicode=1
+
+%-------------------------------------------
+%%%%%%  RESUME STARTS HERE  %%%%%%%%%%%%%%%%%%%%%%%%%%%%
+
+
+\begin{document}
+"""
+
+DOCUMENT_END = r"""
+%-------------------------------------------
+\end{document}
+"""
+
+
+class JakeGutierrezLayout(Layout):
+    """The single-column Jake Gutierrez resume the service has always produced"""
+
+    name = "jake-gutierrez"
+    version = TEMPLATE_VERSION
+    prefix = LATEX_PREAMBLE + DOCUMENT_PREAMBLE
+    suffix = DOCUMENT_END
+    SECTIONS = ("header", "education", "experience", "projects", "skills")
+    SECTION_FIELDS = {
+        "header": ("full_name", "email", "linkedin_url", "github_url", "website_url"),
+        "education": ("education_entries",),
+        "experience": ("experience_entries",),
+        "projects": ("project_entries",),
+        "skills": ("skill_categories",),
+    }
+    TEMPLATES = {
+        "header": r"""
+%----------HEADING----------
+\begin{center}
+    \textbf{\Huge \scshape <<full_name>>} \\
+    \vspace{2pt}
+    \href{mailto:<<email>>}{\underline{<<email>>}} $|$ 
+    \href{https://<<linkedin_url>>}{\underline{<<linkedin_url>>}} $|$
+    \href{https://<<github_url>>}{\underline{<<github_url>>}}<<website>>
+\end{center}
+
+""",
+        "website": r" $|$ \href{https://<<website_url>>}{\underline{<<website_url>>}}",
+        "education_start": r"""
+%-----------EDUCATION-----------
+\section{Education}
+  \begin{resumeSubHeadingListStart}
+""",
+        "education_entry": r"""    \resumeSubheading
+      {<<institution>>}{<<location>>}
+      {<<degree>>}{<<date_range>>}
+""",
+        "education_end": r"""  \end{resumeSubHeadingListStart}
+
+""",
+        "experience_start": r"""
+%-----------EXPERIENCE-----------
+\section{Experience}
+  \begin{resumeSubHeadingListStart}
+""",
+        "experience_entry": r"""
+    \resumeSubheading
+      {<<title>>}{<<dates>>}
+      {<<organization>>}{<<location>>}
+      \begin{resumeItemListStart}
+""",
+        "experience_item": r"""        \resumeItem{<<text>>}
+""",
+        "experience_entry_end": r"""      \end{resumeItemListStart}
+""",
+        "experience_end": r"""
+  \end{resumeSubHeadingListStart}
+
+""",
+        "projects_start": r"""
+%-----------PROJECTS-----------
+\section{Projects}
+    \begin{resumeSubHeadingListStart}
+""",
+        "project_entry": r"""      \resumeProjectHeading
+          {\textbf{<<name>>} $|$ \emph{<<technologies>>}}{<<date_range>>}
+          \begin{resumeItemListStart}
+""",
+        "project_item": r"""            \resumeItem{<<text>>}
+""",
+        "project_entry_end": r"""          \end{resumeItemListStart}
+""",
+        "projects_end": r"""    \end{resumeSubHeadingListStart}
+
+""",
+        "skills_start": r"""
+%-----------TECHNICAL SKILLS-----------
+\section{Technical Skills}
+ \begin{itemize}[leftmargin=0.15in, label={}, nosep]
+""",
+        "skill_category": r"""    \small{\item{
+     \textbf{<<category_name>>}{: <<skills>>}
+    }}
+""",
+        "skills_end": r""" \end{itemize}
+
+""",
+    }
+
+    def render_header(self, data: Dict[str, Any]) -> str:
+        website_url = data.get('website_url')
+        website = self.templates["website"].fill(escape_latex(website_url)) if website_url else ""
+        return self.templates["header"].fill(
+            escape_latex(data['full_name']),
+            escape_latex(data['email']),
+            escape_latex(data['linkedin_url']) if data.get('linkedin_url') else '',
+            escape_latex(data['github_url']) if data.get('github_url') else '',
+            website
+        )
+
+    def render_education(self, data: Dict[str, Any]) -> str:
+        templates = self.templates
+        entry = templates["education_entry"].fill
+        out = [templates["education_start"].source]
+        for edu in data['education_entries']:
+            out.append(entry(
+                escape_latex(edu['institution']),
+                escape_latex(edu['location']) if edu.get('location') else '',
+                escape_latex(edu['degree']),
+                escape_latex(edu['date_range'])
+            ))
+        out.append(templates["education_end"].source)
+        return "".join(out)
+
+    def render_experience(self, data: Dict[str, Any]) -> str:
+        templates = self.templates
+        entry = templates["experience_entry"].fill
+        items = templates["experience_item"].render_each
+        entry_end = templates["experience_entry_end"].source
+        out = [templates["experience_start"].source]
+        for exp in data['experience_entries']:
+            out.append(entry(
+                escape_latex(exp['title']),
+                escape_latex(exp['dates']),
+                escape_latex(exp['organization']),
+                escape_latex(exp['location']) if exp.get('location') else ''
+            ))
+            out.append(items(escape_many(exp['responsibilities'])))
+            out.append(entry_end)
+        out.append(templates["experience_end"].source)
+        return "".join(out)
+
+    def render_projects(self, data: Dict[str, Any]) -> str:
+        templates = self.templates
+        entry = templates["project_entry"].fill
+        items = templates["project_item"].render_each
+        entry_end = templates["project_entry_end"].source
+        out = [templates["projects_start"].source]
+        for proj in data['project_entries']:
+            out.append(entry(
+                escape_latex(proj['name']),
+                escape_latex(proj['technologies']),
+                escape_latex(proj['date_range']) if proj.get('date_range') else ''
+            ))
+            out.append(items(escape_many(proj['details'])))
+            out.append(entry_end)
+        out.append(templates["projects_end"].source)
+        return "".join(out)
+
+    def render_skills(self, data: Dict[str, Any]) -> str:
+        if not data.get('skill_categories'):
+            return ""
+        templates = self.templates
+        category = templates["skill_category"].fill
+        out = [templates["skills_start"].source]
+        for skill_category in data['skill_categories']:
+            # Only add category if it has skills
+            if skill_category['skills']:
+                out.append(category(
+                    escape_latex(skill_category['category_name']),
+                    ", ".join(escape_many(skill_category['skills']))
+                ))
+        out.append(templates["skills_end"].source)
+        return "".join(out)
+
+
+# Layouts by name; ResumeGenerator renders with DEFAULT_LAYOUT unless told otherwise
+LAYOUTS: Dict[str, Layout] = {}
+DEFAULT_LAYOUT = JakeGutierrezLayout.name
+
+
+def register_layout(layout: Layout) -> Layout:
+    """Make a layout available to ResumeGenerator by name"""
+    LAYOUTS[layout.name] = layout
+    return layout
+
+
+def get_layout(name: str = DEFAULT_LAYOUT) -> Layout:
+    """Look up a registered layout"""
+    try:
+        return LAYOUTS[name]
+    except KeyError:
+        raise ValueError(f"Unknown resume layout: {name}")
+
+
+register_layout(JakeGutierrezLayout())
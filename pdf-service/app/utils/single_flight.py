@@ -0,0 +1,86 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+from app.utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+
+coalesced_requests = Counter("pdf_coalesced_requests_total",
+                             "Requests that joined an identical compile or upload already in flight", ("operation",))
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs concurrent calls for the same key once and gives every caller its outcome.
+
+    The first caller for a key starts the work as a task of its own; callers
+    arriving while it runs wait for the same task and receive the same result
+    or exception. A caller that is cancelled (a client that went away, a
+    superseded preview) stops waiting without disturbing the others; when the
+    last waiter is cancelled the work is cancelled too, so a compile nobody
+    waits for anymore does not keep its TeX process and compile slot. The key
+    is forgotten once the work finishes, so later calls run again; results
+    worth keeping belong in a cache.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, _Flight] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``work`` for ``key``, or wait for the run already in flight
+
+        Parameters:
+        -----------
+        key : str
+            Identity of the work, e.g. the content address of a document
+        work : Callable[[], Awaitable[Any]]
+            Starts the work; called only if none is in flight for ``key``
+
+        Returns:
+        --------
+        Any
+            The result of the shared run; its exception is raised to every caller
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(work()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda done: self._finished(key, flight))
+        else:
+            self.coalesced += 1
+            coalesced_requests.inc(operation=self.name)
+            logger.info(f"Joined the {self.name} already in flight for {key}")
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # The last waiter was cancelled; later callers start afresh rather than join a cancelled run
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _finished(self, key: str, flight: _Flight) -> None:
+        self._forget(key, flight)
+        # Retrieved here so a failure nobody waited for anymore is not reported as unhandled
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._flights)
@@ -0,0 +1,330 @@
+import abc
+import os
+import time
+import asyncio
+import pathlib
+import logging
+from collections import deque
+from typing import Optional, Dict, Any, List
+from fastapi import HTTPException, status
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Storage configuration
+PDF_STORAGE_BACKEND = settings.get("PDF_STORAGE_BACKEND", "r2")
+PDF_STORAGE_DIR = settings.get("PDF_STORAGE_DIR", os.path.join(os.getcwd(), "pdf_storage"))
+# Base URL the local backend's directory is served from; defaults to file:// URLs
+PDF_STORAGE_PUBLIC_URL = settings.get("PDF_STORAGE_PUBLIC_URL")
+
+
+class OperationStats:
+    """Latency and failure counters for one kind of storage call"""
+
+    def __init__(self, window: int = 500):
+        self.count = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.bytes = 0
+        self._recent = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool, size: int = 0) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self._recent.append(seconds)
+        if ok:
+            self.bytes += size
+        else:
+            self.failures += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = sorted(self._recent)
+
+        def percentile(q: float) -> float:
+            if not recent:
+                return 0.0
+            return round(recent[min(len(recent) - 1, int(q * len(recent)))] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "bytes": self.bytes,
+            "avg_ms": round(self.total_seconds / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+        }
+
+
+class PdfStorage(abc.ABC):
+    """
+    Where generated PDFs are published.
+
+    Backends implement ``_upload``, ``_exists``, ``_delete`` and ``public_url``;
+    the public methods wrap them with latency and failure accounting. Uploads
+    raise HTTPException on failure, lookups and deletes return False.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._stats = {"upload": OperationStats(), "head": OperationStats(), "delete": OperationStats()}
+
+    async def upload(self, pdf_bytes: bytes, object_key: str, original_filename: str = "resume.pdf") -> str:
+        """
+        Store a PDF under a key and return its public URL
+
+        Parameters:
+        -----------
+        pdf_bytes : bytes
+            Contents of the PDF
+        object_key : str
+            Key to store the object under
+        original_filename : str, optional
+            Filename recorded with the object where the backend supports it
+
+        Returns:
+        --------
+        str
+            The public URL of the stored PDF
+        """
+        started_at = time.perf_counter()
+        try:
+            url = await self._upload(pdf_bytes, object_key, original_filename)
+        except Exception:
+            self._stats["upload"].record(time.perf_counter() - started_at, False)
+            raise
+        self._stats["upload"].record(time.perf_counter() - started_at, True, len(pdf_bytes))
+        return url
+
+    async def exists(self, object_key: str) -> bool:
+        """True if an object is stored under the key"""
+        started_at = time.perf_counter()
+        found = await self._exists(object_key)
+        self._stats["head"].record(time.perf_counter() - started_at, True)
+        return found
+
+    async def delete(self, object_key: str) -> bool:
+        """Delete an object, returning True on success"""
+        started_at = time.perf_counter()
+        deleted = await self._delete(object_key)
+        self._stats["delete"].record(time.perf_counter() - started_at, deleted)
+        return deleted
+
+    async def delete_many(self, object_keys: List[str]) -> List[str]:
+        """Delete several objects, returning the keys that were deleted"""
+        if not object_keys:
+            return []
+        started_at = time.perf_counter()
+        deleted = await self._delete_many(object_keys)
+        self._stats["delete"].record(time.perf_counter() - started_at, len(deleted) == len(object_keys))
+        return deleted
+
+    @abc.abstractmethod
+    def public_url(self, object_key: str) -> str:
+        ...
+
+    @abc.abstractmethod
+    async def _upload(self, pdf_bytes: bytes, object_key: str, original_filename: str) -> str:
+        ...
+
+    @abc.abstractmethod
+    async def _exists(self, object_key: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    async def _delete(self, object_key: str) -> bool:
+        ...
+
+    async def _delete_many(self, object_keys: List[str]) -> List[str]:
+        # Backends without a bulk call delete one by one
+        return [key for key in object_keys if await self._delete(key)]
+
+    def connect(self) -> None:
+        """Build the backend's client ahead of the first request; blocking, so run it in a thread"""
+
+    async def check(self) -> bool:
+        """True if the backend can be reached, for readiness checks"""
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend name with latency percentiles and counters per operation"""
+        return {"backend": self.name, **{op: stats.snapshot() for op, stats in self._stats.items()}}
+
+
+class R2Storage(PdfStorage):
+    """Cloudflare R2 (or any S3-compatible store) through app.utils.r2_storage"""
+
+    name = "r2"
+
+    def __init__(self):
+        super().__init__()
+        from app.utils import r2_storage
+        self._backend = r2_storage
+
+    def connect(self) -> None:
+        self._backend.get_s3_client()
+
+    async def check(self) -> bool:
+        return await self._backend.bucket_reachable()
+
+    def public_url(self, object_key: str) -> str:
+        return self._backend.get_public_url(object_key)
+
+    async def _upload(self, pdf_bytes: bytes, object_key: str, original_filename: str) -> str:
+        return await self._backend.upload_pdf(pdf_bytes, object_key=object_key, original_filename=original_filename)
+
+    async def _exists(self, object_key: str) -> bool:
+        return await self._backend.pdf_exists(object_key)
+
+    async def _delete(self, object_key: str) -> bool:
+        return await self._backend.delete_pdf(object_key)
+
+    async def _delete_many(self, object_keys: List[str]) -> List[str]:
+        return await self._backend.delete_pdfs(object_keys)
+
+
+class CloudinaryStorage(PdfStorage):
+    """Cloudinary through app.utils.cloudinary"""
+
+    name = "cloudinary"
+
+    def __init__(self):
+        super().__init__()
+        from app.utils import cloudinary
+        self._backend = cloudinary
+
+    def connect(self) -> None:
+        self._backend._sdk()
+
+    async def check(self) -> bool:
+        return await self._backend.reachable()
+
+    def public_url(self, object_key: str) -> str:
+        return self._backend.get_public_url(object_key)
+
+    async def _upload(self, pdf_bytes: bytes, object_key: str, original_filename: str) -> str:
+        return await self._backend.upload_pdf(pdf_bytes, object_key=object_key)
+
+    async def _exists(self, object_key: str) -> bool:
+        return await self._backend.pdf_exists(object_key)
+
+    async def _delete(self, object_key: str) -> bool:
+        return await self._backend.delete_pdf(object_key)
+
+
+class LocalStorage(PdfStorage):
+    """PDFs written to a local directory, for development and single-host deployments"""
+
+    name = "local"
+
+    def __init__(self, directory: str = PDF_STORAGE_DIR, public_base_url: Optional[str] = PDF_STORAGE_PUBLIC_URL):
+        super().__init__()
+        self.directory = directory
+        self.public_base_url = public_base_url.rstrip("/") if public_base_url else None
+
+    def _path(self, object_key: str) -> str:
+        # Keys are flat names; never let one escape the storage directory
+        return os.path.join(self.directory, os.path.basename(object_key))
+
+    def public_url(self, object_key: str) -> str:
+        if self.public_base_url:
+            return f"{self.public_base_url}/{os.path.basename(object_key)}"
+        return pathlib.Path(os.path.abspath(self._path(object_key))).as_uri()
+
+    async def check(self) -> bool:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError:
+            return False
+        return os.access(self.directory, os.W_OK)
+
+    def _write(self, pdf_bytes: bytes, object_key: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(object_key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as pdf_file:
+            pdf_file.write(pdf_bytes)
+        os.replace(temp_path, path)
+
+    async def _upload(self, pdf_bytes: bytes, object_key: str, original_filename: str) -> str:
+        try:
+            await asyncio.to_thread(self._write, pdf_bytes, object_key)
+        except Exception as e:
+            logger.error(f"Error storing PDF locally: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error storing PDF locally: {str(e)}"
+            )
+        logger.info(f"PDF stored at: {self._path(object_key)}")
+        return self.public_url(object_key)
+
+    async def _exists(self, object_key: str) -> bool:
+        return os.path.exists(self._path(object_key))
+
+    async def _delete(self, object_key: str) -> bool:
+        try:
+            os.remove(self._path(object_key))
+            return True
+        except OSError as e:
+            logger.error(f"Error deleting local PDF {object_key}: {str(e)}")
+            return False
+
+
+class MemoryStorage(PdfStorage):
+    """PDFs kept in a dict; for benchmarks and load tests that should not touch the network"""
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self.objects: Dict[str, bytes] = {}
+
+    def public_url(self, object_key: str) -> str:
+        return f"memory://{object_key}"
+
+    async def _upload(self, pdf_bytes: bytes, object_key: str, original_filename: str) -> str:
+        self.objects[object_key] = pdf_bytes
+        return self.public_url(object_key)
+
+    async def _exists(self, object_key: str) -> bool:
+        return object_key in self.objects
+
+    async def _delete(self, object_key: str) -> bool:
+        return self.objects.pop(object_key, None) is not None
+
+
+BACKENDS = {
+    "r2": R2Storage,
+    "s3": R2Storage,
+    "cloudinary": CloudinaryStorage,
+    "local": LocalStorage,
+    "memory": MemoryStorage,
+}
+
+
+def create_storage(kind: str = PDF_STORAGE_BACKEND) -> PdfStorage:
+    """Build the configured storage backend"""
+    try:
+        backend = BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend: {kind}")
+    return backend()
+
+
+_storage: Optional[PdfStorage] = None
+
+
+def get_storage() -> PdfStorage:
+    """Storage backend shared by the PDF routes, created on first use"""
+    global _storage
+    if _storage is None:
+        _storage = create_storage()
+        logger.info(f"Using {_storage.name} storage for generated PDFs")
+    return _storage
+
+
+def set_storage(storage: PdfStorage) -> None:
+    """Replace the shared storage backend, e.g. with MemoryStorage in a benchmark"""
+    global _storage
+    _storage = storage
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# <<name>> placeholders; LaTeX itself never uses "<<", so no escaping is needed
+PLACEHOLDER = re.compile(r"<<(\w+)>>")
+
+class Template:
+    """
+    A LaTeX fragment with ``<<name>>`` placeholders, compiled once.
+
+    The source is turned into a Python function whose body is a single
+    f-string, with one parameter per distinct field in order of first
+    appearance. Rendering is then one call and one string build, with no
+    per-render parsing or intermediate strings. Values must already be escaped.
+    """
+
+    def __init__(self, source: str):
+        pieces = PLACEHOLDER.split(source)
+        self.source = source
+        self.fields: List[str] = list(dict.fromkeys(pieces[1::2]))
+        tokens = []
+        for i, piece in enumerate(pieces):
+            if i % 2:
+                tokens.append(f"f'{{{piece}}}'")
+            elif piece:
+                tokens.append("f" + repr(piece.replace("{", "{{").replace("}", "}}")))
+        namespace: Dict[str, Any] = {}
+        exec(f"def render({', '.join(self.fields)}):\n    return {' '.join(tokens) or repr('')}\n", namespace)
+        # fill(*values) renders with one positional argument per field
+        self.fill: Callable[..., str] = namespace["render"]
+        # Single-placeholder templates (list items) can render a whole list with one join
+        if len(pieces) == 3:
+            self._before, self._after = pieces[0], pieces[2]
+
+    def render(self, values: Dict[str, str]) -> str:
+        """Fill the placeholders from a dict of field values"""
+        return self.fill(**values)
+
+    def render_each(self, values: List[str]) -> str:
+        """The template repeated once per value; only for templates with a single placeholder"""
+        if not values:
+            return ""
+        return self._before + (self._after + self._before).join(values) + self._after
+
+
+_compiled: Dict[Tuple[str, str], Dict[str, Template]] = {}
+
+
+def compile_templates(name: str, version: str, sources: Dict[str, str]) -> Dict[str, Template]:
+    """Compile a layout's templates, once per layout name and version"""
+    key = (name, version)
+    if key not in _compiled:
+        _compiled[key] = {template: Template(source) for template, source in sources.items()}
+    return _compiled[key]
+
+
+class Layout:
+    """
+    A resume layout: a static document prefix and suffix and a set of sections.
+
+    Subclasses set ``name``, ``version``, ``prefix``, ``suffix`` and
+    ``TEMPLATES`` and implement one ``render_<section>(data)`` method per
+    entry in ``SECTIONS``. Sections receive the raw resume data and escape
+    each field exactly once before filling their templates.
+
+    ``SECTION_FIELDS`` lists the resume fields each section reads, which lets a
+    rendered section be reused for as long as those fields are unchanged. A
+    section without an entry is treated as depending on every field.
+    """
+
+    name = "base"
+    version = "0"
+    prefix = ""
+    suffix = ""
+    SECTIONS: Tuple[str, ...] = ()
+    TEMPLATES: Dict[str, str] = {}
+    SECTION_FIELDS: Dict[str, Tuple[str, ...]] = {}
+
+    def __init__(self):
+        self.templates = compile_templates(self.name, self.version, self.TEMPLATES)
+        self._renderers = [getattr(self, f"render_{section}") for section in self.SECTIONS]
+
+    def render_section(self, section: str, data: Dict[str, Any]) -> str:
+        """Render one section of the document body"""
+        return getattr(self, f"render_{section}")(data)
+
+    def section_key(self, section: str, data: Dict[str, Any]) -> str:
+        """Content hash of the data one section is rendered from"""
+        fields = self.SECTION_FIELDS.get(section) or sorted(data)
+        payload = json.dumps([data.get(field) for field in fields], sort_keys=True,
+                             ensure_ascii=False, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(f"{self.name}\0{self.version}\0{section}\0".encode("utf-8"))
+        digest.update(payload.encode("utf-8"))
+        return digest.hexdigest()
+
+    def sections_reading(self, fields: Iterable[str]) -> List[str]:
+        """Sections whose output can change when any of ``fields`` changes"""
+        fields = set(fields)
+        return [section for section in self.SECTIONS
+                if section not in self.SECTION_FIELDS or fields & set(self.SECTION_FIELDS[section])]
+
+    def render(self, data: Dict[str, Any]) -> str:
+        """Render a complete LaTeX document"""
+        parts = [self.prefix]
+        for render_section in self._renderers:
+            parts.append(render_section(data))
+        parts.append(self.suffix)
+        return "".join(parts)
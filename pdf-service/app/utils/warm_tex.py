@@ -0,0 +1,260 @@
+import os
+import time
+import asyncio
+import shutil
+import logging
+from typing import Optional, Tuple, List, Dict, Any
+from app.utils.compile_pool import compile_pool, compile_temp_dir, CompilePool, CompileTimeout
+from app.utils.latex_format import latex_format
+from app.utils.log_config import tex_errors
+from app.utils.resume_template import LATEX_PREAMBLE, DOCUMENT_PREAMBLE, DOCUMENT_END
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Warm worker configuration
+WARM_TEX_WORKERS = settings.get_int("WARM_TEX_WORKERS", 2)
+WARM_TEX_MAX_AGE = settings.get_float("WARM_TEX_MAX_AGE", 600)
+WARM_TEX_SPAWN_TIMEOUT = settings.get_float("WARM_TEX_SPAWN_TIMEOUT", 60)
+
+READY_MARKER = b"RESUME-WORKER-READY"
+DOCUMENT_PREFIX = LATEX_PREAMBLE + DOCUMENT_PREAMBLE
+
+# Driver run by every warm worker. It loads the preamble (from the format when
+# available), starts the document, touches the fonts the template uses and then
+# blocks on a terminal read until a job body has been written to body.tex.
+DRIVER_SOURCE = DOCUMENT_PREFIX + r"""
+\setbox0\hbox{\normalsize A\bfseries A\itshape A\small A\large\scshape A\Huge\scshape A$\bullet$}
+\immediate\write16{RESUME-WORKER-READY}
+\read-1 to \resumejob
+\input{body.tex}
+""" + DOCUMENT_END
+
+
+def document_body(latex_content: str) -> Optional[str]:
+    """Return the part of a rendered resume between the preamble and \\end{document}, or None"""
+    if latex_content.startswith(DOCUMENT_PREFIX) and latex_content.endswith(DOCUMENT_END):
+        return latex_content[len(DOCUMENT_PREFIX):-len(DOCUMENT_END)]
+    return None
+
+
+class WarmTexWorker:
+    """A pdflatex process that has loaded the preamble and is waiting for one document"""
+
+    def __init__(self, process: asyncio.subprocess.Process, work_dir: str, format_name: Optional[str]):
+        self.process = process
+        self.work_dir = work_dir
+        self.format_name = format_name
+        self.started_at = time.monotonic()
+
+    @property
+    def pdf_path(self) -> str:
+        return os.path.join(self.work_dir, "resume.pdf")
+
+    def is_stale(self) -> bool:
+        """True if the worker died, is too old, or was started against another format"""
+        current_format = latex_format.name if latex_format.available() else None
+        return (self.process.returncode is not None
+                or time.monotonic() - self.started_at > WARM_TEX_MAX_AGE
+                or self.format_name != current_format)
+
+    async def compile(self, body: str, timeout: float) -> Tuple[int, bytes]:
+        """
+        Feed a document body to the worker and wait for pdflatex to finish
+
+        Returns:
+        --------
+        Tuple[int, bytes]
+            Return code and terminal output of pdflatex
+        """
+        with open(os.path.join(self.work_dir, "body.tex"), "w", encoding='utf-8') as body_file:
+            body_file.write(body)
+
+        # Release the \read; closing stdin makes any further terminal read fatal
+        self.process.stdin.write(b"\n")
+        self.process.stdin.close()
+        try:
+            stdout, _ = await asyncio.wait_for(self.process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await CompilePool.kill(self.process)
+            raise CompileTimeout(f"Compilation timed out after {timeout:g} seconds")
+        except asyncio.CancelledError:
+            await CompilePool.kill(self.process)
+            raise
+        return self.process.returncode, stdout
+
+    async def close(self) -> None:
+        """Kill the process and remove its working directory"""
+        await CompilePool.kill(self.process)
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+class WarmTexPool:
+    """
+    Keeps ``size`` pdflatex processes started and parked just before the document body.
+
+    TeX cannot start a second document after \\end{document}, so every worker
+    serves exactly one job and is replaced afterwards; the pool makes sure the
+    replacement pays process startup, format loading and font loading off the
+    request path. Workers are also recycled when they exceed ``WARM_TEX_MAX_AGE``
+    or the preamble format changes, and spawning backs off while it keeps failing.
+    """
+
+    def __init__(self, size: int = WARM_TEX_WORKERS):
+        self.size = max(0, size)
+        self._ready: List[WarmTexWorker] = []
+        self._wanted = asyncio.Event()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._failures = 0
+        self.served = 0
+        self.spawned = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def start(self) -> None:
+        """Start keeping workers warm in the background"""
+        if self.enabled and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.ensure_future(self._refill())
+
+    async def stop(self) -> None:
+        """Stop refilling and shut down idle workers"""
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+        workers, self._ready = self._ready, []
+        for worker in workers:
+            await worker.close()
+
+    def acquire(self) -> Optional[WarmTexWorker]:
+        """Take a ready worker, or None if none is warm right now"""
+        worker = None
+        while self._ready:
+            candidate = self._ready.pop(0)
+            if candidate.is_stale():
+                asyncio.ensure_future(candidate.close())
+                continue
+            worker = candidate
+            break
+        self._wanted.set()
+        return worker
+
+    async def _refill(self) -> None:
+        while True:
+            while len(self._ready) < self.size:
+                worker = await self._spawn()
+                if worker is None:
+                    self._failures += 1
+                    await asyncio.sleep(min(60, 2 ** self._failures))
+                    continue
+                self._failures = 0
+                self._ready.append(worker)
+            self._wanted.clear()
+            await self._wanted.wait()
+
+    async def _spawn(self) -> Optional[WarmTexWorker]:
+        work_dir = compile_temp_dir("warm-tex")
+        with open(os.path.join(work_dir, "driver.tex"), "w", encoding='utf-8') as driver_file:
+            driver_file.write(DRIVER_SOURCE)
+
+        use_format = latex_format.available()
+        args = ["pdflatex"]
+        if use_format:
+            args += latex_format.compile_args()
+        args += ["-interaction=scrollmode", "-jobname=resume", "-output-directory", work_dir, "driver.tex"]
+
+        process = None
+        output = b""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                cwd=work_dir,
+                env=latex_format.compile_env() if use_format else None,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            deadline = time.monotonic() + WARM_TEX_SPAWN_TIMEOUT
+            while True:
+                line = await asyncio.wait_for(process.stdout.readline(), max(0.0, deadline - time.monotonic()))
+                if not line:
+                    raise RuntimeError("pdflatex exited before the worker was ready")
+                output += line
+                if READY_MARKER in line:
+                    break
+            self.spawned += 1
+            return WarmTexWorker(process, work_dir, latex_format.name if use_format else None)
+
+        except Exception as e:
+            if use_format and latex_format.is_format_error(output.decode('utf-8', errors='replace')):
+                latex_format.invalidate()
+            logger.warning(f"Error starting warm TeX worker: {str(e) or type(e).__name__}")
+            if process is not None:
+                await CompilePool.kill(process)
+            shutil.rmtree(work_dir, ignore_errors=True)
+            return None
+
+    async def compile(self, latex_content: str, output_pdf: str) -> Optional[Tuple[int, bytes]]:
+        """
+        Compile a rendered resume on a warm worker
+
+        Parameters:
+        -----------
+        latex_content : str
+            Full LaTeX source produced by ResumeGenerator
+        output_pdf : str
+            Where to move the compiled PDF on success
+
+        Returns:
+        --------
+        Optional[Tuple[int, bytes]]
+            Return code and pdflatex output, or None if no warm worker could take
+            the document, or the worker failed on its own, and the caller should
+            compile it cold
+        """
+        if not self.enabled:
+            return None
+        body = document_body(latex_content)
+        if body is None:
+            return None
+        worker = self.acquire()
+        if worker is None:
+            return None
+
+        try:
+            async with compile_pool.slot():
+                # The wait for a slot can be long under load: the worker may have
+                # died or aged out in the meantime
+                if worker.is_stale():
+                    logger.info("Warm TeX worker went stale while waiting for a compile slot")
+                    return None
+                returncode, stdout = await worker.compile(body, compile_pool.timeout)
+            if returncode != 0 and not os.path.exists(worker.pdf_path) and \
+                    not tex_errors(stdout.decode('utf-8', errors='replace')):
+                # The process failed (killed, out of memory), not the document
+                logger.warning(f"Warm TeX worker exited with status {returncode} without a TeX error")
+                return None
+            self.served += 1
+            if os.path.exists(worker.pdf_path):
+                shutil.move(worker.pdf_path, output_pdf)
+            return returncode, stdout
+        finally:
+            await worker.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Warm worker counters"""
+        return {
+            "size": self.size,
+            "ready": len(self._ready),
+            "spawned": self.spawned,
+            "served": self.served,
+        }
+
+
+# Shared pool used by ResumeGenerator
+warm_tex_pool = WarmTexPool()
@@ -0,0 +1,77 @@
+"""
+Compare two benchmark result files and report regressions.
+
+Latencies (keys ending in _ms, _us or _ns) regress when they grow and
+throughput (_rps) when it drops; a change beyond the threshold in the
+wrong direction is a regression and makes the script exit non-zero. Load
+test levels are matched by concurrency. Run from the pdf-service directory:
+
+    python -m benchmarks.compare results/v1.json results/v2.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict
+
+LOWER_IS_BETTER = ("_ms", "_us", "_ns", "_ns_per_field")
+HIGHER_IS_BETTER = ("_rps",)
+
+
+def flatten(value: Any, path: str = "") -> Dict[str, float]:
+    """Numeric leaves by slash-separated path; list items keyed by their concurrency when they have one"""
+    if isinstance(value, dict):
+        leaves: Dict[str, float] = {}
+        for key, item in value.items():
+            leaves.update(flatten(item, f"{path}/{key}" if path else key))
+        return leaves
+    if isinstance(value, list):
+        leaves = {}
+        for index, item in enumerate(value):
+            key = f"c{item['concurrency']}" if isinstance(item, dict) and "concurrency" in item else str(index)
+            leaves.update(flatten(item, f"{path}/{key}"))
+        return leaves
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {path: float(value)}
+    return {}
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    before = flatten({key: value for key, value in baseline.items() if key != "environment"})
+    after = flatten({key: value for key, value in candidate.items() if key != "environment"})
+    changes, regressions, improvements = {}, [], []
+    for path in sorted(before.keys() & after.keys()):
+        if path.endswith(LOWER_IS_BETTER):
+            sign = 1
+        elif path.endswith(HIGHER_IS_BETTER):
+            sign = -1
+        else:
+            continue
+        if before[path] == 0:
+            continue
+        change = (after[path] - before[path]) / before[path]
+        changes[path] = round(change, 4)
+        if sign * change > threshold:
+            regressions.append(path)
+        elif sign * change < -threshold:
+            improvements.append(path)
+    return {
+        "baseline": baseline.get("environment", {}).get("commit"),
+        "candidate": candidate.get("environment", {}).get("commit"),
+        "threshold": threshold,
+        "regressions": {path: changes[path] for path in regressions},
+        "improvements": {path: changes[path] for path in improvements},
+        "compared": len(changes),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline", help="results of the earlier release")
+    parser.add_argument("candidate", help="results to check")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+    with open(args.baseline, encoding="utf-8") as baseline_file, open(args.candidate, encoding="utf-8") as candidate_file:
+        report = compare(json.load(baseline_file), json.load(candidate_file), args.threshold)
+    print(json.dumps(report, indent=2))
+    if report["regressions"]:
+        sys.exit(1)
@@ -0,0 +1,59 @@
+"""
+One-page fit estimator speed, and its estimates checked against rendered page counts.
+
+The direct engine renders with the estimator's own geometry, so its page
+counts must match the estimates exactly; the script exits non-zero if any
+differs. LaTeX page counts need a real pdflatex and are not checked here. Run
+from the pdf-service directory:
+
+    python -m benchmarks.fit_estimate --runs 200
+"""
+import argparse
+import json
+import timeit
+from app.utils import direct_pdf
+from app.utils.page_fit import FIT_LEVELS, CM_WIDTH_SCALE, choose_fit, estimate_pages
+from benchmarks.render_latency import large_resume
+
+SIZES = (8, 16, 24, 28, 32, 36, 40, 60)
+
+
+def run_checks() -> list:
+    """Return a list of failure messages"""
+    failures = []
+    for bullets in SIZES:
+        resume = large_resume(bullets)
+        for level in FIT_LEVELS:
+            estimate = estimate_pages(resume, level)
+            pages = direct_pdf.page_count(direct_pdf.render_pdf(direct_pdf.document_source(resume, level)))
+            if pages != estimate.pages:
+                failures.append(f"{bullets} bullets at {level}: estimated {estimate.pages} pages, rendered {pages}")
+    return failures
+
+
+def main(runs: int) -> dict:
+    failures = run_checks()
+    if failures:
+        raise SystemExit("\n".join(failures))
+
+    results = {"checks": "passed"}
+    for bullets in SIZES:
+        resume = large_resume(bullets)
+        fit = choose_fit(resume)
+        seconds = min(timeit.repeat(lambda: choose_fit(resume), number=runs, repeat=5)) / runs
+        results[f"{bullets}_bullets"] = {
+            "latex_pages_by_level": {level: estimate_pages(resume, level, CM_WIDTH_SCALE).pages
+                                     for level in FIT_LEVELS},
+            "level": fit.level,
+            "fits": fit.fits,
+            "overflowing": len(fit.overflowing),
+            "choose_fit_us": round(seconds * 1_000_000),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200, help="fits timed per measurement")
+    args = parser.parse_args()
+    print(json.dumps(main(args.runs), indent=2))
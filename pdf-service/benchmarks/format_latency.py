@@ -0,0 +1,83 @@
+"""
+Per-resume compile latency with and without the precompiled preamble format.
+
+Run from the pdf-service directory (needs pdflatex and mylatexformat):
+
+    python -m benchmarks.format_latency --runs 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from app.utils.pdf_generator import ResumeGenerator
+from app.utils.latex_format import latex_format
+
+SAMPLE_RESUME = {
+    'full_name': "Jane Doe",
+    'email': "jane.doe@example.com",
+    'linkedin_url': "linkedin.com/in/janedoe",
+    'github_url': "github.com/janedoe",
+    'education_entries': [
+        {'institution': "State University", 'location': "Springfield, IL",
+         'degree': "B.S. Computer Science", 'date_range': "Aug. 2016 -- May 2020"},
+    ],
+    'experience_entries': [
+        {'title': "Software Engineer", 'dates': "June 2020 -- Present",
+         'organization': "Acme Corp", 'location': "Remote",
+         'responsibilities': [f"Shipped feature {i} & cut p95 latency by {10 + i}%" for i in range(5)]},
+        {'title': "Intern", 'dates': "May 2019 -- Aug. 2019",
+         'organization': "Initech", 'location': "Austin, TX",
+         'responsibilities': [f"Built internal tool #{i} with Python_3" for i in range(3)]},
+    ],
+    'project_entries': [
+        {'name': "resume-ai", 'technologies': "Python, FastAPI, LaTeX", 'date_range': "2024",
+         'details': ["Generates tailored resumes", "Caches compiled PDFs by content hash"]},
+    ],
+    'skill_categories': [
+        {'category_name': "Languages", 'skills': ["Python", "TypeScript", "C++", "SQL"]},
+        {'category_name': "Tools", 'skills': ["Docker", "Git", "PostgreSQL"]},
+    ],
+}
+
+
+async def time_compiles(generator: ResumeGenerator, latex_content: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        await generator.compile_pdf(latex_content)
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+
+def summarize(timings: list) -> dict:
+    return {
+        "runs": len(timings),
+        "mean_ms": round(statistics.mean(timings), 2),
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "max_ms": round(max(timings), 2),
+    }
+
+
+async def main(runs: int) -> dict:
+    generator = ResumeGenerator(output_dir=tempfile.mkdtemp())
+    latex_content = generator.render_latex(**SAMPLE_RESUME)
+
+    latex_format.enabled = False
+    before = await time_compiles(generator, latex_content, runs)
+
+    latex_format.enabled = True
+    if not await latex_format.build(force=True):
+        raise SystemExit("Could not build the LaTeX format, is mylatexformat installed?")
+    after = await time_compiles(generator, latex_content, runs)
+
+    return {"without_format": summarize(before), "with_format": summarize(after)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="compiles per variant")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.runs)), indent=2))
@@ -0,0 +1,121 @@
+"""
+End-to-end load test of /pdf/generate at increasing concurrency.
+
+By default the FastAPI app runs in-process with storage kept in memory, so
+nothing is uploaded; --url load-tests a running server instead. With
+--mode unique every request is a new document and is compiled, with
+--mode cached the same document is requested repeatedly. Run from the
+pdf-service directory:
+
+    python -m benchmarks.load_test --concurrency 1 4 16 --requests 100 --engine direct
+"""
+import os
+import atexit
+import shutil
+import tempfile
+
+# Read by the app when imported: keep the in-process service local and self-contained
+os.environ.setdefault("MAIN_SERVICE_ORIGIN_URL", "http://localhost")
+os.environ.setdefault("PDF_JOB_STORE", "memory")
+os.environ.setdefault("PDF_LIFECYCLE_ENABLED", "false")
+# One client sends everything: measure the service, not its per-caller rate limits
+os.environ.setdefault("PDF_RATE_LIMIT_PER_MINUTE", "0")
+os.environ.setdefault("PDF_CALLER_MAX_CONCURRENT", "0")
+if "PDF_CACHE_DIR" not in os.environ:
+    os.environ["PDF_CACHE_DIR"] = tempfile.mkdtemp(prefix="pdf-load-test-cache-")
+    atexit.register(shutil.rmtree, os.environ["PDF_CACHE_DIR"], True)
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+import httpx
+from benchmarks.payloads import SIZES, payload
+from benchmarks.timing import summarize
+
+GENERATE_PATH = "/api/v1/pdf/generate"
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, requests: int, bodies) -> Dict[str, Any]:
+    """Send ``requests`` requests from ``concurrency`` clients that each wait for their previous response"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(requests))
+
+    async def client_loop():
+        for _ in remaining:
+            body = next(bodies)
+            started_at = time.perf_counter()
+            try:
+                response = await client.post(GENERATE_PATH, json=body)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - started_at) * 1000)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    return {
+        "concurrency": concurrency,
+        "errors": sum(count for status, count in statuses.items() if status != "200"),
+        "statuses": dict(statuses),
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        **summarize(latencies),
+    }
+
+
+async def load_test(concurrency: List[int], requests: int, size: str, mode: str,
+                    engine: Optional[str], url: str) -> List[Dict[str, Any]]:
+    seeds = itertools.count(1) if mode == "unique" else itertools.repeat(0)
+    bodies = (dict(payload(size, seed), **({"engine": engine} if engine else {})) for seed in seeds)
+
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+            return [await run_level(client, level, requests, bodies) for level in concurrency]
+
+    from app.main import app
+    from app.utils.storage import MemoryStorage, set_storage
+    from app.utils.warmup import warmup
+    set_storage(MemoryStorage())
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        await warmup.wait()
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=120) as client:
+            # One request first so imports, the format build and warm workers are not measured
+            await client.post(GENERATE_PATH, json=next(bodies))
+            return [await run_level(client, level, requests, bodies) for level in concurrency]
+
+
+def main(concurrency: List[int], requests: int, size: str, mode: str,
+         engine: Optional[str], url: str) -> Dict[str, Any]:
+    if not url:
+        from app.utils.pdf_generator import PDF_ENGINE
+        if (engine or PDF_ENGINE) == "latex" and shutil.which("pdflatex") is None:
+            raise SystemExit("pdflatex is not installed, use --engine direct or --url")
+        # The service logs every request at INFO
+        logging.disable(logging.INFO)
+    levels = asyncio.run(load_test(concurrency, requests, size, mode, engine, url))
+    return {
+        "config": {"size": size, "mode": mode, "engine": engine or "default", "requests_per_level": requests,
+                   "target": url or "in-process"},
+        "levels": levels,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="concurrent clients, one run per value")
+    parser.add_argument("--requests", type=int, default=50, help="requests per concurrency level")
+    parser.add_argument("--size", choices=SIZES, default="typical", help="payload size")
+    parser.add_argument("--mode", choices=("unique", "cached"), default="unique",
+                        help="new document per request, or the same one every time")
+    parser.add_argument("--engine", choices=("latex", "direct"), default=None, help="defaults to PDF_ENGINE")
+    parser.add_argument("--url", default="", help="base URL of a running service instead of the in-process app")
+    args = parser.parse_args()
+    print(json.dumps(main(args.concurrency, args.requests, args.size, args.mode, args.engine, args.url), indent=2))
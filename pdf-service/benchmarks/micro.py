@@ -0,0 +1,103 @@
+"""
+Microbenchmarks of the generation steps in isolation: escaping, LaTeX rendering and compiling.
+
+Every step runs on the minimal, typical and extreme payloads. The LaTeX
+compile needs pdflatex and is skipped without it; the direct engine always
+runs. Run from the pdf-service directory:
+
+    python -m benchmarks.micro --runs 2000 --compile-runs 10
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+import time
+import timeit
+from typing import Any, Dict, List
+from app.utils.pdf_generator import ResumeGenerator
+from app.utils.latex_format import latex_format
+from benchmarks.payloads import SIZES, payload
+from benchmarks.timing import summarize
+
+# Arguments of ResumeGenerator._create_latex_content, in order
+RESUME_FIELDS = ("full_name", "email", "linkedin_url", "github_url", "education_entries", "experience_entries",
+                 "project_entries", "skill_categories", "phone_number", "website_url")
+
+
+def resume_fields(body: Dict[str, Any]) -> Dict[str, Any]:
+    """The resume fields of a request body, as the routes pass them to the generator"""
+    fields = {field: body.get(field) for field in RESUME_FIELDS}
+    for field in ("education_entries", "experience_entries", "project_entries", "skill_categories"):
+        fields[field] = fields[field] or []
+    return fields
+
+
+def strings(value: Any) -> List[str]:
+    """Every string in a request body, the text the generator escapes"""
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return [text for item in value for text in strings(item)]
+    return []
+
+
+def time_call(function, runs: int) -> float:
+    """Best per-call time in seconds over five repeats"""
+    return min(timeit.repeat(function, number=runs, repeat=5)) / runs
+
+
+async def time_compiles(generator: ResumeGenerator, source: str, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        await generator.compile_pdf(source)
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+
+def main(runs: int, compile_runs: int) -> Dict[str, Any]:
+    output_dir = tempfile.mkdtemp()
+    latex = ResumeGenerator(output_dir=output_dir, engine="latex")
+    direct = ResumeGenerator(output_dir=output_dir, engine="direct")
+    has_pdflatex = shutil.which("pdflatex") is not None
+
+    results: Dict[str, Any] = {}
+    for size in SIZES:
+        fields = resume_fields(payload(size))
+        texts = strings(fields)
+        latex._validate_input_data(dict(fields))
+        latex_content = latex._create_latex_content(**fields)
+
+        def escape_all():
+            for text in texts:
+                latex._escape_latex(text)
+
+        results[size] = {
+            "fields": len(texts),
+            "escape_latex_ns_per_field": round(time_call(escape_all, max(1, runs // 10)) / len(texts) * 1e9),
+            "create_latex_content_us": round(time_call(lambda: latex._create_latex_content(**fields), runs) * 1e6, 2),
+            "render_latex_us": round(time_call(lambda: latex.render_latex(**fields), max(1, runs // 4)) * 1e6, 2),
+            "latex_bytes": len(latex_content.encode("utf-8")),
+            "compile_direct": summarize(asyncio.run(
+                time_compiles(direct, direct._create_latex_content(**fields), compile_runs))),
+        }
+        if has_pdflatex:
+            results[size]["compile_latex"] = summarize(asyncio.run(time_compiles(latex, latex_content, compile_runs)))
+        else:
+            results[size]["compile_latex"] = "skipped, pdflatex is not installed"
+
+    results["environment"] = {"pdflatex": has_pdflatex, "latex_format": latex_format.available(),
+                              "warm_workers": False}
+    shutil.rmtree(output_dir, ignore_errors=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=2000, help="calls per rendering measurement")
+    parser.add_argument("--compile-runs", type=int, default=10, help="compiles per engine and payload size")
+    args = parser.parse_args()
+    print(json.dumps(main(args.runs, args.compile_runs), indent=2))
@@ -0,0 +1,119 @@
+"""
+Synthetic ResumeRequest payloads of three sizes: minimal, typical and a 3-page extreme.
+
+Payloads are generated from a seed, so every run benchmarks the same
+documents. Run from the pdf-service directory to print their sizes, or
+write them out as JSON for external load tools:
+
+    python -m benchmarks.payloads --out ./payloads
+"""
+import argparse
+import json
+import os
+import random
+from typing import Any, Dict
+from app.schema.pdf_schema import ResumeRequest
+from app.utils.page_fit import CM_WIDTH_SCALE, estimate_pages
+
+SIZES = ("minimal", "typical", "extreme")
+
+# (education, jobs, bullets per job, projects, details per project, skill categories, skills per category)
+_SHAPES = {
+    "minimal": (1, 1, 2, 0, 0, 1, 4),
+    "typical": (2, 3, 4, 2, 3, 4, 8),
+    "extreme": (3, 9, 7, 6, 3, 6, 16),
+}
+
+_VERBS = ["Built", "Led", "Designed", "Migrated", "Reduced", "Automated", "Scaled", "Shipped", "Rewrote", "Owned"]
+_OBJECTS = ["the billing pipeline", "a feature-flag service", "CI/CD for 40 repos", "the search indexer",
+            "on-call tooling", "a GraphQL gateway", "the data warehouse", "mobile release trains"]
+_RESULTS = ["cutting p95 latency by {n}%", "saving ${n}k/year", "serving {n}M requests/day",
+            "raising test coverage to {n}%", "for {n} teams & partners", "with 99.9{n}% uptime"]
+_SKILLS = ["Python", "Go", "Rust", "TypeScript", "C++", "SQL", "Kafka", "Redis", "PostgreSQL", "Docker",
+           "Kubernetes", "Terraform", "AWS", "GCP", "React", "FastAPI", "gRPC", "Spark", "Airflow", "LaTeX"]
+_PLACES = ["New York, NY", "Zürich, Switzerland", "São Paulo, Brazil", "Remote", "Austin, TX", "Kraków, Poland"]
+
+
+def _bullet(rnd: random.Random) -> str:
+    result = rnd.choice(_RESULTS).format(n=rnd.randint(2, 95))
+    return f"{rnd.choice(_VERBS)} {rnd.choice(_OBJECTS)} in {rnd.choice(_SKILLS)}, {result}"
+
+
+def payload(size: str = "typical", seed: int = 0) -> Dict[str, Any]:
+    """
+    A ResumeRequest body of the given size
+
+    Parameters:
+    -----------
+    size : str
+        One of SIZES
+    seed : int, optional
+        Different seeds give different documents of the same shape, e.g. to
+        defeat the PDF cache in a load test
+
+    Returns:
+    --------
+    Dict[str, Any]
+        JSON-serializable request body for /pdf/generate
+    """
+    education, jobs, bullets, projects, details, categories, skills = _SHAPES[size]
+    rnd = random.Random(f"{size}-{seed}")
+    body: Dict[str, Any] = {
+        "full_name": f"Jordan Example {seed}",
+        "email": f"jordan.{seed}@example.com",
+        "education_entries": [
+            {"institution": f"University of Example {i}", "degree": "B.S. Computer Science",
+             "date_range": f"Aug. {2010 + i} -- May {2014 + i}", "location": rnd.choice(_PLACES)}
+            for i in range(education)
+        ],
+        "experience_entries": [
+            {"title": rnd.choice(["Software Engineer", "Senior Engineer", "Staff Engineer", "Tech Lead"]),
+             "dates": f"Jan. {2024 - 2 * i} -- Dec. {2025 - 2 * i}",
+             "organization": f"Company_{i} & Co.", "location": rnd.choice(_PLACES),
+             "responsibilities": [_bullet(rnd) for _ in range(bullets)]}
+            for i in range(jobs)
+        ],
+        "project_entries": [
+            {"name": f"project-{i}", "technologies": ", ".join(rnd.sample(_SKILLS, 3)),
+             "date_range": str(2020 + i % 5), "details": [_bullet(rnd) for _ in range(details)]}
+            for i in range(projects)
+        ],
+        "skill_categories": [
+            {"category_name": f"Category {i}", "skills": rnd.sample(_SKILLS, skills)}
+            for i in range(categories)
+        ],
+    }
+    if size != "minimal":
+        body.update(phone_number="+1 555 0100", linkedin_url=f"linkedin.com/in/jordan{seed}",
+                    github_url=f"github.com/jordan{seed}", website_url="jordan.example.com")
+    return body
+
+
+def describe(size: str) -> Dict[str, Any]:
+    """Request size, bullet count and estimated LaTeX page count of a payload"""
+    body = payload(size)
+    # Validates the payload the way the service will
+    ResumeRequest(**body)
+    bullets = (sum(len(exp["responsibilities"]) for exp in body["experience_entries"])
+               + sum(len(proj["details"]) for proj in body["project_entries"]))
+    return {
+        "bytes": len(json.dumps(body)),
+        "bullets": bullets,
+        "estimated_pages": estimate_pages(body, "default", CM_WIDTH_SCALE).pages,
+    }
+
+
+def main(out_dir: str) -> Dict[str, Any]:
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+        for size in SIZES:
+            with open(os.path.join(out_dir, f"{size}.json"), "w", encoding="utf-8") as payload_file:
+                json.dump(payload(size), payload_file, ensure_ascii=False, indent=2)
+    return {size: describe(size) for size in SIZES}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default="", help="directory to write one JSON payload per size into")
+    args = parser.parse_args()
+    print(json.dumps(main(args.out), indent=2))
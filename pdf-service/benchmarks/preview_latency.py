@@ -0,0 +1,68 @@
+"""
+Preview latency while typing: HTML previews always, PNG previews when TeX and pdftoppm are installed.
+
+Each run edits one bullet, like a keystroke batch from the editor. Run from the
+pdf-service directory:
+
+    python -m benchmarks.preview_latency --runs 200
+"""
+import argparse
+import asyncio
+import copy
+import json
+import tempfile
+import time
+from app.utils.fragment_cache import FragmentCache
+from app.utils.pdf_generator import ResumeGenerator
+from app.utils.pdf_cache import cache_key
+from app.utils.preview import html_preview_layout, page_rasterizer, PDF_PREVIEW_DPI
+from benchmarks.render_latency import large_resume, summarize
+
+
+def edits(runs: int):
+    """Resume versions that each differ from the previous one by a single bullet"""
+    resume = large_resume(60)
+    for i in range(runs):
+        resume = copy.deepcopy(resume)
+        resume['experience_entries'][0]['responsibilities'][0] = f"Typing the first bullet, keystroke {i}"
+        yield resume
+
+
+def html_timings(runs: int) -> list:
+    fragments = FragmentCache()
+    timings = []
+    for resume in edits(runs):
+        started_at = time.perf_counter()
+        fragments.render(html_preview_layout, resume)
+        timings.append((time.perf_counter() - started_at) * 1_000_000)
+    return timings
+
+
+async def png_timings(runs: int) -> list:
+    generator = ResumeGenerator(output_dir=tempfile.mkdtemp())
+    fragments = FragmentCache()
+    timings = []
+    for resume in edits(runs):
+        started_at = time.perf_counter()
+        latex_content = generator.render_document(resume, fragments).latex_content
+        pdf_bytes = await generator.compile_pdf(latex_content)
+        await page_rasterizer.rasterize(cache_key(latex_content), pdf_bytes, PDF_PREVIEW_DPI)
+        timings.append((time.perf_counter() - started_at) * 1_000_000)
+    return timings
+
+
+def main(runs: int, png_runs: int) -> dict:
+    results = {"html": summarize(html_timings(runs))}
+    if page_rasterizer.available():
+        results["png"] = summarize(asyncio.run(png_timings(png_runs)))
+    else:
+        results["png"] = f"skipped, {page_rasterizer.command} is not installed"
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200, help="HTML previews to render")
+    parser.add_argument("--png-runs", type=int, default=20, help="PNG previews to render")
+    args = parser.parse_args()
+    print(json.dumps(main(args.runs, args.png_runs), indent=2))
@@ -0,0 +1,155 @@
+"""
+LaTeX rendering time for large resumes, template engine vs the old string concatenation.
+
+No TeX installation is needed. Run from the pdf-service directory:
+
+    python -m benchmarks.render_latency --bullets 60 --runs 2000
+"""
+import argparse
+import copy
+import json
+import statistics
+import tempfile
+import time
+from app.utils.pdf_generator import ResumeGenerator
+from app.utils.resume_template import LATEX_PREAMBLE, DOCUMENT_PREAMBLE, DOCUMENT_END
+from benchmarks.format_latency import SAMPLE_RESUME
+
+
+def large_resume(bullets: int) -> dict:
+    """SAMPLE_RESUME grown to roughly ``bullets`` experience and project bullets"""
+    resume = copy.deepcopy(SAMPLE_RESUME)
+    jobs = max(1, bullets // 8)
+    resume['experience_entries'] = [
+        {'title': f"Senior Engineer #{job}", 'dates': "Jan. 2020 -- Present",
+         'organization': f"Company_{job} & Partners", 'location': "New York, NY",
+         'responsibilities': [
+             f"Reduced p99 latency of service_{job} by {i * 3}% using caching & batching ({{hot}} paths)"
+             for i in range(6)
+         ]}
+        for job in range(jobs)
+    ]
+    resume['project_entries'] = [
+        {'name': f"project-{p}", 'technologies': "Python, Rust, C++", 'date_range': "2023",
+         'details': [f"Handled 10^{i} events/s at ~$0.{i} per million" for i in range(2)]}
+        for p in range(max(1, (bullets - jobs * 6) // 2))
+    ]
+    return resume
+
+
+def legacy_create_latex_content(generator: ResumeGenerator, full_name, email, linkedin_url, github_url,
+                                education_entries, experience_entries, project_entries,
+                                skill_categories, phone_number=None, website_url=None) -> str:
+    """The pre-template-engine renderer, kept as the baseline (and reference output)"""
+    escape = generator._escape_latex
+    full_name = escape(full_name)
+    email = escape(email)
+    linkedin_url = escape(linkedin_url) if linkedin_url else ''
+    github_url = escape(github_url) if github_url else ''
+    website_url = escape(website_url) if website_url else ''
+    latex_content = LATEX_PREAMBLE + DOCUMENT_PREAMBLE
+    website_part = f" $|$ \\href{{https://{website_url}}}{{\\underline{{{website_url}}}}}" if website_url else ""
+    latex_content += f"""
+%----------HEADING----------
+\\begin{{center}}
+    \\textbf{{\\Huge \\scshape {full_name}}} \\\\
+    \\vspace{{2pt}}
+    \\href{{mailto:{email}}}{{\\underline{{{email}}}}} $|$ 
+    \\href{{https://{linkedin_url}}}{{\\underline{{{linkedin_url}}}}} $|$
+    \\href{{https://{github_url}}}{{\\underline{{{github_url}}}}}{website_part}
+\\end{{center}}
+
+"""
+    latex_content += "\n%-----------EDUCATION-----------\n\\section{Education}\n  \\begin{resumeSubHeadingListStart}\n"
+    for edu in education_entries:
+        latex_content += fr"""    \resumeSubheading
+      {{{escape(edu['institution'])}}}{{{escape(edu['location'])}}}
+      {{{escape(edu['degree'])}}}{{{escape(edu['date_range'])}}}
+"""
+    latex_content += "  \\end{resumeSubHeadingListStart}\n\n"
+    latex_content += "\n%-----------EXPERIENCE-----------\n\\section{Experience}\n  \\begin{resumeSubHeadingListStart}\n"
+    for exp in experience_entries:
+        latex_content += fr"""
+    \resumeSubheading
+      {{{escape(exp['title'])}}}{{{escape(exp['dates'])}}}
+      {{{escape(exp['organization'])}}}{{{escape(exp['location'])}}}
+      \begin{{resumeItemListStart}}
+"""
+        for resp in exp['responsibilities']:
+            latex_content += fr"""        \resumeItem{{{escape(resp)}}}
+"""
+        latex_content += "      \\end{resumeItemListStart}\n"
+    latex_content += "\n  \\end{resumeSubHeadingListStart}\n\n"
+    latex_content += "\n%-----------PROJECTS-----------\n\\section{Projects}\n    \\begin{resumeSubHeadingListStart}\n"
+    for proj in project_entries:
+        latex_content += fr"""      \resumeProjectHeading
+          {{\textbf{{{escape(proj['name'])}}} $|$ \emph{{{escape(proj['technologies'])}}}}}{{{"" if 'date_range' not in proj else escape(proj['date_range'])}}}
+          \begin{{resumeItemListStart}}
+"""
+        for detail in proj['details']:
+            latex_content += fr"""            \resumeItem{{{escape(detail)}}}
+"""
+        latex_content += "          \\end{resumeItemListStart}\n"
+    latex_content += "    \\end{resumeSubHeadingListStart}\n\n"
+    if skill_categories:
+        latex_content += "\n%-----------TECHNICAL SKILLS-----------\n\\section{Technical Skills}\n \\begin{itemize}[leftmargin=0.15in, label={}, nosep]\n"
+        for category in skill_categories:
+            if category['skills']:
+                skills_str = ', '.join(escape(skill) for skill in category['skills'])
+                latex_content += fr"""    \small{{\item{{
+     \textbf{{{escape(category['category_name'])}}}{{: {skills_str}}}
+    }}}}
+"""
+        latex_content += " \\end{itemize}\n\n"
+    latex_content += DOCUMENT_END
+    return latex_content
+
+
+def time_renders(render, resume: dict, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        render(**resume)
+        timings.append((time.perf_counter() - started_at) * 1_000_000)
+    return timings
+
+
+def summarize(timings: list) -> dict:
+    ordered = sorted(timings)
+    return {
+        "runs": len(timings),
+        "mean_us": round(statistics.mean(timings), 2),
+        "median_us": round(statistics.median(timings), 2),
+        "p95_us": round(ordered[int(0.95 * (len(ordered) - 1))], 2),
+    }
+
+
+def main(bullets: int, runs: int) -> dict:
+    generator = ResumeGenerator(output_dir=tempfile.mkdtemp())
+    resume = large_resume(bullets)
+    count = (sum(len(e['responsibilities']) for e in resume['experience_entries'])
+             + sum(len(p['details']) for p in resume['project_entries']))
+
+    def legacy(**fields):
+        return legacy_create_latex_content(generator, **fields)
+
+    if legacy(**resume) != generator._create_latex_content(**resume):
+        raise SystemExit("Template engine output differs from the legacy renderer")
+
+    before = summarize(time_renders(legacy, resume, runs))
+    after = summarize(time_renders(generator._create_latex_content, resume, runs))
+    return {
+        "bullets": count,
+        "latex_bytes": len(generator._create_latex_content(**resume)),
+        "legacy": before,
+        "template_engine": after,
+        "speedup": round(before["median_us"] / after["median_us"], 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bullets", type=int, default=60, help="approximate number of bullets")
+    parser.add_argument("--runs", type=int, default=2000, help="renders per variant")
+    args = parser.parse_args()
+    print(json.dumps(main(args.bullets, args.runs), indent=2))
@@ -0,0 +1,143 @@
+"""
+Startup time of the service: importing the app, serving, and being warm.
+
+Imports app.main in fresh interpreters and reports how long that takes and
+which heavy optional packages it pulled in (none should be: storage SDKs and
+the server are imported when first used). Then starts a one-worker server
+(app.serve) repeatedly, with and without warm-up, and measures the time to
+the first response, to readiness (/readyz) and the latency of the first and
+second generation request after readiness. Run from the pdf-service
+directory:
+
+    python -m benchmarks.startup --imports 10 --starts 3 --engine direct
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+import httpx
+from benchmarks.load_test import GENERATE_PATH
+from benchmarks.payloads import payload
+from benchmarks.timing import summarize
+from benchmarks.worker_scaling import free_port, stop_server
+
+# Packages the app should not import until they are used
+HEAVY_MODULES = ("boto3", "botocore", "cloudinary", "uvicorn", "fitz", "PIL")
+
+_IMPORT_SCRIPT = f"""
+import json, sys, time
+started_at = time.perf_counter()
+import app.main
+print(json.dumps({{"ms": (time.perf_counter() - started_at) * 1000,
+                   "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules]}}))
+"""
+
+
+def measure_imports(runs: int) -> Dict[str, Any]:
+    """Time ``import app.main`` in ``runs`` fresh interpreters"""
+    timings: List[float] = []
+    heavy: List[str] = []
+    env = dict(os.environ, MAIN_SERVICE_ORIGIN_URL="http://localhost")
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _IMPORT_SCRIPT], env=env, capture_output=True,
+                                text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        heavy = result["heavy"]
+    return {**summarize(timings), "heavy_modules": heavy}
+
+
+def _elapsed_ms(started_at: float) -> float:
+    return round((time.perf_counter() - started_at) * 1000, 1)
+
+
+def measure_start(engine: str, warmup: bool, seed: int, timeout: float = 120) -> Dict[str, Optional[float]]:
+    """Start a one-worker server and time its first response, readiness and first requests"""
+    work_dir = tempfile.mkdtemp(prefix="pdf-startup-")
+    port = free_port()
+    env = dict(os.environ,
+               MAIN_SERVICE_ORIGIN_URL="http://localhost",
+               PDF_HOST="127.0.0.1",
+               PDF_PORT=str(port),
+               PDF_WEB_WORKERS="1",
+               PDF_ENGINE=engine,
+               PDF_WARMUP_ENABLED=str(warmup).lower(),
+               PDF_STORAGE_BACKEND="memory",
+               PDF_LIFECYCLE_ENABLED="false",
+               PDF_RATE_LIMIT_PER_MINUTE="0",
+               PDF_CALLER_MAX_CONCURRENT="0",
+               PDF_JOB_STORE="sqlite",
+               PDF_LOG_LEVEL="WARNING",
+               PDF_CACHE_DIR=os.path.join(work_dir, "pdf_cache"),
+               LATEX_FORMAT_DIR=os.path.join(work_dir, "latex_formats"),
+               PDF_JOB_DB_PATH=os.path.join(work_dir, "pdf_jobs.sqlite3"))
+    url = f"http://127.0.0.1:{port}"
+    result: Dict[str, Optional[float]] = {"first_response_ms": None, "ready_ms": None,
+                                          "first_request_ms": None, "second_request_ms": None}
+    started_at = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "app.serve"], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(base_url=url, timeout=timeout) as client:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline and process.poll() is None:
+                try:
+                    status_code = client.get("/readyz", timeout=1).status_code
+                except httpx.HTTPError:
+                    time.sleep(0.02)
+                    continue
+                if result["first_response_ms"] is None:
+                    result["first_response_ms"] = _elapsed_ms(started_at)
+                if status_code == 200:
+                    result["ready_ms"] = _elapsed_ms(started_at)
+                    break
+                time.sleep(0.02)
+            if result["ready_ms"] is None:
+                raise SystemExit(f"Server did not become ready (exit status {process.poll()})")
+
+            for key, body_seed in (("first_request_ms", seed), ("second_request_ms", seed + 1)):
+                request_started_at = time.perf_counter()
+                response = client.post(GENERATE_PATH, json=dict(payload("typical", body_seed), engine=engine))
+                response.raise_for_status()
+                result[key] = _elapsed_ms(request_started_at)
+    finally:
+        stop_server(process)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+
+def measure_starts(engine: str, starts: int) -> Dict[str, Any]:
+    """Server start timings with and without warm-up, summarized per measurement"""
+    results: Dict[str, Any] = {}
+    for warmup in (True, False):
+        runs = [measure_start(engine, warmup, seed=1000 * run) for run in range(starts)]
+        results["warmup" if warmup else "no_warmup"] = {
+            key: summarize([run[key] for run in runs]) for key in runs[0]
+        }
+    return results
+
+
+def main(imports: int, starts: int, engine: str) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "config": {"imports": imports, "starts": starts, "engine": engine, "cpus": os.cpu_count()},
+        "import": measure_imports(imports),
+    }
+    if engine == "latex" and shutil.which("pdflatex") is None:
+        results["server"] = "skipped, pdflatex is not installed"
+    elif starts:
+        results["server"] = measure_starts(engine, starts)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--imports", type=int, default=5, help="fresh interpreters importing the app")
+    parser.add_argument("--starts", type=int, default=3, help="server starts per warm-up setting, 0 to skip")
+    parser.add_argument("--engine", choices=("latex", "direct"), default="direct")
+    args = parser.parse_args()
+    print(json.dumps(main(args.imports, args.starts, args.engine), indent=2))
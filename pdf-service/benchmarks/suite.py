@@ -0,0 +1,82 @@
+"""
+Run the benchmark suite and write the results as JSON, to compare between releases.
+
+Runs the payload description, the microbenchmarks, the startup benchmark
+and the load test (one run per engine available here, with unique and with
+cached documents) and records the commit, Python and machine they ran on.
+Compare two result files with benchmarks.compare. Run from the pdf-service
+directory:
+
+    python -m benchmarks.suite --output results/$(git rev-parse --short HEAD).json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict
+from benchmarks import load_test, micro, payloads, startup
+from app.utils.resume_template import TEMPLATE_VERSION
+from app.utils.direct_pdf import DIRECT_TEMPLATE_VERSION
+from app.utils.compile_pool import compile_pool
+
+# Service settings that change the numbers, recorded with the results
+SETTINGS = ("PDF_ENGINE", "PDF_COMPILE_WORKERS", "PDF_COMPILE_QUEUE_SIZE", "WARM_TEX_WORKERS",
+            "LATEX_FORMAT_ENABLED", "PDF_COMPILE_TEMP_DIR", "PDF_WARMUP_ENABLED")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "compile_workers": compile_pool.workers,
+        "template_version": TEMPLATE_VERSION,
+        "direct_template_version": DIRECT_TEMPLATE_VERSION,
+        "settings": {name: os.environ[name] for name in SETTINGS if name in os.environ},
+    }
+
+
+def main(quick: bool) -> Dict[str, Any]:
+    runs, compile_runs, requests = (200, 3, 20) if quick else (2000, 10, 100)
+    imports, starts = (3, 1) if quick else (10, 3)
+    concurrency = [1, 4] if quick else [1, 2, 4, 8, 16]
+    engines = ["direct"] + (["latex"] if shutil.which("pdflatex") else [])
+
+    results: Dict[str, Any] = {
+        "environment": environment(),
+        "payloads": payloads.main(""),
+        "micro": micro.main(runs, compile_runs),
+        "startup": startup.main(imports, starts, "direct"),
+        "load": {},
+    }
+    for engine in engines:
+        for mode in ("unique", "cached"):
+            run = load_test.main(concurrency, requests, "typical", mode, engine, "")
+            results["load"][f"{engine}_{mode}"] = run["levels"]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", default="benchmark-results.json", help="file to write the results to")
+    parser.add_argument("--quick", action="store_true", help="fewer runs, for a smoke test")
+    args = parser.parse_args()
+    results = main(args.quick)
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Results written to {args.output}")
@@ -0,0 +1,21 @@
+"""Latency summaries shared by the benchmark scripts"""
+import statistics
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def summarize(timings_ms: List[float]) -> Dict[str, float]:
+    """Count, mean and p50/p95/p99/max of latencies in milliseconds"""
+    values = sorted(timings_ms)
+    return {
+        "runs": len(values),
+        "mean_ms": round(statistics.mean(values), 3),
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p95_ms": round(percentile(values, 0.95), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "max_ms": round(values[-1], 3),
+    }
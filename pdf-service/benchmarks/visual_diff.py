@@ -0,0 +1,175 @@
+"""
+Visual and text-layer diff of the direct PDF engine against the LaTeX output.
+
+Renders sample resumes with both engines, rasterizes every page with poppler's
+pdftoppm and compares page counts, extracted text (pdftotext) and ink layout.
+Exits non-zero when a resume differs by more than the thresholds. Run from the
+pdf-service directory (needs pdflatex, pdftoppm and pdftotext):
+
+    python -m benchmarks.visual_diff --out visual_diff
+"""
+import argparse
+import asyncio
+import copy
+import difflib
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+from app.utils.pdf_generator import ResumeGenerator
+from benchmarks.format_latency import SAMPLE_RESUME
+from benchmarks.render_latency import large_resume
+
+# Pixels darker than this count as ink
+INK = 128
+# Side in pixels of the blocks compared for layout; absorbs the different fonts
+BLOCK = 8
+
+
+def sample_resumes() -> Dict[str, dict]:
+    international = copy.deepcopy(SAMPLE_RESUME)
+    international['full_name'] = "Zoë Núñez-Łukasiewicz"
+    international['experience_entries'][0]['responsibilities'][0] = (
+        "Migrated the “payments” platform — 3× faster, p99 ≤ 40 ms… at José’s team in Zürich")
+    return {"sample": SAMPLE_RESUME, "large": large_resume(60), "international": international}
+
+
+def read_pgm(path: str) -> Tuple[int, int, bytes]:
+    """Width, height and pixels of a binary (P5) graymap"""
+    with open(path, "rb") as pgm:
+        data = pgm.read()
+    fields, offset = [], 0
+    while len(fields) < 4:
+        while data[offset:offset + 1].isspace():
+            offset += 1
+        if data[offset:offset + 1] == b"#":
+            offset = data.index(b"\n", offset)
+            continue
+        end = offset
+        while not data[end:end + 1].isspace():
+            end += 1
+        fields.append(data[offset:end])
+        offset = end
+    if fields[0] != b"P5":
+        raise ValueError(f"{path} is not a binary PGM")
+    width, height = int(fields[1]), int(fields[2])
+    return width, height, data[offset + 1:offset + 1 + width * height]
+
+
+def write_ppm(path: str, width: int, height: int, pixels: bytes) -> None:
+    with open(path, "wb") as ppm:
+        ppm.write(b"P6\n%d %d\n255\n" % (width, height) + pixels)
+
+
+def rasterize(pdf_path: str, dpi: int) -> List[Tuple[int, int, bytes]]:
+    root = pdf_path[:-4]
+    subprocess.run(["pdftoppm", "-gray", "-r", str(dpi), pdf_path, root], check=True)
+    return [read_pgm(path) for path in sorted(glob.glob(f"{root}-*.pgm"))]
+
+
+def extract_words(pdf_path: str) -> List[str]:
+    result = subprocess.run(["pdftotext", "-enc", "UTF-8", pdf_path, "-"], check=True, capture_output=True)
+    return result.stdout.decode("utf-8").split()
+
+
+def compare_page(reference: Tuple[int, int, bytes], candidate: Tuple[int, int, bytes]) -> Tuple[Dict, bytes]:
+    """Pixel and block-level ink differences, and a diff image (red: LaTeX only, blue: direct only)"""
+    width, height = min(reference[0], candidate[0]), min(reference[1], candidate[1])
+    ref, cand = reference[2], candidate[2]
+    differing = inked = 0
+    image = bytearray(b"\xff" * (width * height * 3))
+    blocks_x, blocks_y = (width + BLOCK - 1) // BLOCK, (height + BLOCK - 1) // BLOCK
+    ref_blocks = bytearray(blocks_x * blocks_y)
+    cand_blocks = bytearray(blocks_x * blocks_y)
+    for y in range(height):
+        for x in range(width):
+            a = ref[y * reference[0] + x] < INK
+            b = cand[y * candidate[0] + x] < INK
+            if a or b:
+                inked += 1
+                block = (y // BLOCK) * blocks_x + x // BLOCK
+                if a:
+                    ref_blocks[block] = 1
+                if b:
+                    cand_blocks[block] = 1
+                i = (y * width + x) * 3
+                if a and b:
+                    image[i:i + 3] = b"\x00\x00\x00"
+                else:
+                    differing += 1
+                    image[i:i + 3] = b"\xd0\x20\x20" if a else b"\x20\x40\xd0"
+    used_blocks = sum(1 for a, b in zip(ref_blocks, cand_blocks) if a or b)
+    layout_diff = sum(1 for a, b in zip(ref_blocks, cand_blocks) if a != b)
+    return {
+        "pixel_diff": round(differing / inked, 4) if inked else 0.0,
+        "layout_diff": round(layout_diff / used_blocks, 4) if used_blocks else 0.0,
+    }, bytes(image)
+
+
+async def compile_both(resume: dict, engines: List[str], work_dir: str, name: str) -> List[str]:
+    paths = []
+    for engine in engines:
+        generator = ResumeGenerator(output_dir=work_dir, engine=engine)
+        pdf_bytes = await generator.compile_pdf(generator.render_latex(**copy.deepcopy(resume)))
+        path = os.path.join(work_dir, f"{name}-{engine}-{len(paths)}.pdf")
+        with open(path, "wb") as pdf_file:
+            pdf_file.write(pdf_bytes)
+        paths.append(path)
+    return paths
+
+
+def main(out_dir: str, dpi: int, engines: List[str], max_layout_diff: float, min_text_similarity: float) -> dict:
+    missing = [tool for tool in ("pdftoppm", "pdftotext") if shutil.which(tool) is None]
+    if "latex" in engines and shutil.which("pdflatex") is None:
+        missing.append("pdflatex")
+    if missing:
+        raise SystemExit(f"Missing tools: {', '.join(missing)}")
+
+    work_dir = tempfile.mkdtemp()
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    results, failed = {}, False
+    for name, resume in sample_resumes().items():
+        reference_pdf, candidate_pdf = asyncio.run(compile_both(resume, engines, work_dir, name))
+        reference_pages, candidate_pages = rasterize(reference_pdf, dpi), rasterize(candidate_pdf, dpi)
+        pages = []
+        for number, (reference, candidate) in enumerate(zip(reference_pages, candidate_pages), start=1):
+            page, image = compare_page(reference, candidate)
+            pages.append(page)
+            if out_dir:
+                write_ppm(os.path.join(out_dir, f"{name}-page{number}.ppm"),
+                          min(reference[0], candidate[0]), min(reference[1], candidate[1]), image)
+        text_similarity = difflib.SequenceMatcher(
+            None, extract_words(reference_pdf), extract_words(candidate_pdf), autojunk=False).ratio()
+        result = {
+            "pages": [len(reference_pages), len(candidate_pages)],
+            "text_similarity": round(text_similarity, 4),
+            "page_diffs": pages,
+        }
+        result["ok"] = (len(reference_pages) == len(candidate_pages)
+                        and text_similarity >= min_text_similarity
+                        and all(page["layout_diff"] <= max_layout_diff for page in pages))
+        failed = failed or not result["ok"]
+        results[name] = result
+    shutil.rmtree(work_dir, ignore_errors=True)
+    if failed:
+        print(json.dumps(results, indent=2))
+        sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default="", help="directory for diff images, one PPM per page")
+    parser.add_argument("--dpi", type=int, default=50, help="rasterization resolution")
+    parser.add_argument("--engines", nargs=2, default=["latex", "direct"], help="reference and candidate engine")
+    parser.add_argument("--max-layout-diff", type=float, default=0.35,
+                        help="largest tolerated share of ink blocks present in only one rendering")
+    parser.add_argument("--min-text-similarity", type=float, default=0.9,
+                        help="smallest tolerated similarity of the extracted words")
+    args = parser.parse_args()
+    print(json.dumps(main(args.out, args.dpi, args.engines, args.max_layout_diff, args.min_text_similarity), indent=2))
@@ -0,0 +1,120 @@
+"""
+Throughput of the multi-process server (app.serve) by number of worker processes.
+
+For each worker count the server is started on a free port with its own
+cache, format and database directories, loaded with unique documents at a
+concurrency of --clients-per-worker clients per worker, and stopped with
+SIGTERM. Efficiency is throughput relative to one worker times the worker
+count; 1.0 is linear scaling. Run from the pdf-service directory:
+
+    python -m benchmarks.worker_scaling --workers 1 2 4 8 16 --engine direct
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+import httpx
+from benchmarks.load_test import load_test
+from benchmarks.payloads import SIZES
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, engine: str, work_dir: str) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = dict(os.environ,
+               MAIN_SERVICE_ORIGIN_URL="http://localhost",
+               PDF_HOST="127.0.0.1",
+               PDF_PORT=str(port),
+               PDF_WEB_WORKERS=str(workers),
+               PDF_ENGINE=engine,
+               PDF_STORAGE_BACKEND="memory",
+               PDF_LIFECYCLE_ENABLED="false",
+               PDF_RATE_LIMIT_PER_MINUTE="0",
+               PDF_CALLER_MAX_CONCURRENT="0",
+               PDF_JOB_STORE="sqlite",
+               PDF_LOG_LEVEL="WARNING",
+               PDF_CACHE_DIR=os.path.join(work_dir, "pdf_cache"),
+               LATEX_FORMAT_DIR=os.path.join(work_dir, "latex_formats"),
+               PDF_JOB_DB_PATH=os.path.join(work_dir, "pdf_jobs.sqlite3"))
+    process = subprocess.Popen([sys.executable, "-m", "app.serve"], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server with {workers} workers exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{url}/readyz", timeout=1).status_code == 200:
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f"Server with {workers} workers did not start")
+
+
+def stop_server(process: subprocess.Popen) -> float:
+    """Stop the server gracefully and return how long it took"""
+    started_at = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    return time.perf_counter() - started_at
+
+
+def main(workers: List[int], clients_per_worker: int, requests_per_worker: int, size: str,
+         engine: str) -> Dict[str, Any]:
+    if engine == "latex" and shutil.which("pdflatex") is None:
+        raise SystemExit("pdflatex is not installed, use --engine direct")
+
+    results = []
+    for count in workers:
+        work_dir = tempfile.mkdtemp(prefix="pdf-worker-scaling-")
+        process, url = start_server(count, engine, work_dir)
+        try:
+            # Warm every worker before measuring
+            asyncio.run(load_test([count * clients_per_worker], count * clients_per_worker, size, "unique",
+                                  engine, url))
+            level, = asyncio.run(load_test([count * clients_per_worker], count * requests_per_worker, size,
+                                           "unique", engine, url))
+        finally:
+            shutdown_seconds = stop_server(process)
+            shutil.rmtree(work_dir, ignore_errors=True)
+        results.append({"workers": count, **level, "shutdown_seconds": round(shutdown_seconds, 2)})
+
+    base = results[0]["throughput_rps"] / results[0]["workers"]
+    for result in results:
+        result["efficiency"] = round(result["throughput_rps"] / (base * result["workers"]), 2) if base else None
+    return {
+        "config": {"size": size, "engine": engine, "clients_per_worker": clients_per_worker,
+                   "requests_per_worker": requests_per_worker, "cpus": os.cpu_count()},
+        "levels": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts, one run each")
+    parser.add_argument("--clients-per-worker", type=int, default=4, help="concurrent clients per worker")
+    parser.add_argument("--requests-per-worker", type=int, default=50, help="requests per worker and run")
+    parser.add_argument("--size", choices=SIZES, default="typical", help="payload size")
+    parser.add_argument("--engine", choices=("latex", "direct"), default="direct")
+    args = parser.parse_args()
+    print(json.dumps(main(args.workers, args.clients_per_worker, args.requests_per_worker, args.size,
+                          args.engine), indent=2))
@@ -2,13 +2,17 @@ module.exports = {
     apps: [
       {
         name: "pdf-service",
-        script: "uvicorn",
-        args: "app.main:app --host 0.0.0.0 --port 8501",
+        // One uvicorn worker per core (PDF_WEB_WORKERS), see app/serve.py
+        script: "app/serve.py",
         interpreter: "venv/bin/python",
         watch: false,
+        // Longer than PDF_SHUTDOWN_TIMEOUT so in-flight compiles can drain before pm2 kills the process
+        kill_timeout: 40000,
         env: {
-          PYTHONUNBUFFERED: "1"
+          PYTHONUNBUFFERED: "1",
+          PDF_PORT: "8501",
+          PDF_WEB_WORKERS: "auto"
         }
       }
     ]
-  };
\ No newline at end of file
+  };
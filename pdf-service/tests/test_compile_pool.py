@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from app.utils.admission import BULK, INTERACTIVE, admission_context
+from app.utils.compile_pool import CompilePool, CompileQueueFull
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def compile_as(pool: CompilePool, caller: str, priority: str, order: list, name: str,
+                     hold: asyncio.Event = None) -> None:
+    with admission_context(caller, priority):
+        async with pool.slot():
+            order.append(name)
+            if hold is not None:
+                await hold.wait()
+
+
+async def run_queued(pool: CompilePool, queued: list, blocker_priority: str = INTERACTIVE) -> list:
+    """Fill every slot, queue ``(caller, priority, name)`` in order, then free the slots; the order slots went in"""
+    order, hold = [], asyncio.Event()
+    blockers = [asyncio.ensure_future(compile_as(pool, f"blocker{i}", blocker_priority, [], "blocker", hold))
+                for i in range(pool.workers)]
+    await settle()
+    tasks = []
+    for caller, priority, name in queued:
+        tasks.append(asyncio.ensure_future(compile_as(pool, caller, priority, order, name)))
+        await settle()
+    hold.set()
+    await asyncio.gather(*blockers, *tasks)
+    return order
+
+
+def test_interactive_before_bulk():
+    pool = CompilePool(workers=1, queue_size=10, bulk_every=0)
+    order = asyncio.run(run_queued(pool, [
+        ("jobs", BULK, "b1"), ("jobs", BULK, "b2"),
+        ("user", INTERACTIVE, "i1"), ("user", INTERACTIVE, "i2"),
+    ]))
+    assert order == ["i1", "i2", "b1", "b2"]
+
+
+def test_bulk_gets_every_nth_slot():
+    pool = CompilePool(workers=1, queue_size=10, bulk_every=3)
+    order = asyncio.run(run_queued(pool, [
+        ("jobs", BULK, "b1"), ("jobs", BULK, "b2"),
+    ] + [("user", INTERACTIVE, f"i{n}") for n in range(1, 6)]))
+    assert order == ["i1", "i2", "b1", "i3", "i4", "b2", "i5"]
+
+
+def test_callers_take_turns_within_a_class():
+    pool = CompilePool(workers=1, queue_size=10)
+    order = asyncio.run(run_queued(pool, [
+        ("a", INTERACTIVE, "a1"), ("a", INTERACTIVE, "a2"), ("a", INTERACTIVE, "a3"),
+        ("b", INTERACTIVE, "b1"), ("b", INTERACTIVE, "b2"),
+        ("c", INTERACTIVE, "c1"),
+    ]))
+    assert order == ["a1", "b1", "c1", "a2", "b2", "a3"]
+
+
+def test_bulk_callers_take_turns():
+    pool = CompilePool(workers=1, queue_size=10)
+    order = asyncio.run(run_queued(pool, [
+        ("tenant1", BULK, "t1-1"), ("tenant1", BULK, "t1-2"), ("tenant1", BULK, "t1-3"),
+        ("tenant2", BULK, "t2-1"),
+    ]))
+    assert order == ["t1-1", "t2-1", "t1-2", "t1-3"]
+
+
+def test_reserved_slots_are_kept_for_interactive_work():
+    async def scenario():
+        pool = CompilePool(workers=2, queue_size=10, interactive_reserved=1)
+        order, hold = [], asyncio.Event()
+        first = asyncio.ensure_future(compile_as(pool, "jobs", BULK, order, "b1", hold))
+        second = asyncio.ensure_future(compile_as(pool, "jobs", BULK, order, "b2", hold))
+        await settle()
+        # One slot is free, but only interactive work may take it
+        assert order == ["b1"]
+        assert pool.free_slots == 1
+        interactive = asyncio.ensure_future(compile_as(pool, "user", INTERACTIVE, order, "i1", hold))
+        await settle()
+        assert order == ["b1", "i1"]
+        hold.set()
+        await asyncio.gather(first, second, interactive)
+        assert order == ["b1", "i1", "b2"]
+        assert pool.free_slots == 2
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_rejected():
+    async def scenario():
+        pool = CompilePool(workers=1, queue_size=1)
+        order, hold = [], asyncio.Event()
+        running = asyncio.ensure_future(compile_as(pool, "a", INTERACTIVE, order, "running", hold))
+        queued = asyncio.ensure_future(compile_as(pool, "b", INTERACTIVE, order, "queued"))
+        await settle()
+        with pytest.raises(CompileQueueFull):
+            await compile_as(pool, "c", INTERACTIVE, order, "rejected")
+        assert pool.rejected == 1
+        hold.set()
+        await asyncio.gather(running, queued)
+        assert order == ["running", "queued"]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_lose_the_slot():
+    async def scenario():
+        pool = CompilePool(workers=1, queue_size=10)
+        order, hold = [], asyncio.Event()
+        running = asyncio.ensure_future(compile_as(pool, "a", INTERACTIVE, order, "running", hold))
+        await settle()
+        cancelled = asyncio.ensure_future(compile_as(pool, "b", INTERACTIVE, order, "cancelled"))
+        waiting = asyncio.ensure_future(compile_as(pool, "c", INTERACTIVE, order, "waiting"))
+        await settle()
+        cancelled.cancel()
+        await settle()
+        hold.set()
+        await asyncio.gather(running, waiting)
+        assert order == ["running", "waiting"]
+        assert pool.free_slots == 1 and pool.waiting == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,117 @@
+import random
+import unicodedata
+import pytest
+from app.utils.latex_escape import escape_latex, escape_many
+
+# The escaper ResumeGenerator used before the table-driven one: the reference for ASCII input
+LEGACY_SPECIAL_CHARS = {
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\^{}',
+    '\\': r'\textbackslash{}',
+    '<': r'\textless{}',
+    '>': r'\textgreater{}',
+}
+
+
+def legacy_escape_latex(text: str) -> str:
+    return ''.join(LEGACY_SPECIAL_CHARS.get(c, c) for c in text)
+
+
+ACCENTED = {
+    "José Núñez": r"Jos\'{e} N\'{u}\~{n}ez",
+    "Łukasz Żółć": r"\L{}ukasz \.{Z}\'{o}\l{}\'{c}",
+    "Nguyễn Thị": r"Nguy\~{\^{e}}n Th\d{\i}",
+    "naïve façade": r"na\"{\i}ve fa\c{c}ade",
+    "Ångström Straße": r"\r{A}ngstr\"{o}m Stra\ss{}e",
+    "Zoë Brontë": r"Zo\"{e} Bront\"{e}",
+}
+
+
+def test_ascii_matches_legacy_escaper():
+    rnd = random.Random(0)
+    alphabet = "abc XYZ 019.,;:!?'\"()[]-+=/|@*\n\t" + "".join(LEGACY_SPECIAL_CHARS)
+    for _ in range(5000):
+        text = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 40)))
+        assert escape_latex(text) == legacy_escape_latex(text), text
+
+
+def test_plain_ascii_is_unchanged():
+    text = "Built a service handling 10k requests per second (p99 12 ms)."
+    assert escape_latex(text) is text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("R&D", r"R\&D"),
+    ("99.9% uptime", r"99.9\% uptime"),
+    ("$1M budget", r"\$1M budget"),
+    ("C# and F#", r"C\# and F\#"),
+    ("snake_case", r"snake\_case"),
+    ("{braces}", r"\{braces\}"),
+    ("~/bin", r"\textasciitilde{}/bin"),
+    ("2^10", r"2\^{}10"),
+    ("C:\\Users", r"C:\textbackslash{}Users"),
+    ("a < b > c", r"a \textless{} b \textgreater{} c"),
+    ("\\{}", r"\textbackslash{}\{\}"),
+    ("bell\x07char", "bellchar"),
+])
+def test_special_characters(text, expected):
+    assert escape_latex(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("it’s “great” — really…", r"it's ``great'' --- really\ldots{}"),
+    ("2019 – 2021", "2019 -- 2021"),
+    ("10\u00a0ms", "10~ms"),
+    ("zero\u200bwidth", "zerowidth"),
+    ("latency → 40 ms, ≥ 99.9% uptime", r"latency $\rightarrow$ 40 ms, $\geq$ 99.9\% uptime"),
+    ("© 2024 Acme™", r"\copyright{} 2024 Acme\texttrademark{}"),
+    ("ﬁne ＆ dandy", r"fine \& dandy"),
+    ("🚀 Shipped v2", " Shipped v2"),
+])
+def test_unicode_symbols(text, expected):
+    assert escape_latex(text) == expected
+
+
+@pytest.mark.parametrize("form", ["NFC", "NFD"])
+@pytest.mark.parametrize("text, expected", ACCENTED.items())
+def test_accented_letters(form, text, expected):
+    assert escape_latex(unicodedata.normalize(form, text)) == expected
+
+
+def test_combining_marks_without_precomposed_letter():
+    assert escape_latex("q\u0301") == r"\'{q}"
+    # A mark with no accent command is dropped, the letter is kept
+    assert escape_latex("x\u20dd") == "x"
+
+
+@pytest.mark.parametrize("text", [
+    "Иван Петров",
+    "Ελληνικά",
+    "李小龙",
+    "שלום",
+    "تجربة",
+])
+def test_non_latin_scripts_pass_through(text):
+    assert escape_latex(text) == text
+
+
+def test_non_latin_with_specials():
+    assert escape_latex("Иван & Петров_1") == r"Иван \& Петров\_1"
+
+
+@pytest.mark.parametrize("texts", [
+    [],
+    ["one"],
+    ["a & b", "c_d", "plain"],
+    ["line\nbreak", "x%"],
+    list(ACCENTED) + [unicodedata.normalize("NFD", text) for text in ACCENTED],
+])
+def test_escape_many_matches_escape_latex(texts):
+    assert escape_many(texts) == [escape_latex(text) for text in texts]
@@ -0,0 +1,20 @@
+import pytest
+from pydantic import ValidationError
+from app.schema.pdf_schema import ResumeJobRequest
+
+RESUME = {"full_name": "Ada Lovelace", "email": "ada@example.com"}
+
+
+def test_job_priority_defaults_to_5():
+    assert ResumeJobRequest(resume=RESUME).priority == 5
+
+
+@pytest.mark.parametrize("priority", [0, 9])
+def test_job_priority_bounds_are_accepted(priority):
+    assert ResumeJobRequest(resume=RESUME, priority=priority).priority == priority
+
+
+@pytest.mark.parametrize("priority", [-1, 10, 10 ** 20])
+def test_job_priority_out_of_range_is_rejected(priority):
+    with pytest.raises(ValidationError):
+        ResumeJobRequest(resume=RESUME, priority=priority)
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+from app.utils.single_flight import SingleFlight
+
+
+class Work:
+    """Counts runs of a shared piece of work and lets the test decide when it ends"""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.runs = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.runs
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_calls_share_one_run():
+    async def scenario():
+        flights, work = SingleFlight("test"), Work()
+        callers = [asyncio.ensure_future(flights.do("key", work)) for _ in range(4)]
+        await settle()
+        assert flights.in_flight() == 1
+        work.release.set()
+        assert await asyncio.gather(*callers) == [1, 1, 1, 1]
+        assert work.runs == 1
+        assert flights.coalesced == 3
+        assert flights.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flights, work = SingleFlight("test"), Work()
+        work.release.set()
+        await asyncio.gather(flights.do("a", work), flights.do("b", work))
+        assert work.runs == 2
+        assert flights.coalesced == 0
+
+    asyncio.run(scenario())
+
+
+def test_later_calls_run_again():
+    async def scenario():
+        flights, work = SingleFlight("test"), Work()
+        work.release.set()
+        assert await flights.do("key", work) == 1
+        assert await flights.do("key", work) == 2
+
+    asyncio.run(scenario())
+
+
+def test_error_reaches_every_waiter():
+    async def scenario():
+        flights, work = SingleFlight("test"), Work(error=RuntimeError("boom"))
+        callers = [asyncio.ensure_future(flights.do("key", work)) for _ in range(3)]
+        await settle()
+        work.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) and str(result) == "boom" for result in results)
+        assert work.runs == 1
+        assert flights.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    async def scenario():
+        flights, work = SingleFlight("test"), Work()
+        first = asyncio.ensure_future(flights.do("key", work))
+        second = asyncio.ensure_future(flights.do("key", work))
+        await settle()
+        first.cancel()
+        await settle()
+        assert work.cancelled == 0
+        work.release.set()
+        assert await second == 1
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(scenario())
+
+
+def test_last_waiter_cancelled_cancels_the_work():
+    async def scenario():
+        flights, work = SingleFlight("test"), Work()
+        callers = [asyncio.ensure_future(flights.do("key", work)) for _ in range(2)]
+        await settle()
+        for caller in callers:
+            caller.cancel()
+        await settle()
+        assert work.cancelled == 1
+        assert flights.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_call_after_cancellation_starts_afresh():
+    async def scenario():
+        flights, work = SingleFlight("test"), Work()
+        caller = asyncio.ensure_future(flights.do("key", work))
+        await settle()
+        caller.cancel()
+        # Arrives before the cancelled run has finished unwinding
+        fresh = asyncio.ensure_future(flights.do("key", work))
+        await settle()
+        work.release.set()
+        assert await fresh == 2
+        assert flights.coalesced == 0
+
+    asyncio.run(scenario())